@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from model_enhanced import TripModel, Trip, Location, DatabaseError
+from model_enhanced import TRIP_PAGE_SIZE, TripModel, Trip, Location, DatabaseError
 from view import TripPlannerView
 from kivy.app import App
 from kivy.uix.popup import Popup
@@ -27,15 +27,43 @@ class TripController:
         self.view.on_delete_trip = self.delete_trip
         self.view.on_show_details = self.show_trip_details
         self.view.on_optimize_route = self.optimize_route
+        self.view.on_load_more = self._load_more_trips
+        
+        # (created_at, id) of the last trip shown, where the next page starts
+        self._trip_cursor = None
         
         # Initialize view
         self._load_trips()
     
+    def _fetch_trip_page(self):
+        """
+        Fetch the page of trips after the last one shown.
+        
+        Returns:
+            Tuple of (trips, whether more trips follow them)
+        """
+        # Ask for one extra trip to learn whether there is another page
+        trips = self.model.list_trips(after=self._trip_cursor, limit=TRIP_PAGE_SIZE + 1)
+        has_more = len(trips) > TRIP_PAGE_SIZE
+        trips = trips[:TRIP_PAGE_SIZE]
+        if trips:
+            self._trip_cursor = (trips[-1].created_at, trips[-1].id)
+        return trips, has_more
+    
     def _load_trips(self):
-        """Load trips from model and update view."""
+        """Load the first page of trips from model and update view."""
         try:
-            trips = self.model.get_all_trips()
-            self.view.update_trip_list(trips)
+            self._trip_cursor = None
+            trips, has_more = self._fetch_trip_page()
+            self.view.update_trip_list(trips, has_more)
+        except DatabaseError as e:
+            self._show_error("Failed to load trips", str(e))
+    
+    def _load_more_trips(self):
+        """Load the next page of trips and add it to the view."""
+        try:
+            trips, has_more = self._fetch_trip_page()
+            self.view.append_trips(trips, has_more)
         except DatabaseError as e:
             self._show_error("Failed to load trips", str(e))
     
@@ -373,6 +401,7 @@ class TripController:
             try:
                 # Optimize route
                 optimized_route = self.model.optimize_trip_route(trip.id)
+                result = self.model.last_route_result
                 
                 # Update UI on main thread
                 def update_ui(dt):
@@ -382,6 +411,8 @@ class TripController:
                         self._show_info(
                             "Route Optimized",
                             f"Trip route has been optimized to minimize travel distance.\n"
+                            f"Route length: {result.initial_length:.1f} -> {result.final_length:.1f} "
+                            f"({result.improvement * 100:.1f}% shorter)\n"
                             f"New route order: {', '.join(loc.name for loc in optimized_route)}"
                         )
                         # Refresh trip details
@@ -415,77 +446,9 @@ class TripController:
             # Create content
             content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
             
-            # Trip cache stats
-            trip_cache = stats.get("trip_cache", {})
-            content.add_widget(Label(
-                text="Trip Cache Statistics:",
-                size_hint_y=None,
-                height=dp(30),
-                halign='left',
-                text_size=(400, None),
-                bold=True
-            ))
-            
-            content.add_widget(Label(
-                text=f"Size: {trip_cache.get('size', 0)} / {trip_cache.get('capacity', 0)} items",
-                size_hint_y=None,
-                height=dp(25),
-                halign='left',
-                text_size=(400, None)
-            ))
-            
-            content.add_widget(Label(
-                text=f"Utilization: {trip_cache.get('utilization', 0) * 100:.1f}%",
-                size_hint_y=None,
-                height=dp(25),
-                halign='left',
-                text_size=(400, None)
-            ))
-            
-            if "oldest_item_age" in trip_cache:
-                content.add_widget(Label(
-                    text=f"Oldest item age: {trip_cache['oldest_item_age']:.1f} seconds",
-                    size_hint_y=None,
-                    height=dp(25),
-                    halign='left',
-                    text_size=(400, None)
-                ))
-            
-            # Location cache stats
-            location_cache = stats.get("location_cache", {})
-            content.add_widget(Label(
-                text="Location Cache Statistics:",
-                size_hint_y=None,
-                height=dp(30),
-                halign='left',
-                text_size=(400, None),
-                bold=True
-            ))
-            
-            content.add_widget(Label(
-                text=f"Size: {location_cache.get('size', 0)} / {location_cache.get('capacity', 0)} items",
-                size_hint_y=None,
-                height=dp(25),
-                halign='left',
-                text_size=(400, None)
-            ))
-            
-            content.add_widget(Label(
-                text=f"Utilization: {location_cache.get('utilization', 0) * 100:.1f}%",
-                size_hint_y=None,
-                height=dp(25),
-                halign='left',
-                text_size=(400, None)
-            ))
-            
-            if "oldest_item_age" in location_cache:
-                content.add_widget(Label(
-                    text=f"Oldest item age: {location_cache['oldest_item_age']:.1f} seconds",
-                    size_hint_y=None,
-                    height=dp(25),
-                    halign='left',
-                    text_size=(400, None)
-                ))
+            self._add_cache_stats(content, "Trip Cache Statistics:", stats.get("trip_cache", {}))
+            self._add_cache_stats(content, "Location Cache Statistics:", stats.get("location_cache", {}))
+            self._add_cache_stats(content, "Route Cache Statistics:", stats.get("route_cache", {}))
             
             # Cache actions
             action_layout = BoxLayout(
@@ -507,7 +470,7 @@ class TripController:
             popup = Popup(
                 title="Cache Statistics",
                 content=content,
-                size_hint=(0.8, 0.7)
+                size_hint=(0.8, 0.9)
             )
             
             close_btn.bind(on_press=popup.dismiss)
@@ -516,6 +479,46 @@ class TripController:
         except Exception as e:
             self._show_error("Error", f"Failed to get cache statistics: {str(e)}")
     
+    def _add_cache_stats(self, content: BoxLayout, title: str, cache_stats: Dict[str, Any]):
+        """Add the statistics of one cache to the stats popup."""
+        lines = [
+            f"Size: {cache_stats.get('size', 0)} / {cache_stats.get('capacity', 0)} items "
+            f"({cache_stats.get('utilization', 0) * 100:.1f}%)",
+            f"Hits: {cache_stats.get('hits', 0)}, misses: {cache_stats.get('misses', 0)} "
+            f"(hit ratio {cache_stats.get('hit_ratio', 0) * 100:.1f}%)",
+            f"Inserts: {cache_stats.get('inserts', 0)}, evictions: {cache_stats.get('evictions', 0)}, "
+            f"expirations: {cache_stats.get('expirations', 0)}"
+        ]
+        
+        if "oldest_item_age" in cache_stats:
+            lines.append(f"Oldest item age: {cache_stats['oldest_item_age']:.1f} seconds")
+        
+        for operation in ("get", "put"):
+            latency = cache_stats.get(f"{operation}_latency", {})
+            if latency.get("count"):
+                lines.append(
+                    f"{operation.capitalize()} latency: mean {latency['mean_us']:.0f} us, "
+                    f"p99 < {latency['p99_us']:.0f} us"
+                )
+        
+        content.add_widget(Label(
+            text=title,
+            size_hint_y=None,
+            height=dp(30),
+            halign='left',
+            text_size=(400, None),
+            bold=True
+        ))
+        
+        for line in lines:
+            content.add_widget(Label(
+                text=line,
+                size_hint_y=None,
+                height=dp(25),
+                halign='left',
+                text_size=(400, None)
+            ))
+    
     def _clear_caches(self):
         """Clear all caches and show confirmation."""
         try:
@@ -1,12 +1,32 @@
 import sqlite3
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 import requests
 from dataclasses import dataclass
 from datetime import datetime
+import csv
 import json
 
-from pathfinding import Location, PathFinder
-from cache import PersistentCache, lru_cache_decorator
+from pathfinding import Location, LocationTable, PathFinder, location_distance_matrix
+from distance import HAVERSINE, DistanceMetric, matrix_rows
+from cache import JournaledCache, LRUCache, WTinyLFUPolicy, deep_sizeof
+from route_optimizer import RouteOptimizer, RouteResult
+
+# Seconds before cached trips and locations are reloaded from the database
+CACHE_TTL = 300
+CACHE_SWEEP_INTERVAL = 60
+
+# Memory budgets for the caches; a trip's size grows with its locations
+TRIP_CACHE_MAX_BYTES = 4 * 1024 * 1024
+LOCATION_CACHE_MAX_BYTES = 256 * 1024
+
+# Number of trips list_trips returns by default
+TRIP_PAGE_SIZE = 50
+
+# Rows fetched per round trip by the iter_* generators
+ITER_BATCH_SIZE = 500
+
+# Rows inserted per executemany call by add_locations_bulk
+IMPORT_CHUNK_SIZE = 1000
 
 @dataclass
 class Trip:
@@ -61,7 +81,7 @@ class Trip:
 
 
 class TripModel:
-    def __init__(self, db_name: str):
+    def __init__(self, db_name: str, distance_metric: Optional[DistanceMetric] = None):
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
         self._create_tables()
@@ -69,15 +89,27 @@ class TripModel:
         # Initialize API endpoint
         self.api_url = 'http://localhost:3000/api/trips'
         
-        # Initialize caches
-        self.trip_cache = PersistentCache[Trip](
+        # Initialize caches. Changes are appended to a log in batches, so a
+        # cache miss does not rewrite the whole cache file. Entries expire
+        # so that changes made by other processes are picked up, and
+        # W-TinyLFU eviction keeps a get_all_trips() listing from flushing
+        # the frequently used entries. Latency is tracked so that the stats
+        # popup can show what a hit and a miss cost.
+        self.trip_cache = JournaledCache[Trip](
             capacity=50,
             filename="trip_cache.json",
             serialize_fn=lambda trip: trip.to_dict(),
-            deserialize_fn=lambda data: Trip.from_dict(data)
+            deserialize_fn=lambda data: Trip.from_dict(data),
+            write_behind=True,
+            ttl=CACHE_TTL,
+            sweep_interval=CACHE_SWEEP_INTERVAL,
+            policy=WTinyLFUPolicy(50),
+            track_latency=True,
+            weigher=deep_sizeof,
+            max_weight=TRIP_CACHE_MAX_BYTES
         )
         
-        self.location_cache = PersistentCache[Location](
+        self.location_cache = JournaledCache[Location](
             capacity=100,
             filename="location_cache.json",
             serialize_fn=lambda loc: {
@@ -87,11 +119,33 @@ class TripModel:
                 "longitude": loc.longitude,
                 "description": loc.description
             },
-            deserialize_fn=lambda data: Location(**data)
+            deserialize_fn=lambda data: Location(**data),
+            write_behind=True,
+            ttl=CACHE_TTL,
+            sweep_interval=CACHE_SWEEP_INTERVAL,
+            policy=WTinyLFUPolicy(100),
+            track_latency=True,
+            weigher=deep_sizeof,
+            max_weight=LOCATION_CACHE_MAX_BYTES
         )
         
-        # Initialize path finder with empty locations (will be populated as needed)
-        self.path_finder = PathFinder([])
+        # Locations are real coordinates, so measure great-circle distances by default
+        self.distance_metric = distance_metric or HAVERSINE
+        
+        # Initialize path finder with empty locations. It is loaded from the
+        # database on first use and then kept in sync incrementally; the dirty
+        # flag marks it as needing a full reload.
+        self.path_finder = PathFinder([], metric=self.distance_metric)
+        self._path_finder_dirty = True
+        
+        # Shortest-path results keyed by "start_id:goal_id", holding
+        # (path location IDs, cost). Entries are only dropped when a
+        # location on the path changes, not when the path finder is rebuilt.
+        self.route_cache = LRUCache[Tuple[List[int], float]](capacity=1000)
+        
+        # Route optimizer used to reorder trip locations
+        self.route_optimizer = RouteOptimizer(time_budget=1.0)
+        self.last_route_result: Optional[RouteResult] = None
 
     def _create_tables(self):
         # Create trips table
@@ -127,11 +181,16 @@ class TripModel:
             )
         ''')
         
+        # Index matching the listing order, so a page of trips is read
+        # straight from the index instead of sorting the whole table
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trips_created_at_id ON trips (created_at, id)"
+        )
+        
         self.conn.commit()
 
-    @lru_cache_decorator(maxsize=50)
     def add_trip(self, destination: str) -> Trip:
-        """Add a new trip with caching."""
+        """Add a new trip and cache it."""
         try:
             self.cursor.execute(
                 "INSERT INTO trips (destination) VALUES (?)",
@@ -139,12 +198,8 @@ class TripModel:
             )
             self.conn.commit()
             
-            trip_id = self.cursor.lastrowid
-            trip = self.get_trip_by_id(trip_id)
-            
-            # Add to cache
-            if trip:
-                self.trip_cache.put(str(trip_id), trip)
+            # Loads the trip into the cache
+            trip = self.get_trip_by_id(self.cursor.lastrowid)
             
             # Try to sync with API (non-blocking)
             self._sync_with_api(destination)
@@ -155,15 +210,14 @@ class TripModel:
 
     def get_trip_by_id(self, trip_id: int) -> Optional[Trip]:
         """Get a trip by ID with caching."""
-        # Try to get from cache first
-        cached_trip = self.trip_cache.get(str(trip_id))
-        if cached_trip:
-            return cached_trip
-        
-        # Not in cache, query database
+        # Concurrent misses for the same trip share one database load
+        return self.trip_cache.get_or_load(str(trip_id), self._load_trip)
+
+    def _load_trip(self, key: str) -> Optional[Trip]:
+        """Load a trip and its locations from the database."""
         self.cursor.execute(
             "SELECT id, destination, created_at, updated_at FROM trips WHERE id = ?",
-            (trip_id,)
+            (int(key),)
         )
         row = self.cursor.fetchone()
         
@@ -179,45 +233,200 @@ class TripModel:
         )
         
         # Get locations for this trip
-        trip.locations = self._get_locations_for_trip(trip_id)
-        
-        # Add to cache
-        self.trip_cache.put(str(trip_id), trip)
+        trip.locations = self._get_locations_for_trip(trip.id)
         
         return trip
 
     def get_all_trips(self) -> List[Trip]:
-        """Get all trips with efficient querying."""
-        self.cursor.execute(
-            "SELECT id, destination, created_at, updated_at FROM trips ORDER BY created_at DESC"
-        )
+        """Get all trips with their locations in a single query."""
+        return self._select_trips()
+
+    def list_trips(self, after: Optional[Tuple[datetime, int]] = None,
+                   limit: int = TRIP_PAGE_SIZE) -> List[Trip]:
+        """
+        Get one page of trips, newest first.
         
-        trips = []
-        for row in self.cursor.fetchall():
-            trip_id = row[0]
+        Pages are addressed by the (created_at, id) of the last trip on the
+        previous page rather than by an offset, so every page costs the same
+        however deep into the list it is, and trips added meanwhile do not
+        shift later pages.
+        
+        Args:
+            after: (created_at, id) of the last trip already shown, or None for the first page
+            limit: Maximum number of trips to return
             
-            # Try to get from cache first
-            cached_trip = self.trip_cache.get(str(trip_id))
-            if cached_trip:
-                trips.append(cached_trip)
-                continue
+        Returns:
+            List of up to `limit` trips older than `after`
+        """
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+        
+        if after is None:
+            return self._select_trips(limit=limit)
+        
+        created_at, trip_id = after
+        if isinstance(created_at, datetime):
+            # Stored in the CURRENT_TIMESTAMP format
+            created_at = created_at.isoformat(sep=' ')
+        return self._select_trips("(created_at, id) < (?, ?)", (created_at, trip_id), limit)
+
+    def iter_trips(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Trip]:
+        """
+        Stream all trips with their locations, newest first.
+        
+        Rows are fetched `batch_size` at a time on a cursor of their own, so
+        a pass over a large table holds only one batch in memory. The
+        caches are neither read nor filled, so a full pass does not evict
+        the trips in use.
+        
+        Args:
+            batch_size: Number of rows fetched per round trip
             
-            # Not in cache, create new trip object
-            trip = Trip(
-                id=trip_id,
-                destination=row[1],
-                created_at=datetime.fromisoformat(row[2]),
-                updated_at=datetime.fromisoformat(row[3])
-            )
+        Returns:
+            Iterator of trips
+        """
+        return self._group_trip_rows(self._iter_rows(*self._trips_query(), batch_size),
+                                     use_cache=False)
+
+    def iter_locations(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Location]:
+        """
+        Stream all locations in ID order, `batch_size` rows at a time.
+        
+        Args:
+            batch_size: Number of rows fetched per round trip
             
-            # Get locations (will be cached individually)
-            trip.locations = self._get_locations_for_trip(trip_id)
+        Returns:
+            Iterator of locations
+        """
+        rows = self._iter_rows(
+            "SELECT id, name, latitude, longitude, description FROM locations ORDER BY id",
+            batch_size=batch_size
+        )
+        return (Location(id=row[0], name=row[1], latitude=row[2], longitude=row[3],
+                         description=row[4] or "")
+                for row in rows)
+
+    def _iter_rows(self, query: str, params: Tuple = (),
+                   batch_size: int = ITER_BATCH_SIZE) -> Iterator[Tuple]:
+        """
+        Run a query on a new cursor and stream its rows in fetchmany batches.
+        A separate cursor keeps the stream independent of self.cursor.
+        """
+        # Checked here rather than in the generator, so that a bad batch
+        # size fails on the call instead of on the first next()
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+        return self._fetch_rows(query, params, batch_size)
+
+    def _fetch_rows(self, query: str, params: Tuple, batch_size: int) -> Iterator[Tuple]:
+        """Generator behind _iter_rows."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def _trips_query(self, where: str = "", params: Tuple = (),
+                     limit: Optional[int] = None) -> Tuple[str, Tuple]:
+        """
+        Build the query for the trips matching a condition on the trips
+        table, newest first, joined with their ordered locations.
+        
+        Returns:
+            Tuple of (SQL, parameters)
+        """
+        page = "SELECT id, destination, created_at, updated_at FROM trips"
+        if where:
+            page += f" WHERE {where}"
+        page += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            page += " LIMIT ?"
+            params += (limit,)
+        
+        return f"""
+            WITH page AS ({page})
+            SELECT t.id, t.destination, t.created_at, t.updated_at,
+                   l.id, l.name, l.latitude, l.longitude, l.description
+            FROM page t
+            LEFT JOIN trip_locations tl ON tl.trip_id = t.id
+            LEFT JOIN locations l ON l.id = tl.location_id
+            ORDER BY t.created_at DESC, t.id DESC, tl.position
+            """, params
+
+    def _select_trips(self, where: str = "", params: Tuple = (),
+                      limit: Optional[int] = None) -> List[Trip]:
+        """Get the trips matching a condition on the trips table in a single query."""
+        self.cursor.execute(*self._trips_query(where, params, limit))
+        return list(self._group_trip_rows(self.cursor.fetchall()))
+
+    def _group_trip_rows(self, rows: Iterable[Tuple], use_cache: bool = True) -> Iterator[Trip]:
+        """
+        Build trips from joined trip and location rows, yielding each trip
+        once all of its rows have been read.
+        
+        With use_cache, cached trips and locations are reused, and the ones
+        missing from the caches are cached in one batch per cache after the
+        last row. Otherwise every object is built from its row.
+        """
+        new_trips: List[Tuple[str, Trip]] = []
+        locations: Dict[int, Location] = {}
+        new_locations: List[Tuple[str, Location]] = []
+        trip = None
+        cached = False
+        
+        for row in rows:
+            trip_id = row[0]
+            if trip is None or trip.id != trip_id:
+                # First row of the next trip; cached trips skip their location rows
+                if trip is not None:
+                    yield trip
+                trip = self.trip_cache.get(str(trip_id)) if use_cache else None
+                cached = trip is not None
+                if not cached:
+                    trip = Trip(
+                        id=trip_id,
+                        destination=row[1],
+                        created_at=datetime.fromisoformat(row[2]),
+                        updated_at=datetime.fromisoformat(row[3]),
+                        locations=[]
+                    )
+                    if use_cache:
+                        new_trips.append((str(trip_id), trip))
+            
+            location_id = row[4]
+            if cached or location_id is None:
+                continue
             
-            # Add to cache
-            self.trip_cache.put(str(trip_id), trip)
-            trips.append(trip)
+            location = None
+            if use_cache:
+                location = locations.get(location_id)
+                if location is None:
+                    location = self.location_cache.get(str(location_id))
+            if location is None:
+                location = Location(
+                    id=location_id,
+                    name=row[5],
+                    latitude=row[6],
+                    longitude=row[7],
+                    description=row[8] or ""
+                )
+                if use_cache:
+                    new_locations.append((str(location_id), location))
+            if use_cache:
+                locations[location_id] = location
+            trip.locations.append(location)
+        
+        if trip is not None:
+            yield trip
         
-        return trips
+        if use_cache:
+            self.location_cache.put_many(new_locations)
+            self.trip_cache.put_many(new_trips)
 
     def update_trip(self, trip_id: int, destination: str) -> Optional[Trip]:
         """Update a trip with cache invalidation."""
@@ -267,12 +476,103 @@ class TripModel:
             self.location_cache.put(str(location_id), location)
             
             # Update path finder with new location
-            self._update_path_finder()
+            if not self._path_finder_dirty:
+                self.path_finder.add_location(location)
             
             return location
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to add location: {str(e)}")
 
+    def add_locations_bulk(self, locations: Iterable[Tuple], chunk_size: int = IMPORT_CHUNK_SIZE) -> List[Location]:
+        """
+        Add many locations in a single transaction.
+        
+        Rows are inserted with executemany in chunks of `chunk_size`, the
+        location cache is updated in one batch and the path finder is
+        extended once at the end, instead of committing, saving the cache
+        and updating the path finder for every location.
+        
+        Args:
+            locations: Iterable of (name, latitude, longitude) or
+                (name, latitude, longitude, description) tuples
+            chunk_size: Number of rows per executemany call
+            
+        Returns:
+            The added locations, in input order
+            
+        Raises:
+            DatabaseError: If the insert fails; no location is added then
+            ValueError: If an input row is invalid; no location is added then
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        
+        added: List[Location] = []
+        try:
+            # Take the write lock before reading the highest ID, so that the
+            # IDs assigned below cannot be taken by another connection
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM locations")
+            next_id = self.cursor.fetchone()[0] + 1
+            
+            chunk: List[Tuple[int, str, float, float, str]] = []
+            for values in locations:
+                name, latitude, longitude = values[0], float(values[1]), float(values[2])
+                description = values[3] if len(values) > 3 and values[3] is not None else ""
+                added.append(Location(id=next_id, name=name, latitude=latitude,
+                                      longitude=longitude, description=description))
+                chunk.append((next_id, name, latitude, longitude, description))
+                next_id += 1
+                if len(chunk) >= chunk_size:
+                    self._insert_locations(chunk)
+                    chunk = []
+            if chunk:
+                self._insert_locations(chunk)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            raise DatabaseError(f"Failed to add locations: {str(e)}")
+        except BaseException:
+            # Invalid input rows abort the whole import
+            self.conn.rollback()
+            raise
+        
+        # Only the most recent locations could stay cached anyway
+        self.location_cache.put_many(
+            (str(location.id), location) for location in added[-self.location_cache.capacity:]
+        )
+        
+        if not self._path_finder_dirty:
+            self.path_finder.add_locations(added)
+        
+        return added
+
+    def _insert_locations(self, rows: List[Tuple[int, str, float, float, str]]) -> None:
+        """Insert (id, name, latitude, longitude, description) rows in one call."""
+        self.cursor.executemany(
+            "INSERT INTO locations (id, name, latitude, longitude, description) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def import_locations_csv(self, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> List[Location]:
+        """
+        Import locations from a CSV file with a header row naming the
+        name, latitude, longitude and (optional) description columns.
+        
+        Returns:
+            The added locations
+        """
+        return self.add_locations_bulk(read_locations_csv(filename), chunk_size)
+
+    def import_locations_geojson(self, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> List[Location]:
+        """
+        Import the Point features of a GeoJSON FeatureCollection as locations.
+        
+        Returns:
+            The added locations
+        """
+        return self.add_locations_bulk(read_locations_geojson(filename), chunk_size)
+
     def get_location_by_id(self, location_id: int) -> Optional[Location]:
         """Get a location by ID with caching."""
         # Try to get from cache first
@@ -304,6 +604,61 @@ class TripModel:
         
         return location
 
+    def update_location(self, location_id: int, name: Optional[str] = None,
+                        latitude: Optional[float] = None, longitude: Optional[float] = None,
+                        description: Optional[str] = None) -> Optional[Location]:
+        """Update a location with cache invalidation."""
+        location = self.get_location_by_id(location_id)
+        if not location:
+            return None
+        
+        updated = Location(
+            id=location_id,
+            name=location.name if name is None else name,
+            latitude=location.latitude if latitude is None else latitude,
+            longitude=location.longitude if longitude is None else longitude,
+            description=location.description if description is None else description
+        )
+        
+        try:
+            self.cursor.execute(
+                "UPDATE locations SET name = ?, latitude = ?, longitude = ?, description = ? WHERE id = ?",
+                (updated.name, updated.latitude, updated.longitude, updated.description, location_id)
+            )
+            self.conn.commit()
+            
+            self.location_cache.put(str(location_id), updated)
+            self._invalidate_location(location_id)
+            
+            # Update path finder with the moved location
+            if not self._path_finder_dirty:
+                self.path_finder.remove_location(location_id)
+                self.path_finder.add_location(updated)
+            
+            return updated
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to update location: {str(e)}")
+
+    def delete_location(self, location_id: int) -> bool:
+        """Delete a location with cache invalidation."""
+        try:
+            # Invalidate caches before the trip_locations rows disappear
+            self._invalidate_location(location_id)
+            self.location_cache.remove(str(location_id))
+            
+            self.cursor.execute("DELETE FROM trip_locations WHERE location_id = ?", (location_id,))
+            self.cursor.execute("DELETE FROM locations WHERE id = ?", (location_id,))
+            self.conn.commit()
+            deleted = self.cursor.rowcount > 0
+            
+            # Update path finder without the deleted location
+            if not self._path_finder_dirty:
+                self.path_finder.remove_location(location_id)
+            
+            return deleted
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to delete location: {str(e)}")
+
     def add_location_to_trip(self, trip_id: int, location_id: int, position: int = -1) -> bool:
         """Add a location to a trip."""
         try:
@@ -346,43 +701,75 @@ class TripModel:
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to remove location from trip: {str(e)}")
 
-    def optimize_trip_route(self, trip_id: int) -> Optional[List[Location]]:
+    def find_route(self, start_id: int, goal_id: int) -> List[Location]:
         """
-        Optimize the route for a trip using the A* pathfinding algorithm.
-        Reorders locations to minimize travel distance.
+        Find the shortest path between two locations, using cached results
+        when the same pair has been solved before.
+        """
+        route = self._cached_route(start_id, goal_id)
+        if not route:
+            return []
+        
+        path_ids, _ = route
+        return [self.get_location_by_id(location_id) for location_id in path_ids]
+
+    def route_distance(self, start_id: int, goal_id: int) -> Optional[float]:
+        """Get the length of the shortest path between two locations, or None if unreachable."""
+        route = self._cached_route(start_id, goal_id)
+        return route[1] if route else None
+
+    def _cached_route(self, start_id: int, goal_id: int) -> Optional[Tuple[List[int], float]]:
+        """Get a (path IDs, cost) result from the route cache, solving it on a miss."""
+        key = f"{start_id}:{goal_id}"
+        cached_route = self.route_cache.get(key)
+        if cached_route:
+            return cached_route
+        
+        path = self._ensure_path_finder().find_path(start_id, goal_id)
+        if not path:
+            return None
+        
+        cost = sum(a.distance_to(b, self.distance_metric) for a, b in zip(path, path[1:]))
+        route = ([location.id for location in path], cost)
+        self.route_cache.put(key, route)
+        return route
+
+    def _invalidate_location(self, location_id: int) -> None:
+        """Drop cached routes and trips that include a changed location."""
+        for key, (path_ids, _) in self.route_cache.get_all_items():
+            if location_id in path_ids:
+                self.route_cache.remove(key)
+        
+        self.cursor.execute(
+            "SELECT trip_id FROM trip_locations WHERE location_id = ?",
+            (location_id,)
+        )
+        for (trip_id,) in self.cursor.fetchall():
+            self.trip_cache.remove(str(trip_id))
+
+    def optimize_trip_route(self, trip_id: int, time_budget: Optional[float] = None) -> Optional[List[Location]]:
+        """
+        Optimize the route for a trip.
+        Reorders locations to minimize travel distance, starting from the
+        trip's first location. The tour lengths before and after
+        improvement are kept in `last_route_result`.
+        
+        Args:
+            trip_id: ID of the trip to optimize
+            time_budget: Optional maximum seconds to spend improving the route
         """
         trip = self.get_trip_by_id(trip_id)
         if not trip or not trip.locations or len(trip.locations) < 2:
             return None
         
-        # Ensure path finder is up to date
-        self._update_path_finder()
+        # Precompute all pairwise distances between the trip's locations in one batch.
+        # Every location is directly reachable, so these are also the shortest paths.
+        distances = matrix_rows(location_distance_matrix(trip.locations, self.distance_metric))
         
-        # Simple greedy algorithm for route optimization
-        # Start from first location and always go to the nearest unvisited location
-        optimized_route = [trip.locations[0]]
-        remaining_locations = trip.locations[1:]
-        
-        current_location = optimized_route[0]
-        while remaining_locations:
-            # Find nearest location
-            nearest_location = min(
-                remaining_locations, 
-                key=lambda loc: current_location.distance_to(loc)
-            )
-            
-            # Find optimal path to nearest location
-            path = self.path_finder.find_path(
-                current_location.id,
-                nearest_location.id
-            )
-            
-            # Add path (excluding start location which is already in the route)
-            optimized_route.extend(path[1:])
-            
-            # Update current location and remove visited location
-            current_location = nearest_location
-            remaining_locations.remove(nearest_location)
+        # Nearest-neighbour route improved with 2-opt / Or-opt moves
+        result = self.route_optimizer.optimize(distances, start=0, time_budget=time_budget)
+        self.last_route_result = result
+        optimized_route = [trip.locations[index] for index in result.order]
         
         # Update trip_locations table with new order
         try:
@@ -449,25 +836,26 @@ class TripModel:
         
         return locations
 
+    def _ensure_path_finder(self) -> PathFinder:
+        """Get the path finder, reloading it from the database only if it is dirty."""
+        if self._path_finder_dirty:
+            self._update_path_finder()
+        return self.path_finder
+
+    def invalidate_path_finder(self) -> None:
+        """Mark the path finder as stale, e.g. after another process changed the locations table."""
+        self._path_finder_dirty = True
+
     def _update_path_finder(self):
         """Update the path finder with all locations from database."""
-        self.cursor.execute(
+        # Load rows straight into a columnar table instead of one Location per row
+        locations = LocationTable.from_rows(self._iter_rows(
             "SELECT id, name, latitude, longitude, description FROM locations"
-        )
-        
-        locations = []
-        for row in self.cursor.fetchall():
-            location = Location(
-                id=row[0],
-                name=row[1],
-                latitude=row[2],
-                longitude=row[3],
-                description=row[4] or ""
-            )
-            locations.append(location)
+        ))
         
         # Update path finder with all locations
-        self.path_finder = PathFinder(locations)
+        self.path_finder = PathFinder(locations, metric=self.distance_metric)
+        self._path_finder_dirty = False
 
     def _sync_with_api(self, destination: str) -> None:
         """Sync trip with API server."""
@@ -486,20 +874,72 @@ class TripModel:
         """Clear all caches."""
         self.trip_cache.clear()
         self.location_cache.clear()
+        self.route_cache.clear()
 
     def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
-        """Get statistics for all caches."""
+        """Get statistics for all caches, including hit ratios and eviction counts."""
         return {
             "trip_cache": self.trip_cache.get_stats(),
-            "location_cache": self.location_cache.get_stats()
+            "location_cache": self.location_cache.get_stats(),
+            "route_cache": self.route_cache.get_stats()
         }
 
     def __del__(self):
-        """Close database connection when object is destroyed."""
+        """Save pending cache writes and close database connection when object is destroyed."""
+        for cache in (getattr(self, 'trip_cache', None), getattr(self, 'location_cache', None)):
+            if cache is not None:
+                cache.flush()
         if hasattr(self, 'conn') and self.conn:
             self.conn.close()
 
 
 class DatabaseError(Exception):
     """Exception raised for database errors."""
-    pass 
+    pass
+
+
+def read_locations_csv(filename: str) -> Iterator[Tuple[str, float, float, str]]:
+    """
+    Read (name, latitude, longitude, description) tuples from a CSV file
+    with a header row. Rows are read lazily, one at a time.
+    
+    Raises:
+        ValueError: If a required column is missing or a coordinate is invalid
+    """
+    with open(filename, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = {"name", "latitude", "longitude"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV file is missing columns: {', '.join(sorted(missing))}")
+        
+        for line, row in enumerate(reader, start=2):
+            try:
+                latitude, longitude = float(row["latitude"]), float(row["longitude"])
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid coordinates on line {line} of {filename}")
+            yield row["name"], latitude, longitude, row.get("description") or ""
+
+
+def read_locations_geojson(filename: str) -> Iterator[Tuple[str, float, float, str]]:
+    """
+    Read (name, latitude, longitude, description) tuples from the Point
+    features of a GeoJSON FeatureCollection. Other geometries are skipped;
+    names and descriptions come from the feature properties.
+    
+    Raises:
+        ValueError: If the file is not a FeatureCollection
+    """
+    with open(filename) as f:
+        data = json.load(f)
+    if data.get("type") != "FeatureCollection":
+        raise ValueError(f"{filename} is not a GeoJSON FeatureCollection")
+    
+    for index, feature in enumerate(data.get("features", [])):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != "Point":
+            continue
+        # GeoJSON positions are (longitude, latitude)
+        longitude, latitude = geometry["coordinates"][:2]
+        properties = feature.get("properties") or {}
+        name = properties.get("name") or f"Location {index + 1}"
+        yield name, float(latitude), float(longitude), properties.get("description") or ""
@@ -0,0 +1,306 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from model_enhanced import TripModel
+
+
+class TripModelTestCase(unittest.TestCase):
+    def setUp(self):
+        # The caches keep their files in the working directory
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.model = TripModel(os.path.join(self.directory, "trips.db"))
+        self.model._sync_with_api = lambda destination: None
+
+    def tearDown(self):
+        for cache in (self.model.trip_cache, self.model.location_cache):
+            cache.stop_sweeper()
+            cache.flush()
+        self.model.conn.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def insert_trip(self, destination, created_at="2024-01-01 10:00:00"):
+        """Insert a trip row directly, with a fixed creation time; returns its ID."""
+        self.model.cursor.execute(
+            "INSERT INTO trips (destination, created_at, updated_at) VALUES (?, ?, ?)",
+            (destination, created_at, created_at)
+        )
+        self.model.conn.commit()
+        return self.model.cursor.lastrowid
+
+
+class TestListTrips(TripModelTestCase):
+    def test_pages_break_created_at_ties_by_id(self):
+        self.insert_trip("Old", "2023-12-31 09:00:00")
+        for i in range(5):
+            self.insert_trip(f"Trip {i}")
+
+        pages, after = [], None
+        while True:
+            page = self.model.list_trips(after, limit=2)
+            if not page:
+                break
+            pages.append([trip.id for trip in page])
+            after = (page[-1].created_at, page[-1].id)
+        self.assertEqual(pages, [[6, 5], [4, 3], [2, 1]])
+
+    def test_after_accepts_datetime_and_stored_string(self):
+        for i in range(4):
+            self.insert_trip(f"Trip {i}")
+
+        # datetimes are compared in the stored 'YYYY-MM-DD HH:MM:SS' format
+        by_datetime = self.model.list_trips((datetime(2024, 1, 1, 10, 0, 0), 3))
+        by_string = self.model.list_trips(("2024-01-01 10:00:00", 3))
+        self.assertEqual([trip.id for trip in by_datetime], [2, 1])
+        self.assertEqual([trip.id for trip in by_string], [2, 1])
+
+    def test_limit_must_be_positive(self):
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.model.list_trips(limit=limit)
+
+
+class TestStreaming(TripModelTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            self.insert_trip(f"Trip {i}", f"2024-01-0{i + 1} 10:00:00")
+        for i in range(4):
+            location = self.model.add_location(f"Place {i}", 48.0 + i, 2.0 + i)
+            self.model.add_location_to_trip(1 + i % 2, location.id)
+        self.model.clear_caches()
+        for cache in (self.model.trip_cache, self.model.location_cache):
+            cache.reset_stats()
+
+    def test_iter_trips_matches_get_all_trips_without_caching(self):
+        streamed = list(self.model.iter_trips(batch_size=2))
+        for cache in (self.model.trip_cache, self.model.location_cache):
+            self.assertEqual(cache.size(), 0)
+            self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        self.assertEqual([trip.id for trip in streamed], [5, 4, 3, 2, 1])
+        self.assertEqual([trip.to_dict() for trip in streamed],
+                         [trip.to_dict() for trip in self.model.get_all_trips()])
+
+    def test_iter_locations_in_id_order(self):
+        streamed = list(self.model.iter_locations(batch_size=3))
+        self.assertEqual([location.name for location in streamed], [f"Place {i}" for i in range(4)])
+        self.assertEqual(self.model.location_cache.size(), 0)
+
+    def test_batch_size_is_checked_on_call(self):
+        for method in (self.model.iter_trips, self.model.iter_locations):
+            with self.assertRaises(ValueError):
+                method(batch_size=0)
+
+
+class TestBulkImport(TripModelTestCase):
+    def count_locations(self):
+        self.model.cursor.execute("SELECT COUNT(*) FROM locations")
+        return self.model.cursor.fetchone()[0]
+
+    def write_file(self, name, content):
+        with open(name, "w") as f:
+            f.write(content)
+        return name
+
+    def test_inserts_in_chunks_after_highest_id(self):
+        self.model.add_location("Existing", 1.0, 1.0)
+        chunks = []
+        insert = self.model._insert_locations
+        self.model._insert_locations = lambda rows: chunks.append(len(rows)) or insert(rows)
+
+        added = self.model.add_locations_bulk(
+            [(f"Place {i}", i, -i) for i in range(4)] + [("Described", "5.5", "6.5", "Notes")],
+            chunk_size=2
+        )
+        self.assertEqual(chunks, [2, 2, 1])
+        self.assertEqual([location.id for location in added], [2, 3, 4, 5, 6])
+        self.assertEqual(self.count_locations(), 6)
+
+        stored = self.model.get_location_by_id(6)
+        self.assertEqual((stored.latitude, stored.longitude, stored.description), (5.5, 6.5, "Notes"))
+        self.assertEqual(list(self.model.iter_locations())[3].name, "Place 2")
+
+        with self.assertRaises(ValueError):
+            self.model.add_locations_bulk([("Place", 1.0, 1.0)], chunk_size=0)
+
+    def test_bad_csv_coordinate_rolls_back(self):
+        filename = self.write_file("places.csv", "name,latitude,longitude,description\n"
+                                                 "Paris,48.85,2.35,Capital\n"
+                                                 "Rome,41.9,12.5,\n"
+                                                 "Nowhere,north,0\n")
+        with self.assertRaises(ValueError):
+            self.model.import_locations_csv(filename, chunk_size=1)
+        self.assertEqual(self.count_locations(), 0)
+        self.assertFalse(self.model.conn.in_transaction)
+        self.assertEqual(self.model.location_cache.size(), 0)
+
+        filename = self.write_file("places.csv", "name,latitude,longitude,description\n"
+                                                 "Paris,48.85,2.35,Capital\n"
+                                                 "Rome,41.9,12.5,\n")
+        added = self.model.import_locations_csv(filename)
+        self.assertEqual([(location.name, location.description) for location in added],
+                         [("Paris", "Capital"), ("Rome", "")])
+
+    def test_geojson_reads_points_as_longitude_latitude(self):
+        features = [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [2.35, 48.85]},
+             "properties": {"name": "Paris", "description": "Capital"}},
+            {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[0, 0], [1, 1]]},
+             "properties": {"name": "Road"}},
+            {"type": "Feature", "geometry": None, "properties": {"name": "Nowhere"}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [12.5, 41.9, 21.0]}},
+        ]
+        filename = self.write_file("places.geojson",
+                                   json.dumps({"type": "FeatureCollection", "features": features}))
+
+        added = self.model.import_locations_geojson(filename)
+        self.assertEqual([(location.name, location.latitude, location.longitude) for location in added],
+                         [("Paris", 48.85, 2.35), ("Location 4", 41.9, 12.5)])
+        self.assertEqual(added[0].description, "Capital")
+
+        filename = self.write_file("feature.geojson", json.dumps(features[0]))
+        with self.assertRaises(ValueError):
+            self.model.import_locations_geojson(filename)
+
+    def test_path_finder_is_extended_only_when_loaded(self):
+        self.model.add_locations_bulk([("A", 0.0, 0.0), ("B", 0.0, 1.0)])
+        # Not loaded yet: the first route reads every location from the table
+        self.assertEqual(len(self.model.path_finder.locations), 0)
+        self.assertTrue(self.model._path_finder_dirty)
+
+        path_finder = self.model._ensure_path_finder()
+        self.model.add_locations_bulk([("C", 0.0, 2.0)])
+        self.assertIs(self.model.path_finder, path_finder)
+        self.assertEqual(sorted(path_finder.graph), [1, 2, 3])
+        self.assertEqual([location.name for location in self.model.find_route(1, 3)], ["A", "C"])
+
+
+class TestSelectTrips(TripModelTestCase):
+    def test_groups_cached_and_new_trips_with_one_batch_per_cache(self):
+        for day in range(1, 5):
+            self.insert_trip(f"Trip {day}", f"2024-01-0{day} 10:00:00")
+        for name in ("Shared", "Other", "First"):
+            self.model.add_location(name, 48.0, 2.0)
+        # Trip 1 visits First before Shared; trips 3 and 4 have no locations
+        self.model.add_location_to_trip(1, 1, position=1)
+        self.model.add_location_to_trip(1, 3, position=0)
+        self.model.add_location_to_trip(2, 1)
+        self.model.clear_caches()
+
+        # Caches trip 2 and its location only
+        cached_trip = self.model.get_trip_by_id(2)
+        shared = self.model.location_cache.get("1")
+
+        batches = {}
+        for name, cache in (("trips", self.model.trip_cache), ("locations", self.model.location_cache)):
+            put_many = cache.put_many
+            def record(items, ttl=None, name=name, put_many=put_many):
+                items = list(items)
+                batches.setdefault(name, []).append([key for key, _ in items])
+                put_many(items, ttl)
+            cache.put_many = record
+
+        trips = self.model.get_all_trips()
+        self.assertEqual([trip.id for trip in trips], [4, 3, 2, 1])
+        self.assertIs(trips[2], cached_trip)
+        self.assertEqual([trips[0].locations, trips[1].locations], [[], []])
+        self.assertEqual([location.name for location in trips[3].locations], ["First", "Shared"])
+        self.assertIs(trips[3].locations[1], shared)
+
+        self.assertEqual(batches, {"trips": [["4", "3", "1"]], "locations": [["3"]]})
+        self.assertEqual(self.model.trip_cache.size(), 4)
+
+
+class TestRouteCache(TripModelTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, latitude, longitude in (("A", 0.0, 0.0), ("B", 0.0, 1.0),
+                                          ("C", 0.0, 2.0), ("D", 1.0, 1.0)):
+            self.model.add_location(name, latitude, longitude)
+        for day, location_id in ((1, 3), (2, 2)):
+            trip_id = self.insert_trip(f"Trip {day}", f"2024-01-0{day} 10:00:00")
+            self.model.add_location_to_trip(trip_id, location_id)
+            self.model.get_trip_by_id(trip_id)
+
+    def route_keys(self):
+        return sorted(key for key, _ in self.model.route_cache.get_all_items())
+
+    def test_routes_are_cached(self):
+        self.assertEqual([location.name for location in self.model.find_route(1, 3)], ["A", "C"])
+        distance = self.model.route_distance(1, 3)
+        self.assertGreater(distance, 0)
+        # Unreachable pairs are not cached
+        self.assertEqual(self.model.find_route(1, 99), [])
+        self.assertEqual(self.route_keys(), ["1:3"])
+
+        self.model.path_finder.find_path = lambda start_id, goal_id: self.fail("route not cached")
+        self.assertEqual([location.id for location in self.model.find_route(1, 3)], [1, 3])
+        self.assertEqual(self.model.route_distance(1, 3), distance)
+
+    def test_routes_survive_path_finder_reload(self):
+        self.model.find_route(1, 3)
+        self.model.invalidate_path_finder()
+        self.assertEqual(self.model.route_distance(1, 3), self.model.route_cache.get("1:3")[1])
+        # Answered from the cache without reloading the path finder
+        self.assertTrue(self.model._path_finder_dirty)
+
+        self.model.find_route(2, 4)
+        self.assertFalse(self.model._path_finder_dirty)
+        self.assertEqual(self.route_keys(), ["1:3", "2:4"])
+
+    def test_location_changes_drop_only_affected_routes_and_trips(self):
+        for start, goal in ((1, 3), (2, 4), (1, 2)):
+            self.model.find_route(start, goal)
+
+        self.model.update_location(3, latitude=0.5)
+        self.assertEqual(self.route_keys(), ["1:2", "2:4"])
+        self.assertIsNone(self.model.trip_cache.get("1"))
+        self.assertIsNotNone(self.model.trip_cache.get("2"))
+        self.assertEqual(self.model.get_trip_by_id(1).locations[0].latitude, 0.5)
+
+        self.model.delete_location(2)
+        self.assertEqual(self.route_keys(), [])
+        self.assertIsNotNone(self.model.trip_cache.get("1"))
+        self.assertIsNone(self.model.trip_cache.get("2"))
+        self.assertEqual(self.model.get_trip_by_id(2).locations, [])
+
+
+class TestPathFinderSync(TripModelTestCase):
+    def test_incremental_updates_match_full_reload(self):
+        for i in range(4):
+            self.model.add_location(f"Place {i}", 40.0 + i, 2.0 * i)
+        self.model._ensure_path_finder()
+
+        self.model.add_location("Added", 45.0, 3.0)
+        self.model.add_locations_bulk([("Bulk 1", 46.0, 1.0), ("Bulk 2", 39.5, 7.0)])
+        self.model.update_location(2, name="Moved", latitude=41.5, longitude=9.0)
+        self.model.delete_location(1)
+        incremental = self.model.path_finder
+        self.assertFalse(self.model._path_finder_dirty)
+
+        self.model._update_path_finder()
+        rebuilt = self.model.path_finder
+        self.assertIsNot(incremental, rebuilt)
+
+        def rows(path_finder):
+            return sorted((location.id, location.name, location.latitude, location.longitude)
+                          for location in path_finder.locations)
+        self.assertEqual(rows(incremental), rows(rebuilt))
+        self.assertEqual(sorted(incremental.graph), sorted(rebuilt.graph))
+        self.assertEqual(incremental.prepared, rebuilt.prepared)
+        for location_id, edges in rebuilt.graph.items():
+            self.assertEqual(sorted(incremental.graph[location_id]), sorted(edges))
+            for neighbor, cost in edges.items():
+                self.assertAlmostEqual(incremental.graph[location_id][neighbor], cost)
+        self.assertEqual(incremental.find_path(3, 6), rebuilt.find_path(3, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,8 +12,8 @@ from kivy.uix.progressbar import ProgressBar
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, Rectangle, Line
 from kivy.core.window import Window
-from typing import Callable, List, Optional
-from model_enhanced import Trip, Location
+from typing import Callable, List, Optional, Union
+from model_enhanced import Trip, Location, LocationTable
 
 class TripMapView(Widget):
     """
@@ -27,32 +27,56 @@ class TripMapView(Widget):
         self.selected_location = None
         self.bind(size=self._update_canvas, pos=self._update_canvas)
     
-    def set_locations(self, locations: List[Location]):
-        """Set the locations to display on the map."""
+    def set_locations(self, locations: Union[List[Location], LocationTable]):
+        """Set the locations to display on the map, as a list or a LocationTable."""
         self.locations = locations
         self._update_canvas()
     
-    def _update_canvas(self, *args):
-        """Update the canvas with the current locations."""
-        self.canvas.clear()
-        
-        if not self.locations:
-            return
+    def _location_rows(self):
+        """Get (id, name, latitude, longitude) rows without materializing table rows."""
+        if isinstance(self.locations, LocationTable):
+            return zip(self.locations.ids, self.locations.names,
+                       self.locations.latitudes, self.locations.longitudes)
+        return ((loc.id, loc.name, loc.latitude, loc.longitude) for loc in self.locations)
+    
+    def _coordinate_bounds(self):
+        """Get padded (min_lat, max_lat, min_lon, max_lon) bounds of the locations."""
+        if isinstance(self.locations, LocationTable):
+            latitudes = self.locations.latitudes
+            longitudes = self.locations.longitudes
+        else:
+            latitudes = [loc.latitude for loc in self.locations]
+            longitudes = [loc.longitude for loc in self.locations]
         
         # Get min/max coordinates to scale the map
-        min_lat = min(loc.latitude for loc in self.locations)
-        max_lat = max(loc.latitude for loc in self.locations)
-        min_lon = min(loc.longitude for loc in self.locations)
-        max_lon = max(loc.longitude for loc in self.locations)
+        min_lat = min(latitudes)
+        max_lat = max(latitudes)
+        min_lon = min(longitudes)
+        max_lon = max(longitudes)
         
         # Add padding
         lat_padding = (max_lat - min_lat) * 0.1 if max_lat != min_lat else 0.1
         lon_padding = (max_lon - min_lon) * 0.1 if max_lon != min_lon else 0.1
         
-        min_lat -= lat_padding
-        max_lat += lat_padding
-        min_lon -= lon_padding
-        max_lon += lon_padding
+        return (min_lat - lat_padding, max_lat + lat_padding,
+                min_lon - lon_padding, max_lon + lon_padding)
+    
+    def _update_canvas(self, *args):
+        """Update the canvas with the current locations."""
+        self.canvas.clear()
+        
+        if not len(self.locations):
+            return
+        
+        min_lat, max_lat, min_lon, max_lon = self._coordinate_bounds()
+        
+        # Map every location to a widget position once
+        points = [
+            (location_id, name, self._map_coords_to_pos(
+                latitude, longitude, min_lat, max_lat, min_lon, max_lon
+            ))
+            for location_id, name, latitude, longitude in self._location_rows()
+        ]
         
         # Draw background
         with self.canvas:
@@ -60,33 +84,17 @@ class TripMapView(Widget):
             Rectangle(pos=self.pos, size=self.size)
         
         # Draw connections between points if multiple locations
-        if len(self.locations) > 1:
+        if len(points) > 1:
             with self.canvas:
                 Color(0.5, 0.5, 0.8, 0.7)
-                for i in range(len(self.locations) - 1):
-                    start = self._map_coords_to_pos(
-                        self.locations[i].latitude,
-                        self.locations[i].longitude,
-                        min_lat, max_lat, min_lon, max_lon
-                    )
-                    end = self._map_coords_to_pos(
-                        self.locations[i+1].latitude,
-                        self.locations[i+1].longitude,
-                        min_lat, max_lat, min_lon, max_lon
-                    )
+                for (_, _, start), (_, _, end) in zip(points, points[1:]):
                     Line(points=[start[0], start[1], end[0], end[1]], width=2)
         
         # Draw points
-        for i, location in enumerate(self.locations):
-            x, y = self._map_coords_to_pos(
-                location.latitude,
-                location.longitude,
-                min_lat, max_lat, min_lon, max_lon
-            )
-            
+        for i, (location_id, name, (x, y)) in enumerate(points):
             with self.canvas:
                 # Draw point
-                if self.selected_location == location.id:
+                if self.selected_location == location_id:
                     Color(0.9, 0.3, 0.3, 1)  # Selected location
                 else:
                     Color(0.3, 0.3, 0.9, 1)  # Normal location
@@ -100,7 +108,7 @@ class TripMapView(Widget):
                 # Draw label
                 Color(0, 0, 0, 1)
                 label = Label(
-                    text=f"{i+1}. {location.name}",
+                    text=f"{i+1}. {name}",
                     font_size='10sp',
                     color=(0, 0, 0, 1),
                     pos=(x + 5, y - 5),
@@ -127,30 +135,17 @@ class TripMapView(Widget):
     
     def on_touch_down(self, touch):
         """Handle touch events to select locations."""
-        if self.collide_point(*touch.pos) and self.locations:
-            # Get min/max coordinates
-            min_lat = min(loc.latitude for loc in self.locations)
-            max_lat = max(loc.latitude for loc in self.locations)
-            min_lon = min(loc.longitude for loc in self.locations)
-            max_lon = max(loc.longitude for loc in self.locations)
-            
-            # Add padding
-            lat_padding = (max_lat - min_lat) * 0.1 if max_lat != min_lat else 0.1
-            lon_padding = (max_lon - min_lon) * 0.1 if max_lon != min_lon else 0.1
-            
-            min_lat -= lat_padding
-            max_lat += lat_padding
-            min_lon -= lon_padding
-            max_lon += lon_padding
+        if self.collide_point(*touch.pos) and len(self.locations):
+            min_lat, max_lat, min_lon, max_lon = self._coordinate_bounds()
             
             # Find closest location
             closest_location = None
             min_distance = float('inf')
             
-            for location in self.locations:
+            for location_id, _, latitude, longitude in self._location_rows():
                 loc_x, loc_y = self._map_coords_to_pos(
-                    location.latitude,
-                    location.longitude,
+                    latitude,
+                    longitude,
                     min_lat, max_lat, min_lon, max_lon
                 )
                 
@@ -158,10 +153,10 @@ class TripMapView(Widget):
                 
                 if distance < min_distance and distance < 20:  # 20 pixels threshold
                     min_distance = distance
-                    closest_location = location
+                    closest_location = location_id
             
-            if closest_location:
-                self.selected_location = closest_location.id
+            if closest_location is not None:
+                self.selected_location = closest_location
                 self._update_canvas()
                 return True
         
@@ -289,7 +284,8 @@ class TripPlannerView(BoxLayout):
                  on_edit_trip: Callable[[Trip], None],
                  on_delete_trip: Callable[[Trip], None],
                  on_show_details: Callable[[Trip], None],
-                 on_optimize_route: Callable[[Trip], None], **kwargs):
+                 on_optimize_route: Callable[[Trip], None],
+                 on_load_more: Optional[Callable[[], None]] = None, **kwargs):
         super().__init__(orientation='vertical', **kwargs)
         self.padding = dp(10)
         self.spacing = dp(10)
@@ -300,6 +296,15 @@ class TripPlannerView(BoxLayout):
         self.on_delete_trip = on_delete_trip
         self.on_show_details = on_show_details
         self.on_optimize_route = on_optimize_route
+        self.on_load_more = on_load_more
+        
+        # Button shown below the trip list while more pages can be loaded
+        self.load_more_button = Button(
+            text='Load more trips',
+            size_hint_y=None,
+            height=dp(40)
+        )
+        self.load_more_button.bind(on_press=lambda x: self._handle_load_more())
         
         # App title
         title_layout = BoxLayout(
@@ -349,6 +354,7 @@ class TripPlannerView(BoxLayout):
         self.add_widget(list_label)
         
         scroll_view = ScrollView()
+        scroll_view.bind(scroll_y=self._on_scroll)
         self.trip_list = GridLayout(
             cols=1,
             spacing=dp(5),
@@ -365,8 +371,24 @@ class TripPlannerView(BoxLayout):
         if destination and self.on_add_trip:
             self.on_add_trip(destination)
     
-    def update_trip_list(self, trips: List[Trip]):
-        """Update the trip list with new data."""
+    def _on_scroll(self, scroll_view, scroll_y):
+        """Load the next page of trips when the list is scrolled to the bottom."""
+        if scroll_y <= 0:
+            self._handle_load_more()
+    
+    def _handle_load_more(self):
+        """Handle a request for the next page of trips."""
+        if self.load_more_button.parent is not None and self.on_load_more:
+            self.on_load_more()
+    
+    def update_trip_list(self, trips: List[Trip], has_more: bool = False):
+        """
+        Replace the trip list with new data.
+        
+        Args:
+            trips: First page of trips to show
+            has_more: Whether more trips can be loaded after these
+        """
         self.trip_list.clear_widgets()
         
         if not trips:
@@ -377,6 +399,19 @@ class TripPlannerView(BoxLayout):
             ))
             return
         
+        self.append_trips(trips, has_more)
+    
+    def append_trips(self, trips: List[Trip], has_more: bool = False):
+        """
+        Add a page of trips to the end of the trip list.
+        
+        Args:
+            trips: Trips to add
+            has_more: Whether more trips can be loaded after these
+        """
+        if self.load_more_button.parent is not None:
+            self.trip_list.remove_widget(self.load_more_button)
+        
         for trip in trips:
             trip_item = TripItem(
                 trip=trip,
@@ -385,4 +420,7 @@ class TripPlannerView(BoxLayout):
                 on_show_details=self.on_show_details,
                 on_optimize_route=self.on_optimize_route
             )
-            self.trip_list.add_widget(trip_item) 
+            self.trip_list.add_widget(trip_item)
+        
+        if has_more:
+            self.trip_list.add_widget(self.load_more_button)
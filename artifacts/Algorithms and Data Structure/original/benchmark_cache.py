@@ -0,0 +1,158 @@
+"""
+Benchmarks for the cache module.
+
+Run directly to print timings:
+    python benchmark_cache.py
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Iterable, List
+
+from cache import JournaledCache, LRUCache, PersistentCache, SQLiteCache, WTinyLFUPolicy
+
+
+def make_value(i: int) -> dict:
+    """Build a trip-sized value to cache."""
+    return {
+        "id": i,
+        "destination": f"Destination {i}",
+        "locations": [{"id": j, "latitude": 40.0 + j / 100, "longitude": -74.0} for j in range(5)]
+    }
+
+
+def benchmark_cold_start(sizes=(1000, 10000, 100000), lookups: int = 100) -> None:
+    """Compare the time to open a populated cache and read a few entries."""
+    print(f"Cache cold start ({lookups} lookups after opening)")
+    backends = [
+        ("JSON snapshot", PersistentCache, "cache.json"),
+        ("journal", JournaledCache, "cache.json"),
+        ("SQLite", SQLiteCache, "cache.db"),
+    ]
+
+    for size in sizes:
+        timings = []
+        for name, cache_class, basename in backends:
+            directory = tempfile.mkdtemp()
+            try:
+                filename = os.path.join(directory, basename)
+                cache = cache_class(size, filename, write_behind=True,
+                                    flush_threshold=size, flush_interval=3600)
+                for i in range(size):
+                    cache.put(str(i), make_value(i))
+                cache.flush()
+                if isinstance(cache, JournaledCache):
+                    cache.compact()
+                if isinstance(cache, SQLiteCache):
+                    cache.close()
+
+                start = time.perf_counter()
+                reopened = cache_class(size, filename)
+                for i in range(0, size, max(1, size // lookups)):
+                    reopened.get(str(i))
+                timings.append(f"{name} {time.perf_counter() - start:.3f}s")
+                if isinstance(reopened, SQLiteCache):
+                    reopened.close()
+            finally:
+                shutil.rmtree(directory)
+
+        print(f"  entries={size:>7}: " + ", ".join(timings))
+
+
+def benchmark_put_latency(sizes=(100, 1000, 5000), puts: int = 200) -> None:
+    """Compare per-put cost as the cache grows."""
+    print(f"Durable put latency ({puts} puts into a full cache)")
+    backends = [
+        ("JSON snapshot", PersistentCache, "cache.json"),
+        ("journal", JournaledCache, "cache.json"),
+        ("SQLite", SQLiteCache, "cache.db"),
+    ]
+
+    for size in sizes:
+        timings = []
+        for name, cache_class, basename in backends:
+            directory = tempfile.mkdtemp()
+            try:
+                filename = os.path.join(directory, basename)
+                loader = cache_class(size, filename, write_behind=True,
+                                     flush_threshold=size, flush_interval=3600)
+                for i in range(size):
+                    loader.put(str(i), make_value(i))
+                loader.flush()
+                if isinstance(loader, SQLiteCache):
+                    loader.close()
+
+                cache = cache_class(size, filename)
+
+                start = time.perf_counter()
+                for i in range(puts):
+                    cache.put(str(size + i), make_value(i))
+                elapsed = time.perf_counter() - start
+                timings.append(f"{name} {elapsed / puts * 1000:.2f}ms")
+                if isinstance(cache, SQLiteCache):
+                    cache.close()
+            finally:
+                shutil.rmtree(directory)
+
+        print(f"  entries={size:>6}: " + ", ".join(timings))
+
+
+def load_trace(filename: str) -> List[str]:
+    """Load a recorded access trace with one cache key per line."""
+    with open(filename) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def listing_trace(trips: int = 500, hot: int = 30, requests: int = 20000,
+                  listing_every: int = 1000, seed: int = 1) -> List[str]:
+    """
+    Generate a trace of trip lookups where most requests go to a few hot
+    trips and a full listing (get_all_trips) regularly walks every trip.
+    """
+    rng = random.Random(seed)
+    trace = []
+    for i in range(requests):
+        if i % listing_every == 0:
+            trace.extend(str(trip_id) for trip_id in range(trips))
+        if rng.random() < 0.8:
+            trace.append(str(rng.randrange(hot)))
+        else:
+            trace.append(str(rng.randrange(trips)))
+    return trace
+
+
+def hit_ratio(cache: LRUCache, trace: Iterable[str]) -> float:
+    """Replay a trace through a cache, loading every miss, and return the hit ratio."""
+    hits = total = 0
+    for key in trace:
+        total += 1
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.put(key, key)
+    return hits / total if total else 0.0
+
+
+def benchmark_eviction_policies(trace: List[str], capacities=(50, 100, 200)) -> None:
+    """Compare the hit ratio of the eviction policies on an access trace."""
+    policies: List[tuple] = [
+        ("LRU", lambda capacity: None),
+        ("W-TinyLFU", lambda capacity: WTinyLFUPolicy(capacity)),
+    ]
+    print(f"Eviction policy hit ratio ({len(trace)} accesses)")
+    for capacity in capacities:
+        results = []
+        for name, make_policy in policies:
+            cache = LRUCache[str](capacity, policy=make_policy(capacity))
+            results.append(f"{name} {hit_ratio(cache, trace) * 100:.1f}%")
+        print(f"  capacity={capacity:>4}: " + ", ".join(results))
+
+
+if __name__ == "__main__":
+    benchmark_cold_start()
+    benchmark_put_latency()
+    # Pass a recorded trace file to replay it instead of the synthetic one
+    benchmark_eviction_policies(load_trace(sys.argv[1]) if len(sys.argv) > 1 else listing_trace())
@@ -0,0 +1,158 @@
+"""
+Benchmarks for the pathfinding module.
+
+Run directly to print timings:
+    python benchmark_pathfinding.py
+"""
+import heapq
+import random
+import time
+from typing import Dict, List, Set
+
+from distance import np
+from distance import HAVERSINE, matrix_rows
+from pathfinding import Location, PathFinder, PathNode, location_distance_matrix
+from route_optimizer import RouteOptimizer
+
+
+class ReheapifyPathFinder(PathFinder):
+    """
+    Reference A* that updates nodes in place and re-heapifies the open set
+    on every improvement, as PathFinder did before lazy deletion.
+    """
+
+    def find_path(self, start_id: int, goal_id: int) -> List[Location]:
+        start_location = self._get_location_by_id(start_id)
+        goal_location = self._get_location_by_id(goal_id)
+        if not start_location or not goal_location:
+            return []
+
+        start_node = PathNode(location=start_location, g_score=0,
+                              h_score=start_location.distance_to(goal_location))
+        open_set = [start_node]
+        closed_set: Set[int] = set()
+        node_map: Dict[int, PathNode] = {start_id: start_node}
+
+        while open_set:
+            current = heapq.heappop(open_set)
+            current_id = current.location.id
+            if current_id == goal_id:
+                return self._reconstruct_path(current)
+            closed_set.add(current_id)
+
+            for neighbor_id, distance in self._neighbors(current.location):
+                if neighbor_id in closed_set:
+                    continue
+                tentative_g_score = current.g_score + distance
+                if neighbor_id in node_map:
+                    if tentative_g_score >= node_map[neighbor_id].g_score:
+                        continue
+                    neighbor_node = node_map[neighbor_id]
+                    neighbor_node.parent = current
+                    neighbor_node.g_score = tentative_g_score
+                    neighbor_node.sort_index = tentative_g_score + neighbor_node.h_score
+                    heapq.heapify(open_set)
+                else:
+                    neighbor_location = self._get_location_by_id(neighbor_id)
+                    neighbor_node = PathNode(
+                        location=neighbor_location,
+                        parent=current,
+                        g_score=tentative_g_score,
+                        h_score=neighbor_location.distance_to(goal_location)
+                    )
+                    node_map[neighbor_id] = neighbor_node
+                    heapq.heappush(open_set, neighbor_node)
+        return []
+
+
+def make_locations(count: int, seed: int = 1) -> List[Location]:
+    """Generate random locations spread over roughly one degree square."""
+    rng = random.Random(seed)
+    return [
+        Location(id=i, name=f"Location {i}",
+                 latitude=rng.uniform(40.0, 41.0),
+                 longitude=rng.uniform(-74.5, -73.5))
+        for i in range(1, count + 1)
+    ]
+
+
+def time_queries(path_finder: PathFinder, pairs) -> float:
+    """Time a batch of find_path queries in seconds."""
+    start = time.perf_counter()
+    for start_id, goal_id in pairs:
+        path_finder.find_path(start_id, goal_id)
+    return time.perf_counter() - start
+
+
+def benchmark_open_set(sizes=(1000, 2000, 4000), neighbors: int = 32, queries: int = 20) -> None:
+    """Compare lazy-deletion A* with the re-heapify variant on dense neighbour graphs."""
+    print(f"A* open set ({neighbors} neighbours per location, {queries} queries)")
+    for size in sizes:
+        locations = make_locations(size)
+        rng = random.Random(size)
+        pairs = [(rng.randint(1, size), rng.randint(1, size)) for _ in range(queries)]
+
+        lazy = time_queries(PathFinder(locations, neighbors=neighbors), pairs)
+        reheapify = time_queries(ReheapifyPathFinder(locations, neighbors=neighbors), pairs)
+        print(f"  n={size:>6}: lazy deletion {lazy:.3f}s, "
+              f"re-heapify {reheapify:.3f}s ({reheapify / lazy:.1f}x)")
+
+
+def benchmark_bidirectional(size: int = 20000, neighbors: int = 8, queries: int = 20) -> None:
+    """Compare unidirectional and bidirectional A* on long queries."""
+    locations = make_locations(size)
+    path_finder = PathFinder(locations, neighbors=neighbors)
+    # Pair locations from opposite corners so every query crosses the map
+    by_corner = sorted(locations, key=lambda loc: loc.latitude + loc.longitude)
+    pairs = [(by_corner[i].id, by_corner[-1 - i].id) for i in range(queries)]
+
+    # Build the incoming edge lists outside the timed loop
+    path_finder.find_path_bidirectional(*pairs[0])
+
+    unidirectional = time_queries(path_finder, pairs)
+    start = time.perf_counter()
+    for start_id, goal_id in pairs:
+        path_finder.find_path_bidirectional(start_id, goal_id)
+    bidirectional = time.perf_counter() - start
+
+    print(f"Long queries (n={size}, {neighbors} neighbours, {queries} queries)")
+    print(f"  A* {unidirectional:.3f}s, bidirectional A* {bidirectional:.3f}s "
+          f"({unidirectional / bidirectional:.1f}x)")
+
+
+def benchmark_distance_matrix(size: int = 5000) -> None:
+    """Compare the batched distance matrix with per-pair distance_to calls."""
+    locations = make_locations(size)
+    backend = "NumPy" if np is not None else "pure Python"
+
+    start = time.perf_counter()
+    location_distance_matrix(locations)
+    batched = time.perf_counter() - start
+
+    # Time a slice of the scalar loop and extrapolate to the full matrix
+    sample = locations[:max(1, size // 50)]
+    start = time.perf_counter()
+    for loc in sample:
+        for other in locations:
+            loc.distance_to(other)
+    scalar = (time.perf_counter() - start) * size / len(sample)
+
+    print(f"Distance matrix (n={size}, {backend})")
+    print(f"  batched {batched:.3f}s, distance_to loop ~{scalar:.3f}s ({scalar / batched:.1f}x)")
+
+
+def benchmark_route_optimizer(sizes=(50, 200, 400), time_budget: float = 1.0) -> None:
+    """Report route length before and after 2-opt/Or-opt improvement."""
+    print(f"Route optimizer (time budget {time_budget:.1f}s)")
+    for size in sizes:
+        matrix = matrix_rows(location_distance_matrix(make_locations(size), HAVERSINE))
+        result = RouteOptimizer(time_budget=time_budget).optimize(matrix)
+        print(f"  stops={size:>4}: {result.initial_length:.1f} km -> {result.final_length:.1f} km "
+              f"({result.improvement * 100:.1f}% shorter) in {result.elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_open_set()
+    benchmark_bidirectional()
+    benchmark_distance_matrix()
+    benchmark_route_optimizer()
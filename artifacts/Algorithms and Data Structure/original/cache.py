@@ -1,70 +1,566 @@
-from typing import Dict, TypeVar, Generic, Optional, Callable, Any, List, Tuple
+from typing import Dict, TypeVar, Generic, Optional, Callable, Any, Hashable, Iterable, List, Tuple
 from collections import OrderedDict
 import time
 from functools import wraps
+import atexit
 import json
 import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import weakref
 
 # Type variable for cache values
 T = TypeVar('T')
 
+# Sentinel for cache misses, so that None results can be cached
+_MISSING = object()
+
+
+def deep_sizeof(value: Any) -> int:
+    """
+    Estimate the memory used by a value and everything it references, in
+    bytes. Follows containers, instance dictionaries and slots; shared
+    objects are counted once. Suitable as a cache weigher.
+    """
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        
+        if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), '__slots__', ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
+class EvictionPolicy:
+    """
+    Strategy that decides which item a full cache evicts.
+    
+    The cache calls the record_* hooks with its lock held, so policies need
+    no locking of their own. A policy instance tracks the keys of exactly
+    one cache and must not be shared.
+    """
+    
+    name = "policy"
+    
+    def record_insert(self, key: str) -> None:
+        """Called after a new key is added to the cache."""
+    
+    def record_access(self, key: str) -> None:
+        """Called when a cached key is read or overwritten."""
+    
+    def record_remove(self, key: str) -> None:
+        """Called after a key leaves the cache for any reason."""
+    
+    def clear(self) -> None:
+        """Called when the cache is cleared."""
+    
+    def victim(self, candidate: str, entries: 'OrderedDict[str, Any]') -> str:
+        """
+        Choose the key to evict so that `candidate` can be inserted.
+        
+        Args:
+            candidate: Key about to be inserted
+            entries: The cache entries, least recently used first
+        
+        Returns:
+            A key currently in the cache
+        """
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    """
+    Evicts the least recently used item.
+    The cache's entries are already kept in recency order, so this policy
+    needs no bookkeeping of its own.
+    """
+    
+    name = "lru"
+    
+    def victim(self, candidate, entries):
+        return next(iter(entries))
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of approximate access frequencies with 4-bit counters.
+    Counters are halved every `sample_size` increments so that old
+    popularity fades.
+    """
+    
+    depth = 4
+    max_count = 15
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize the sketch.
+        
+        Args:
+            capacity: Number of items the owning cache holds
+        """
+        width = 16
+        while width < 4 * capacity:
+            width *= 2
+        self.mask = width - 1
+        self.table = [[0] * width for _ in range(self.depth)]
+        self.sample_size = 10 * capacity
+        self.additions = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        return [hash((row, key)) & self.mask for row in range(self.depth)]
+    
+    def increment(self, key: str) -> None:
+        """Count one access to a key."""
+        for row, index in zip(self.table, self._indexes(key)):
+            if row[index] < self.max_count:
+                row[index] += 1
+        
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.additions //= 2
+            for row in self.table:
+                row[:] = [count >> 1 for count in row]
+    
+    def frequency(self, key: str) -> int:
+        """Estimate how often a key has been accessed."""
+        return min(row[index] for row, index in zip(self.table, self._indexes(key)))
+
+
+class WTinyLFUPolicy(EvictionPolicy):
+    """
+    Scan-resistant W-TinyLFU eviction.
+    
+    New keys enter a small LRU window. Keys pushed out of the window compete
+    with the oldest key of the main area, a segmented LRU with probation and
+    protected segments, and the one accessed less often according to a
+    frequency sketch is evicted. A burst of one-off keys such as a full
+    listing therefore cycles through the window instead of flushing the
+    frequently used keys in the main area.
+    """
+    
+    name = "w-tinylfu"
+    
+    def __init__(self, capacity: int, window_ratio: float = 0.01, protected_ratio: float = 0.8):
+        """
+        Initialize the policy.
+        
+        Args:
+            capacity: Capacity of the cache using this policy
+            window_ratio: Share of the capacity used by the admission window
+            protected_ratio: Share of the main area reserved for keys accessed more than once
+        """
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be positive")
+        
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.protected_capacity = max(1, int((capacity - self.window_capacity) * protected_ratio))
+        self.sketch = FrequencySketch(capacity)
+        self.window: OrderedDict[str, None] = OrderedDict()
+        self.probation: OrderedDict[str, None] = OrderedDict()
+        self.protected: OrderedDict[str, None] = OrderedDict()
+    
+    def record_insert(self, key):
+        self.sketch.increment(key)
+        self.window[key] = None
+        # Outside of eviction, keys leaving the window move to probation
+        while len(self.window) > self.window_capacity:
+            demoted, _ = self.window.popitem(last=False)
+            self.probation[demoted] = None
+    
+    def record_access(self, key):
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            # A second access promotes the key to the protected segment
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_capacity:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+    
+    def record_remove(self, key):
+        self.window.pop(key, None)
+        self.probation.pop(key, None)
+        self.protected.pop(key, None)
+    
+    def clear(self):
+        self.window.clear()
+        self.probation.clear()
+        self.protected.clear()
+    
+    def victim(self, candidate, entries):
+        main = self.probation or self.protected
+        if not main:
+            # Weight limits can fill the cache before the window does
+            return next(iter(self.window))
+        if len(self.window) < self.window_capacity or not self.window:
+            return next(iter(main))
+        
+        # The window's oldest key must leave the window to make room for the
+        # candidate; it only stays in the cache if it is used more often
+        # than the main area's eviction candidate.
+        window_victim = next(iter(self.window))
+        main_victim = next(iter(main))
+        if self.sketch.frequency(window_victim) > self.sketch.frequency(main_victim):
+            del self.window[window_victim]
+            self.probation[window_victim] = None
+            return main_victim
+        return window_victim
+
+class LatencyHistogram:
+    """
+    Histogram of operation latencies in power-of-two microsecond buckets.
+    Recording is O(1); percentiles are reported as bucket upper bounds.
+    """
+    
+    buckets = 24  # Up to ~8 seconds
+    
+    def __init__(self):
+        self.counts = [0] * self.buckets
+        self.count = 0
+        self.total = 0.0
+    
+    def record(self, seconds: float) -> None:
+        """Add one latency measurement."""
+        micros = int(seconds * 1_000_000)
+        self.counts[min(micros.bit_length(), self.buckets - 1)] += 1
+        self.count += 1
+        self.total += seconds
+    
+    def percentile(self, fraction: float) -> float:
+        """Get the latency in microseconds below which `fraction` of measurements fall."""
+        threshold = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= threshold:
+                return float(1 << bucket)
+        return 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Summarize the histogram.
+        
+        Returns:
+            Dictionary with count, mean, p50, p99 and max bucket in microseconds
+        """
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count * 1_000_000,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "max_us": self.percentile(1.0)
+        }
+
+
+class _PendingLoad:
+    """A value being loaded by `get_or_load`, which other callers can wait for."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+    
+    def result(self) -> Any:
+        """Wait for the load to finish and return its value or raise its error."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
 class LRUCache(Generic[T]):
     """
     Least Recently Used (LRU) cache implementation.
     Automatically evicts least recently used items when capacity is reached.
     
     This implementation uses an OrderedDict to track insertion/access order.
+    Every operation holds a reentrant lock, so one cache can be shared by the
+    UI thread and background workers.
+    
+    Entries can be given a time to live, either for the whole cache or per
+    `put`. Expired entries are dropped when they are next read, and an
+    optional sweeper thread purges the ones nobody reads.
+    
+    Hit, miss, insert, eviction and expiration counters are always kept;
+    get/put latency histograms are optional since timing every call has a
+    cost of its own.
+    
+    With a weigher, the cache also keeps the total weight of its items (for
+    example their size in bytes) within `max_weight`, evicting as many
+    items as needed to fit a new one.
     """
     
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, ttl: Optional[float] = None,
+                 sweep_interval: Optional[float] = None,
+                 policy: Optional[EvictionPolicy] = None,
+                 track_latency: bool = False,
+                 weigher: Optional[Callable[[T], int]] = None,
+                 max_weight: Optional[int] = None):
         """
         Initialize LRU cache with a maximum capacity.
         
         Args:
             capacity: Maximum number of items to store in the cache
+            ttl: Optional default seconds an item stays valid after it is put
+            sweep_interval: Optional seconds between background purges of expired items
+            policy: Optional eviction policy (least recently used by default)
+            track_latency: Record get/put latency histograms
+            weigher: Optional function giving the weight of a value, such as deep_sizeof
+            max_weight: Maximum total weight of the cached items (requires a weigher)
         """
         if capacity <= 0:
             raise ValueError("Cache capacity must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        if max_weight is not None and (weigher is None or max_weight <= 0):
+            raise ValueError("Cache max weight must be positive and needs a weigher")
         
         self.capacity = capacity
+        self.ttl = ttl
+        self.policy = policy or LRUPolicy()
+        self.weigher = weigher
+        self.max_weight = max_weight
+        # Weights of the cached items, only kept when there is a weigher
+        self.weights: Dict[str, int] = {}
+        self.total_weight = 0
         self.cache: OrderedDict[str, Tuple[T, float]] = OrderedDict()
+        # Put times in put order, so the oldest item is found in O(1)
+        self._put_times: Dict[str, float] = {}
+        # Expiry deadlines, only for items that have a TTL
+        self._expires_at: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        # Loads started by get_or_load that have not finished yet
+        self._loads: Dict[str, _PendingLoad] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        self.reset_stats()
+        
+        self.latency: Dict[str, LatencyHistogram] = {}
+        if track_latency:
+            # Wrap the bound methods so that subclass overrides, including
+            # their disk I/O, are timed as a whole
+            for name in ("get", "put"):
+                histogram = self.latency[name] = LatencyHistogram()
+                setattr(self, name, _timed(getattr(self, name), histogram))
+        
+        if sweep_interval is not None:
+            self.start_sweeper(sweep_interval)
+    
+    def reset_stats(self) -> None:
+        """Reset the hit, miss, insert, eviction and expiration counters."""
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _is_expired(self, key: str, now: Optional[float] = None) -> bool:
+        """Check whether an item has outlived its TTL."""
+        deadline = self._expires_at.get(key)
+        return deadline is not None and (now or time.time()) >= deadline
+    
+    def _discard_expired(self, keys: List[str]) -> int:
+        """
+        Remove items that are still expired. Goes through `remove` so that
+        subclasses persist the removal; called without the lock held.
+        
+        Returns:
+            Number of items removed
+        """
+        now = time.time()
+        removed = sum(1 for key in keys if self._is_expired(key, now) and self.remove(key))
+        with self._lock:
+            self.expirations += removed
+        return removed
     
-    def get(self, key: str) -> Optional[T]:
+    def get(self, key: str, default: Any = None) -> Optional[T]:
         """
         Get an item from the cache.
         
         Args:
             key: Cache key to lookup
+            default: Value to return on a miss, for caches that may hold None
             
         Returns:
-            The cached value or None if not in cache
+            The cached value or `default` if not in cache
         """
-        if key not in self.cache:
-            return None
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            if not self._is_expired(key):
+                # Move accessed item to the end to mark as most recently used.
+                # The timestamp stays the put time, which expiry is based on.
+                self.cache.move_to_end(key)
+                self.policy.record_access(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
         
-        # Move accessed item to the end to mark as most recently used
-        value, _ = self.cache.pop(key)
-        self.cache[key] = (value, time.time())
-        return value
+        self._discard_expired([key])
+        return default
     
-    def put(self, key: str, value: T) -> None:
+    def get_or_load(self, key: str, loader: Callable[[str], Optional[T]],
+                    ttl: Optional[float] = None) -> Optional[T]:
+        """
+        Get an item, loading and caching it on a miss.
+        
+        Concurrent misses for the same key share a single call to the
+        loader: the first caller runs it and the others wait for its result,
+        or get its exception if it fails. The loader runs without the cache
+        lock held, so loads of different keys run in parallel. If the key is
+        removed or the cache cleared while the loader runs, its result is
+        returned but not cached, and later callers start a fresh load.
+        
+        Args:
+            key: Cache key to lookup
+            loader: Function called with the key to produce the value
+            ttl: Optional seconds the loaded item stays valid
+            
+        Returns:
+            The cached or loaded value; None results are returned but not cached
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        with self._lock:
+            # A load may have finished between the miss and taking the lock
+            cached = key in self.cache and not self._is_expired(key)
+            load = self._loads.get(key)
+            leader = load is None and not cached
+            if leader:
+                load = self._loads[key] = _PendingLoad()
+        if cached:
+            return self.get_or_load(key, loader, ttl)
+        if not leader:
+            return load.result()
+        
+        try:
+            load.value = loader(key)
+            if load.value is not None:
+                self._store_load(key, load, ttl)
+            return load.value
+        except BaseException as e:
+            load.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._loads.get(key) is load:
+                    del self._loads[key]
+            load.done.set()
+    
+    def _store_load(self, key: str, load: _PendingLoad, ttl: Optional[float]) -> bool:
+        """
+        Cache the value of a finished load unless `remove` or `clear`
+        dropped the load while it ran, so that a value read before an
+        update is not cached after it.
+        
+        Returns:
+            True if the value was cached
+        """
+        with self._lock:
+            if self._loads.get(key) is not load:
+                return False
+            LRUCache.put(self, key, load.value, ttl)
+            return True
+    
+    def put(self, key: str, value: T, ttl: Optional[float] = None) -> None:
         """
         Add an item to the cache.
         
         Args:
             key: Cache key
             value: Value to cache
+            ttl: Optional seconds the item stays valid, overriding the cache TTL
         """
-        # If key exists, update it and move to end
-        if key in self.cache:
-            self.cache.pop(key)
-        
-        # If at capacity, remove least recently used item (first item)
-        elif len(self.cache) >= self.capacity:
-            self.cache.popitem(last=False)
+        with self._lock:
+            weight = self.weigher(value) if self.weigher is not None else 0
+            if self.max_weight is not None and weight > self.max_weight:
+                # Too heavy to ever fit; drop the old value rather than serve it stale
+                if key in self.cache:
+                    self._evict(key)
+                return
+            
+            # If key exists, update it and move to end
+            is_new = key not in self.cache
+            admit = is_new
+            if not is_new:
+                self.cache.pop(key)
+                self.total_weight -= self.weights.pop(key, 0)
+                if self._needs_room(weight):
+                    # Re-admit it as a new key so the policy cannot pick it as the victim
+                    self.policy.record_remove(key)
+                    admit = True
+                else:
+                    self.policy.record_access(key)
+            
+            # If at capacity, evict the items chosen by the policy
+            if admit:
+                while self.cache and self._needs_room(weight):
+                    self._evict(self.policy.victim(key, self.cache))
+                self.policy.record_insert(key)
+                if is_new:
+                    self.inserts += 1
+            
+            # Add new item
+            now = time.time()
+            self.cache[key] = (value, now)
+            self._put_times.pop(key, None)
+            self._put_times[key] = now
+            if self.weigher is not None:
+                self.weights[key] = weight
+                self.total_weight += weight
+            ttl = ttl if ttl is not None else self.ttl
+            if ttl is not None:
+                self._expires_at[key] = now + ttl
+            else:
+                self._expires_at.pop(key, None)
+    
+    def put_many(self, items: Iterable[Tuple[str, T]], ttl: Optional[float] = None) -> None:
+        """
+        Add several items to the cache under a single lock acquisition.
         
-        # Add new item
-        self.cache[key] = (value, time.time())
+        Args:
+            items: Iterable of (key, value) pairs
+            ttl: Optional seconds the items stay valid, overriding the cache TTL
+        """
+        with self._lock:
+            for key, value in items:
+                self.put(key, value, ttl)
+    
+    def _needs_room(self, weight: int) -> bool:
+        """Check whether items must be evicted before adding one of the given weight."""
+        if len(self.cache) >= self.capacity:
+            return True
+        return self.max_weight is not None and self.total_weight + weight > self.max_weight
     
     def remove(self, key: str) -> bool:
         """
@@ -76,14 +572,71 @@ class LRUCache(Generic[T]):
         Returns:
             True if key was in cache and removed, False otherwise
         """
-        if key in self.cache:
-            self.cache.pop(key)
+        with self._lock:
+            # A load still running for the key read the value being removed
+            self._loads.pop(key, None)
+            if self.cache.pop(key, None) is None:
+                return False
+            self._put_times.pop(key, None)
+            self.total_weight -= self.weights.pop(key, 0)
+            self._expires_at.pop(key, None)
+            self.policy.record_remove(key)
             return True
-        return False
+    
+    def _evict(self, key: str) -> None:
+        """Drop an item to make room for a new one (caller holds the lock)."""
+        del self.cache[key]
+        self._put_times.pop(key, None)
+        self.total_weight -= self.weights.pop(key, 0)
+        self._expires_at.pop(key, None)
+        self.policy.record_remove(key)
+        self.evictions += 1
     
     def clear(self) -> None:
         """Clear all items from the cache."""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self._put_times.clear()
+            self.weights.clear()
+            self.total_weight = 0
+            self._expires_at.clear()
+            self.policy.clear()
+            self._loads.clear()
+    
+    def purge_expired(self) -> int:
+        """
+        Remove every expired item.
+        
+        Returns:
+            Number of items removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, deadline in self._expires_at.items() if now >= deadline]
+        return self._discard_expired(expired)
+    
+    def start_sweeper(self, interval: float) -> None:
+        """
+        Purge expired items on a background thread every `interval` seconds.
+        
+        Args:
+            interval: Seconds between purges
+        """
+        if interval <= 0:
+            raise ValueError("Sweep interval must be positive")
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(
+            target=_sweep, args=(weakref.ref(self), self._stop_sweeper, interval), daemon=True
+        )
+        self._sweeper.start()
+    
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper if it is running."""
+        self._stop_sweeper.set()
+        self._sweeper = None
     
     def get_all_items(self) -> List[Tuple[str, T]]:
         """
@@ -92,7 +645,8 @@ class LRUCache(Generic[T]):
         Returns:
             List of tuples containing (key, value) pairs
         """
-        return [(key, value) for key, (value, _) in self.cache.items()]
+        with self._lock:
+            return [(key, value) for key, (value, _) in self.cache.items()]
     
     def size(self) -> int:
         """
@@ -108,28 +662,86 @@ class LRUCache(Generic[T]):
         Get cache statistics.
         
         Returns:
-            Dictionary with stats including size, capacity, and age of oldest item
+            Dictionary with stats including size, capacity, age of oldest item,
+            hit/miss/insert/eviction/expiration counts and latency histograms
         """
-        stats = {
-            "size": len(self.cache),
-            "capacity": self.capacity,
-            "utilization": len(self.cache) / self.capacity if self.capacity > 0 else 0
-        }
-        
-        if self.cache:
-            oldest_time = min(timestamp for _, timestamp in self.cache.values())
-            stats["oldest_item_age"] = time.time() - oldest_time
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self.cache),
+                "capacity": self.capacity,
+                "utilization": len(self.cache) / self.capacity if self.capacity > 0 else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "inserts": self.inserts,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+            
+            if self.weigher is not None:
+                stats["weight"] = self.total_weight
+                stats["max_weight"] = self.max_weight
+            
+            if self._put_times:
+                oldest_time = next(iter(self._put_times.values()))
+                stats["oldest_item_age"] = time.time() - oldest_time
+            
+            for name, histogram in self.latency.items():
+                stats[f"{name}_latency"] = histogram.get_stats()
         
         return stats
 
 
+def _timed(method: Callable, histogram: LatencyHistogram) -> Callable:
+    """Wrap a cache method so every call is recorded in a latency histogram."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.record(time.perf_counter() - start)
+    return wrapper
+
+
+def _sweep(cache_ref: 'weakref.ref[LRUCache]', stop: threading.Event, interval: float) -> None:
+    """Sweeper loop; holds only a weak reference so the cache can be collected."""
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.purge_expired()
+        del cache
+
+
+def _flush_at_exit(cache_ref: 'weakref.ref[PersistentCache]') -> None:
+    """atexit hook saving a write-behind cache if it has not been collected."""
+    cache = cache_ref()
+    if cache is not None:
+        cache.flush()
+
+
 class PersistentCache(LRUCache[T]):
     """
     Extension of LRUCache that persists cache to disk.
+    
+    By default every mutation rewrites the cache file. In write-behind mode
+    mutations only mark the cache dirty, and the file is rewritten once
+    `flush_threshold` mutations have accumulated or `flush_interval` seconds
+    after the first unsaved mutation, whichever comes first. Call `flush()`
+    to save pending changes immediately.
+    
+    Only the default TTL survives a restart: loaded items expire `ttl`
+    seconds after their stored timestamp, which is when they were put.
     """
     
     def __init__(self, capacity: int, filename: str, serialize_fn: Callable[[T], Any] = None, 
-                 deserialize_fn: Callable[[Any], T] = None):
+                 deserialize_fn: Callable[[Any], T] = None, write_behind: bool = False,
+                 flush_interval: float = 1.0, flush_threshold: int = 100,
+                 ttl: Optional[float] = None, sweep_interval: Optional[float] = None,
+                 policy: Optional[EvictionPolicy] = None, track_latency: bool = False,
+                 weigher: Optional[Callable[[T], int]] = None, max_weight: Optional[int] = None):
         """
         Initialize a persistent LRU cache.
         
@@ -138,12 +750,61 @@ class PersistentCache(LRUCache[T]):
             filename: File path to store cache
             serialize_fn: Optional function to serialize values before storing
             deserialize_fn: Optional function to deserialize values after loading
+            write_behind: Batch mutations and save them later instead of on every change
+            flush_interval: Seconds an unsaved mutation may wait in write-behind mode
+            flush_threshold: Number of unsaved mutations that triggers a save in write-behind mode
+            ttl: Optional default seconds an item stays valid after it is put
+            sweep_interval: Optional seconds between background purges of expired items
+            policy: Optional eviction policy (least recently used by default)
+            track_latency: Record get/put latency histograms
+            weigher: Optional function giving the weight of a value, such as deep_sizeof
+            max_weight: Maximum total weight of the cached items (requires a weigher)
         """
-        super().__init__(capacity)
+        super().__init__(capacity, ttl, policy=policy, track_latency=track_latency,
+                         weigher=weigher, max_weight=max_weight)
+        if flush_interval < 0:
+            raise ValueError("Flush interval cannot be negative")
+        if flush_threshold <= 0:
+            raise ValueError("Flush threshold must be positive")
+        
         self.filename = filename
         self.serialize_fn = serialize_fn or (lambda x: x)
         self.deserialize_fn = deserialize_fn or (lambda x: x)
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        
+        # Keeps two flushes from writing the file at the same time. Flushes
+        # take it before the cache lock, never the other way around.
+        self._save_lock = threading.RLock()
+        self._pending = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        
         self._load_cache()
+        # Loaded items are in access order; sort their put times once
+        self._put_times = dict(sorted(
+            ((key, timestamp) for key, (_, timestamp) in self.cache.items()),
+            key=lambda item: item[1]
+        ))
+        for key, (value, timestamp) in self.cache.items():
+            self.policy.record_insert(key)
+            if ttl is not None:
+                self._expires_at[key] = timestamp + ttl
+            if weigher is not None:
+                self.weights[key] = self._loaded_weight(key, value)
+                self.total_weight += self.weights[key]
+        
+        # Trim to the weight budget, oldest items first
+        if max_weight is not None and self.total_weight > max_weight:
+            while self.cache and self.total_weight > max_weight:
+                self._evict(next(iter(self.cache)))
+            self._mark_dirty()
+        if write_behind:
+            # A weak reference, so that dropped caches and their sweeper
+            # threads are not kept alive until the process exits
+            atexit.register(_flush_at_exit, weakref.ref(self))
+        if sweep_interval is not None:
+            self.start_sweeper(sweep_interval)
     
     def _load_cache(self) -> None:
         """Load cache from disk file if it exists."""
@@ -168,68 +829,563 @@ class PersistentCache(LRUCache[T]):
             print(f"Error loading cache from {self.filename}: {e}")
     
     def _save_cache(self) -> None:
-        """Save cache to disk file."""
+        """
+        Save cache to disk file.
+        The file is written to a temporary file and renamed over the old one,
+        so readers and crashes never see a partially written cache.
+        """
+        with self._save_lock:
+            try:
+                with self._lock:
+                    serializable_cache = self._serialize_entries()
+                self._write_snapshot(serializable_cache)
+            except (TypeError, IOError) as e:
+                print(f"Error saving cache to {self.filename}: {e}")
+    
+    def _serialize_entries(self) -> Dict[str, Tuple[Any, float]]:
+        """Convert cache to serializable format (caller holds the lock)."""
+        return {
+            key: (self.serialize_fn(value), timestamp)
+            for key, (value, timestamp) in self.cache.items()
+        }
+    
+    def _write_snapshot(self, serializable_cache: Dict[str, Tuple[Any, float]]) -> None:
+        """Atomically replace the cache file with the given entries."""
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
         try:
-            # Convert cache to serializable format
-            serializable_cache = {
-                key: (self.serialize_fn(value), timestamp)
-                for key, (value, timestamp) in self.cache.items()
-            }
-            
-            with open(self.filename, 'w') as f:
+            with os.fdopen(fd, 'w') as f:
                 json.dump(serializable_cache, f)
-                
-        except (TypeError, IOError) as e:
-            print(f"Error saving cache to {self.filename}: {e}")
+            os.replace(temp_path, self.filename)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def _loaded_weight(self, key: str, value: T) -> int:
+        """Get the weight of an item loaded from disk."""
+        return self.weigher(value)
+    
+    def _record(self, op: str, key: Optional[str] = None, value: Optional[T] = None) -> None:
+        """
+        Hook called with the cache lock held after each mutation is applied.
+        Storage formats that log individual mutations override this.
+        """
     
-    def put(self, key: str, value: T) -> None:
+    def _evict(self, key: str) -> None:
+        """Drop an item to make room for a new one and record the removal."""
+        super()._evict(key)
+        self._record("remove", key)
+    
+    def _mark_dirty(self, count: int = 1) -> None:
+        """Record `count` mutations and save now or schedule a save."""
+        if not self.write_behind:
+            self._save_cache()
+            return
+        
+        with self._lock:
+            self._pending += count
+            if self._pending < self.flush_threshold:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+    
+    def flush(self) -> None:
+        """Save pending changes to disk if there are any."""
+        # Holding the save lock throughout means that when flush returns,
+        # a save started by the flush timer has finished as well
+        with self._save_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if self._pending == 0:
+                    return
+                self._pending = 0
+            self._save_cache()
+    
+    def pending_writes(self) -> int:
+        """
+        Get the number of mutations not yet saved to disk.
+        
+        Returns:
+            Number of unsaved mutations (always 0 outside write-behind mode)
+        """
+        return self._pending
+    
+    def put(self, key: str, value: T, ttl: Optional[float] = None) -> None:
         """Add or update item and save cache to disk."""
-        super().put(key, value)
-        self._save_cache()
+        with self._lock:
+            super().put(key, value, ttl)
+            # The item is not cached if it alone exceeds the weight budget
+            if key in self.cache:
+                self._record("put", key, value)
+        self._mark_dirty()
+    
+    def put_many(self, items: Iterable[Tuple[str, T]], ttl: Optional[float] = None) -> None:
+        """Add or update several items and save cache to disk once."""
+        count = 0
+        with self._lock:
+            for key, value in items:
+                LRUCache.put(self, key, value, ttl)
+                if key in self.cache:
+                    self._record("put", key, value)
+                count += 1
+        if count:
+            self._mark_dirty(count)
+    
+    def _store_load(self, key: str, load: _PendingLoad, ttl: Optional[float]) -> bool:
+        """Cache a loaded value unless its load was dropped, and save cache to disk."""
+        with self._lock:
+            if not super()._store_load(key, load, ttl):
+                return False
+            if key in self.cache:
+                self._record("put", key, load.value)
+        self._mark_dirty()
+        return True
     
     def remove(self, key: str) -> bool:
         """Remove item and save cache to disk if changed."""
-        result = super().remove(key)
+        with self._lock:
+            result = super().remove(key)
+            if result:
+                self._record("remove", key)
         if result:
-            self._save_cache()
+            self._mark_dirty()
         return result
     
     def clear(self) -> None:
         """Clear cache and save to disk."""
-        super().clear()
-        self._save_cache()
+        with self._lock:
+            super().clear()
+            self._record("clear")
+        self._mark_dirty()
+
+
+class JournaledCache(PersistentCache[T]):
+    """
+    PersistentCache that appends each mutation to a log file instead of
+    rewriting the whole cache.
+    
+    The cache file holds a snapshot in the same format PersistentCache uses,
+    and `<filename>.log` holds one JSON record per line for every put,
+    remove (including evictions) and clear since that snapshot. Loading
+    replays the snapshot and then the log. Once the log holds more than
+    `compaction_threshold` records, a background thread writes a fresh
+    snapshot and truncates the log.
+    
+    Access order from `get` is not logged, so after a restart entries come
+    back in the order they were last written.
+    """
+    
+    def __init__(self, capacity: int, filename: str, serialize_fn: Callable[[T], Any] = None,
+                 deserialize_fn: Callable[[Any], T] = None, write_behind: bool = False,
+                 flush_interval: float = 1.0, flush_threshold: int = 100,
+                 compaction_threshold: Optional[int] = None, ttl: Optional[float] = None,
+                 sweep_interval: Optional[float] = None, policy: Optional[EvictionPolicy] = None,
+                 track_latency: bool = False, weigher: Optional[Callable[[T], int]] = None,
+                 max_weight: Optional[int] = None):
+        """
+        Initialize a journaled LRU cache.
+        
+        Args:
+            capacity: Maximum number of items to store
+            filename: File path of the snapshot; the log is stored next to it
+            serialize_fn: Optional function to serialize values before storing
+            deserialize_fn: Optional function to deserialize values after loading
+            write_behind: Batch log appends instead of appending on every change
+            flush_interval: Seconds an unsaved mutation may wait in write-behind mode
+            flush_threshold: Number of unsaved mutations that triggers a save in write-behind mode
+            compaction_threshold: Log records that trigger compaction (default: twice the capacity, at least 100)
+            ttl: Optional default seconds an item stays valid after it is put
+            sweep_interval: Optional seconds between background purges of expired items
+            policy: Optional eviction policy (least recently used by default)
+            track_latency: Record get/put latency histograms
+            weigher: Optional function giving the weight of a value, such as deep_sizeof
+            max_weight: Maximum total weight of the cached items (requires a weigher)
+        """
+        if compaction_threshold is not None and compaction_threshold <= 0:
+            raise ValueError("Compaction threshold must be positive")
+        
+        self.log_filename = filename + ".log"
+        self.compaction_threshold = compaction_threshold or max(100, 2 * capacity)
+        self._journal: List[str] = []
+        self._log_records = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+        super().__init__(capacity, filename, serialize_fn, deserialize_fn,
+                         write_behind, flush_interval, flush_threshold, ttl, sweep_interval,
+                         policy, track_latency, weigher, max_weight)
+    
+    def _load_cache(self) -> None:
+        """Load the snapshot, then replay the log on top of it."""
+        super()._load_cache()
+        if not os.path.exists(self.log_filename):
+            return
+        
+        try:
+            valid_bytes = 0
+            torn = False
+            with open(self.log_filename, 'rb') as f:
+                for line in f:
+                    try:
+                        op, key, serialized_value, timestamp = json.loads(line)
+                    except ValueError:
+                        torn = True
+                        break
+                    
+                    valid_bytes += len(line)
+                    self._log_records += 1
+                    if op == "put":
+                        self.cache.pop(key, None)
+                        self.cache[key] = (self.deserialize_fn(serialized_value), timestamp)
+                    elif op == "remove":
+                        self.cache.pop(key, None)
+                    elif op == "clear":
+                        self.cache.clear()
+            
+            # Drop a torn final record from a crash mid-append so that new
+            # records start on a fresh line
+            if torn:
+                os.truncate(self.log_filename, valid_bytes)
+            
+            # Trim to capacity
+            while len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+                
+        except IOError as e:
+            print(f"Error loading cache log from {self.log_filename}: {e}")
+    
+    def _record(self, op: str, key: Optional[str] = None, value: Optional[T] = None) -> None:
+        """Queue a log record for a mutation."""
+        serialized_value = self.serialize_fn(value) if op == "put" else None
+        timestamp = self.cache[key][1] if op == "put" else time.time()
+        self._journal.append(json.dumps([op, key, serialized_value, timestamp]))
+    
+    def _save_cache(self) -> None:
+        """Append queued records to the log, compacting it if it grew too long."""
+        with self._save_lock:
+            with self._lock:
+                records, self._journal = self._journal, []
+            if not records:
+                return
+            
+            try:
+                with open(self.log_filename, 'a') as f:
+                    f.write("\n".join(records) + "\n")
+                self._log_records += len(records)
+            except IOError as e:
+                print(f"Error appending to cache log {self.log_filename}: {e}")
+                return
+            
+            if self._log_records > self.compaction_threshold:
+                self._start_compaction()
+    
+    def _start_compaction(self) -> None:
+        """Compact the log on a background thread unless one is already running."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+    
+    def compact(self) -> None:
+        """Write the current cache as a new snapshot and truncate the log."""
+        with self._save_lock:
+            try:
+                # Queued records are covered by the snapshot, so drop them
+                with self._lock:
+                    serializable_cache = self._serialize_entries()
+                    self._journal = []
+                self._write_snapshot(serializable_cache)
+                
+                with open(self.log_filename, 'w'):
+                    pass
+                self._log_records = 0
+            except (TypeError, IOError) as e:
+                print(f"Error compacting cache {self.filename}: {e}")
+    
+    def log_size(self) -> int:
+        """
+        Get the number of records in the log since the last snapshot.
+        
+        Returns:
+            Number of records written to the log file
+        """
+        return self._log_records
+
+
+# Placeholder for values that are still only in the SQLite table
+_UNLOADED = object()
 
 
-def lru_cache_decorator(maxsize: int = 128):
+class SQLiteCache(PersistentCache[T]):
+    """
+    PersistentCache backed by a SQLite table, for caches with large capacities.
+    
+    Startup only reads keys and timestamps to rebuild the LRU order in
+    memory; each value is read and deserialized the first time it is
+    requested. Every mutation is a single-row statement, and in write-behind
+    mode pending statements are committed together in one transaction.
+    
+    Access order from `get` is not persisted, so after a restart entries
+    come back in the order they were last written. Item weights are stored
+    alongside the values so that a weighted cache can start without
+    loading them.
+    """
+    
+    def __init__(self, capacity: int, filename: str, serialize_fn: Callable[[T], Any] = None,
+                 deserialize_fn: Callable[[Any], T] = None, write_behind: bool = False,
+                 flush_interval: float = 1.0, flush_threshold: int = 100,
+                 ttl: Optional[float] = None, sweep_interval: Optional[float] = None,
+                 policy: Optional[EvictionPolicy] = None, track_latency: bool = False,
+                 weigher: Optional[Callable[[T], int]] = None, max_weight: Optional[int] = None):
+        """
+        Initialize a SQLite-backed LRU cache.
+        
+        Args:
+            capacity: Maximum number of items to store
+            filename: Path of the SQLite database file
+            serialize_fn: Optional function to serialize values before storing
+            deserialize_fn: Optional function to deserialize values after loading
+            write_behind: Batch statements and commit them later instead of on every change
+            flush_interval: Seconds an unsaved mutation may wait in write-behind mode
+            flush_threshold: Number of unsaved mutations that triggers a commit in write-behind mode
+            ttl: Optional default seconds an item stays valid after it is put
+            sweep_interval: Optional seconds between background purges of expired items
+            policy: Optional eviction policy (least recently used by default)
+            track_latency: Record get/put latency histograms
+            weigher: Optional function giving the weight of a value, such as deep_sizeof
+            max_weight: Maximum total weight of the cached items (requires a weigher)
+        """
+        # The flush timer and atexit hook use the connection from other
+        # threads; the database lock serializes every use of it.
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._statements: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._position = 0
+        self._stored_weights: Dict[str, int] = {}
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                position INTEGER NOT NULL,
+                weight INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")]
+        if "weight" not in columns:
+            self._conn.execute("ALTER TABLE cache_entries ADD COLUMN weight INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_position ON cache_entries(position)"
+        )
+        self._conn.commit()
+        super().__init__(capacity, filename, serialize_fn, deserialize_fn,
+                         write_behind, flush_interval, flush_threshold, ttl, sweep_interval,
+                         policy, track_latency, weigher, max_weight)
+        self._stored_weights.clear()
+    
+    def _load_cache(self) -> None:
+        """Rebuild the LRU order from the table without reading any values."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT key, timestamp, position, weight FROM cache_entries ORDER BY position"
+            ).fetchall()
+            
+            # Trim to capacity, dropping the oldest rows from the table as well
+            excess = rows[:max(0, len(rows) - self.capacity)]
+            if excess:
+                self._conn.executemany("DELETE FROM cache_entries WHERE key = ?",
+                                       [(row[0],) for row in excess])
+                self._conn.commit()
+        
+        for key, timestamp, _, weight in rows[len(excess):]:
+            self.cache[key] = (_UNLOADED, timestamp)
+            self._stored_weights[key] = weight
+        if rows:
+            self._position = rows[-1][2] + 1
+    
+    def _loaded_weight(self, key: str, value: T) -> int:
+        """Use the stored weight, since the value itself is not loaded yet."""
+        return self._stored_weights.pop(key, 0)
+    
+    def _record(self, op: str, key: Optional[str] = None, value: Optional[T] = None) -> None:
+        """Queue the statements for a mutation."""
+        if op == "put":
+            self._statements.append((
+                "INSERT OR REPLACE INTO cache_entries (key, value, timestamp, position, weight) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(self.serialize_fn(value)), self.cache[key][1], self._position,
+                 self.weights.get(key, 0))
+            ))
+            self._position += 1
+        elif op == "remove":
+            self._statements.append(("DELETE FROM cache_entries WHERE key = ?", (key,)))
+        elif op == "clear":
+            self._statements.append(("DELETE FROM cache_entries", ()))
+    
+    def _save_cache(self) -> None:
+        """Commit queued statements in a single transaction."""
+        with self._save_lock:
+            with self._lock:
+                statements, self._statements = self._statements, []
+            if not statements:
+                return
+            
+            with self._db_lock:
+                try:
+                    with self._conn:
+                        for sql, params in statements:
+                            self._conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    print(f"Error saving cache to {self.filename}: {e}")
+    
+    def _load_value(self, key: str) -> Optional[T]:
+        """Read and deserialize one value from the table."""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        return self.deserialize_fn(json.loads(row[0])) if row else None
+    
+    def get(self, key: str, default: Any = None) -> Optional[T]:
+        """Get an item, loading its value from the table on first access."""
+        # Not under the cache lock: removing an expired item saves the
+        # cache, which takes the save lock, and that must come first
+        value = super().get(key, default)
+        if value is not _UNLOADED:
+            return value
+        
+        value = self._load_value(key)
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                # Removed while the value was being read
+                return default
+            if entry[0] is not _UNLOADED:
+                # Replaced while the value was being read
+                return entry[0]
+            if value is None:
+                # The row disappeared underneath us
+                LRUCache.remove(self, key)
+                return default
+            self.cache[key] = (value, entry[1])
+            return value
+    
+    def get_all_items(self) -> List[Tuple[str, T]]:
+        """Get all cached items, loading any values not read yet."""
+        with self._lock:
+            if any(value is _UNLOADED for value, _ in self.cache.values()):
+                with self._db_lock:
+                    rows = dict(self._conn.execute("SELECT key, value FROM cache_entries"))
+                for key, (value, timestamp) in self.cache.items():
+                    if value is _UNLOADED and key in rows:
+                        self.cache[key] = (self.deserialize_fn(json.loads(rows[key])), timestamp)
+            return [(key, value) for key, (value, _) in self.cache.items() if value is not _UNLOADED]
+    
+    def loaded_count(self) -> int:
+        """
+        Get the number of values deserialized into memory.
+        
+        Returns:
+            Number of cached items whose value has been loaded
+        """
+        with self._lock:
+            return sum(1 for value, _ in self.cache.values() if value is not _UNLOADED)
+    
+    def close(self) -> None:
+        """Stop the sweeper, save pending changes and close the database connection."""
+        self.stop_sweeper()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+# Separates positional from keyword arguments in cache keys
+_KWARGS_MARK = (object(),)
+
+
+def make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    """
+    Build a cache key from call arguments.
+    
+    Arguments are kept as a tuple instead of being formatted as strings, so
+    building a key is cheap for large arguments and objects are compared by
+    equality rather than by their repr.
+    
+    Raises:
+        TypeError: If an argument is not hashable
+    """
+    key = args
+    if kwargs:
+        key += _KWARGS_MARK + tuple(sorted(kwargs.items()))
+    if len(key) == 1 and type(key[0]) in (int, str):
+        return key[0]
+    hash(key)
+    return key
+
+
+def lru_cache_decorator(maxsize: int = 128, per_instance: bool = False,
+                        skip_if: Optional[Callable[..., bool]] = None):
     """
     Decorator that applies LRU caching to a function.
     Similar to functools.lru_cache but with more features.
     
+    Only decorate functions without side effects: a cached call does not
+    run the function at all.
+    
     Args:
         maxsize: Maximum cache size
+        per_instance: For methods, keep a separate cache on each instance
+            (stored in its __dict__) instead of one cache keyed by `self`
+        skip_if: Optional predicate called with the call's arguments; calls
+            for which it returns True bypass the cache, e.g. calls that write
     
     Returns:
         Decorated function with caching
     """
-    cache = LRUCache(maxsize)
-    
     def decorator(func):
+        # One cache per decorated function, even when a single decorator
+        # object is applied to several functions
+        shared_cache = None if per_instance else LRUCache(maxsize)
+        cache_attribute = f"_lru_cache_{func.__name__}"
+        
+        def cache_for(instance) -> LRUCache:
+            cache = instance.__dict__.get(cache_attribute)
+            if cache is None:
+                cache = instance.__dict__.setdefault(cache_attribute, LRUCache(maxsize))
+            return cache
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create a key from function arguments
-            key = str(args) + str(sorted(kwargs.items()))
-            result = cache.get(key)
+            if skip_if is not None and skip_if(*args, **kwargs):
+                return func(*args, **kwargs)
+            
+            if per_instance:
+                cache, key_args = cache_for(args[0]), args[1:]
+            else:
+                cache, key_args = shared_cache, args
+            
+            try:
+                key = make_key(key_args, kwargs)
+            except TypeError:
+                # Unhashable arguments cannot be cached
+                return func(*args, **kwargs)
             
-            if result is None:
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
                 # Cache miss - call function and cache result
                 result = func(*args, **kwargs)
                 cache.put(key, result)
             
             return result
         
-        # Add cache statistics to function
-        wrapper.cache_info = lambda: cache.get_stats()
-        wrapper.cache_clear = lambda: cache.clear()
+        # Add cache statistics to function; per-instance caches need the instance
+        wrapper.cache_info = lambda instance=None: \
+            (cache_for(instance) if per_instance else shared_cache).get_stats()
+        wrapper.cache_clear = lambda instance=None: \
+            (cache_for(instance) if per_instance else shared_cache).clear()
         
         return wrapper
     
@@ -0,0 +1,231 @@
+from math import asin, cos, hypot, radians, sin, sqrt
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pure Python loops are used without it
+    np = None
+
+
+class DistanceMetric:
+    """
+    Strategy for measuring the distance between latitude/longitude points.
+
+    Each point can be prepared once with `prepare`, which caches any values
+    the metric needs (such as radians and cosines), so that repeated calls to
+    `between` in hot loops like the A* heuristic stay cheap.
+    """
+
+    name = "metric"
+
+    def prepare(self, latitude: float, longitude: float) -> Tuple[float, ...]:
+        """Precompute the per-point values used by `between`."""
+        return (latitude, longitude)
+
+    def between(self, a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+        """Calculate the distance between two prepared points."""
+        raise NotImplementedError
+
+    def distance(self, latitude: float, longitude: float,
+                 other_latitude: float, other_longitude: float) -> float:
+        """Calculate the distance between two coordinates."""
+        return self.between(self.prepare(latitude, longitude),
+                            self.prepare(other_latitude, other_longitude))
+
+    def lower_bound(self, latitude: float, degrees: float) -> float:
+        """
+        Lower bound on the distance from a point at `latitude` to any point
+        whose latitude or longitude differs by more than `degrees`.
+        Used by the spatial index to know when a search radius is covered.
+        """
+        raise NotImplementedError
+
+    def distances_from(self, latitude: float, longitude: float,
+                       latitudes: Sequence[float], longitudes: Sequence[float]):
+        """
+        Calculate the distances from one point to many points.
+
+        Returns:
+            A NumPy array of distances when NumPy is installed, otherwise a list
+        """
+        source = self.prepare(latitude, longitude)
+        distances = [self.between(source, self.prepare(lat, lon))
+                     for lat, lon in zip(latitudes, longitudes)]
+        return np.asarray(distances, dtype=np.float64) if np is not None else distances
+
+    def matrix(self, latitudes: Sequence[float], longitudes: Sequence[float],
+               other_latitudes: Optional[Sequence[float]] = None,
+               other_longitudes: Optional[Sequence[float]] = None):
+        """
+        Calculate the distances between every row point and every column point.
+
+        Returns:
+            A len(rows) x len(columns) matrix indexable as matrix[i][j]; a NumPy
+            array when NumPy is installed, otherwise a list of lists
+        """
+        if other_latitudes is None or other_longitudes is None:
+            other_latitudes, other_longitudes = latitudes, longitudes
+
+        columns = [self.prepare(lat, lon) for lat, lon in zip(other_latitudes, other_longitudes)]
+        rows = [
+            [self.between(row, column) for column in columns]
+            for row in (self.prepare(lat, lon) for lat, lon in zip(latitudes, longitudes))
+        ]
+        if np is not None:
+            return np.asarray(rows, dtype=np.float64).reshape(len(rows), len(columns))
+        return rows
+
+
+class EuclideanMetric(DistanceMetric):
+    """
+    Planar distance that treats latitude and longitude as x/y coordinates.
+    Only meaningful at city scale, but cheap and unit-free.
+    """
+
+    name = "euclidean"
+
+    def between(self, a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+        return hypot(a[0] - b[0], a[1] - b[1])
+
+    def lower_bound(self, latitude: float, degrees: float) -> float:
+        return degrees
+
+    def distances_from(self, latitude, longitude, latitudes, longitudes):
+        if np is not None:
+            return np.hypot(np.asarray(latitudes, dtype=np.float64) - latitude,
+                            np.asarray(longitudes, dtype=np.float64) - longitude)
+
+        return [hypot(lat - latitude, lon - longitude) for lat, lon in zip(latitudes, longitudes)]
+
+    def matrix(self, latitudes, longitudes, other_latitudes=None, other_longitudes=None):
+        if other_latitudes is None or other_longitudes is None:
+            other_latitudes, other_longitudes = latitudes, longitudes
+
+        if np is not None:
+            # Broadcasting builds the whole matrix in a single vectorized pass
+            row_lat = np.asarray(latitudes, dtype=np.float64)[:, np.newaxis]
+            row_lon = np.asarray(longitudes, dtype=np.float64)[:, np.newaxis]
+            col_lat = np.asarray(other_latitudes, dtype=np.float64)[np.newaxis, :]
+            col_lon = np.asarray(other_longitudes, dtype=np.float64)[np.newaxis, :]
+            return np.hypot(row_lat - col_lat, row_lon - col_lon)
+
+        columns = list(zip(other_latitudes, other_longitudes))
+        return [
+            [hypot(lat - other_lat, lon - other_lon) for other_lat, other_lon in columns]
+            for lat, lon in zip(latitudes, longitudes)
+        ]
+
+
+class HaversineMetric(DistanceMetric):
+    """
+    Great-circle distance on a sphere, in kilometers by default.
+    Prepared points cache (lat_radians, lon_radians, cos_lat).
+    """
+
+    name = "haversine"
+
+    def __init__(self, radius: float = 6371.0088):
+        """
+        Initialize the metric.
+
+        Args:
+            radius: Sphere radius; the default is the mean Earth radius in km
+        """
+        self.radius = radius
+
+    def prepare(self, latitude: float, longitude: float) -> Tuple[float, ...]:
+        lat = radians(latitude)
+        return (lat, radians(longitude), cos(lat))
+
+    def between(self, a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+        h = sin((b[0] - a[0]) / 2) ** 2 + a[2] * b[2] * sin((b[1] - a[1]) / 2) ** 2
+        return 2 * self.radius * asin(sqrt(min(1.0, h)))
+
+    def lower_bound(self, latitude: float, degrees: float) -> float:
+        # Moving `degrees` in latitude covers at least that arc; moving in
+        # longitude is bounded by the distance to the offset meridian plane.
+        offset = radians(min(degrees, 90.0))
+        return self.radius * min(offset, asin(cos(radians(latitude)) * sin(offset)))
+
+    def distances_from(self, latitude, longitude, latitudes, longitudes):
+        if np is None:
+            return super().distances_from(latitude, longitude, latitudes, longitudes)
+
+        return self._haversine(
+            radians(latitude), radians(longitude),
+            np.radians(np.asarray(latitudes, dtype=np.float64)),
+            np.radians(np.asarray(longitudes, dtype=np.float64))
+        )
+
+    def matrix(self, latitudes, longitudes, other_latitudes=None, other_longitudes=None):
+        if np is None:
+            return super().matrix(latitudes, longitudes, other_latitudes, other_longitudes)
+
+        if other_latitudes is None or other_longitudes is None:
+            other_latitudes, other_longitudes = latitudes, longitudes
+
+        return self._haversine(
+            np.radians(np.asarray(latitudes, dtype=np.float64))[:, np.newaxis],
+            np.radians(np.asarray(longitudes, dtype=np.float64))[:, np.newaxis],
+            np.radians(np.asarray(other_latitudes, dtype=np.float64))[np.newaxis, :],
+            np.radians(np.asarray(other_longitudes, dtype=np.float64))[np.newaxis, :]
+        )
+
+    def _haversine(self, lat1, lon1, lat2, lon2):
+        """Vectorized haversine over radian arrays (broadcasting as NumPy does)."""
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * self.radius * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+EUCLIDEAN = EuclideanMetric()
+HAVERSINE = HaversineMetric()
+
+
+def distances_from(latitude: float, longitude: float,
+                   latitudes: Sequence[float], longitudes: Sequence[float],
+                   metric: Optional[DistanceMetric] = None):
+    """
+    Calculate the distances from one point to many points.
+
+    Args:
+        latitude: Latitude of the source point
+        longitude: Longitude of the source point
+        latitudes: Latitudes of the target points
+        longitudes: Longitudes of the target points
+        metric: Distance metric to use (Euclidean by default)
+
+    Returns:
+        A NumPy array of distances when NumPy is installed, otherwise a list
+    """
+    return (metric or EUCLIDEAN).distances_from(latitude, longitude, latitudes, longitudes)
+
+
+def distance_matrix(latitudes: Sequence[float], longitudes: Sequence[float],
+                    other_latitudes: Optional[Sequence[float]] = None,
+                    other_longitudes: Optional[Sequence[float]] = None,
+                    metric: Optional[DistanceMetric] = None):
+    """
+    Calculate the distances between every pair of points.
+
+    Uses NumPy broadcasting when available, so a 5k x 5k matrix is built in
+    a single vectorized pass rather than 25M Python-level calls.
+
+    Args:
+        latitudes: Latitudes of the row points
+        longitudes: Longitudes of the row points
+        other_latitudes: Optional latitudes of the column points (defaults to the rows)
+        other_longitudes: Optional longitudes of the column points (defaults to the rows)
+        metric: Distance metric to use (Euclidean by default)
+
+    Returns:
+        A len(rows) x len(columns) matrix indexable as matrix[i][j]; a NumPy
+        array when NumPy is installed, otherwise a list of lists
+    """
+    return (metric or EUCLIDEAN).matrix(latitudes, longitudes, other_latitudes, other_longitudes)
+
+
+def matrix_rows(matrix) -> List[List[float]]:
+    """Convert a distance matrix from distance_matrix() to plain Python lists."""
+    if np is not None and isinstance(matrix, np.ndarray):
+        return matrix.tolist()
+    return matrix
@@ -1,14 +1,25 @@
 import heapq
+from array import array
 from math import sqrt, pow
-from typing import Dict, List, Set, Tuple, Callable, Optional
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Callable, Optional, Union
 from dataclasses import dataclass, field
 
+from distance import EUCLIDEAN, DistanceMetric, distance_matrix, distances_from, matrix_rows
+from spatial_index import SpatialGrid
 
-@dataclass
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array-based columns work without it
+    np = None
+
+
+@dataclass(slots=True)
 class Location:
     """
     Represents a location with latitude and longitude coordinates.
     Used for pathfinding between locations.
+    
+    Slotted so large catalogs don't pay for a per-instance __dict__.
     """
     id: int
     name: str
@@ -16,12 +27,182 @@ class Location:
     longitude: float
     description: str = ""
     
-    def distance_to(self, other: 'Location') -> float:
-        """Calculate the Euclidean distance between two locations."""
+    def distance_to(self, other: 'Location', metric: Optional[DistanceMetric] = None) -> float:
+        """
+        Calculate the distance between two locations.
+        
+        Args:
+            other: Location to measure to
+            metric: Optional distance metric (e.g. HAVERSINE). Defaults to
+                the Euclidean distance over latitude/longitude.
+        """
+        if metric is not None:
+            return metric.distance(self.latitude, self.longitude, other.latitude, other.longitude)
+        
         return sqrt(
             pow(self.latitude - other.latitude, 2) +
             pow(self.longitude - other.longitude, 2)
         )
+    
+    def distances_to(self, others: Sequence['Location'], metric: Optional[DistanceMetric] = None):
+        """
+        Calculate the distances to many locations in one batched call.
+        
+        Returns:
+            Distances in the same order as `others` (a NumPy array when
+            NumPy is installed, otherwise a list)
+        """
+        return distances_from(
+            self.latitude, self.longitude,
+            [other.latitude for other in others],
+            [other.longitude for other in others],
+            metric
+        )
+
+
+class LocationTable:
+    """
+    Columnar store for large location catalogs.
+    IDs and coordinates are kept in contiguous typed arrays and Location
+    objects are only created when a single row is requested, so a table
+    can be built straight from database rows without per-row objects.
+    """
+    
+    def __init__(self):
+        """Initialize an empty table."""
+        self.ids = array('q')
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.row_by_id: Dict[int, int] = {}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> 'LocationTable':
+        """
+        Build a table from (id, name, latitude, longitude, description) rows,
+        such as the rows of a SQLite cursor.
+        """
+        table = cls()
+        for row in rows:
+            table.append(row[0], row[1], row[2], row[3], row[4] if len(row) > 4 else "")
+        return table
+    
+    @classmethod
+    def from_locations(cls, locations: Iterable[Location]) -> 'LocationTable':
+        """Build a table from Location objects."""
+        return cls.from_rows(
+            (loc.id, loc.name, loc.latitude, loc.longitude, loc.description)
+            for loc in locations
+        )
+    
+    def append(self, location_id: int, name: str, latitude: float, longitude: float,
+               description: Optional[str] = "") -> None:
+        """Add a row to the table."""
+        if location_id in self.row_by_id:
+            raise ValueError(f"Duplicate location id: {location_id}")
+        
+        self.row_by_id[location_id] = len(self.ids)
+        self.ids.append(location_id)
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self.names.append(name)
+        self.descriptions.append(description or "")
+    
+    def remove(self, location_id: int) -> bool:
+        """
+        Remove a row by location ID in O(1) by moving the last row into its slot.
+        
+        Returns:
+            True if the location was in the table and removed, False otherwise
+        """
+        row = self.row_by_id.pop(location_id, None)
+        if row is None:
+            return False
+        
+        last = len(self.ids) - 1
+        if row != last:
+            for column in (self.ids, self.latitudes, self.longitudes, self.names, self.descriptions):
+                column[row] = column[last]
+            self.row_by_id[self.ids[row]] = row
+        
+        for column in (self.ids, self.latitudes, self.longitudes, self.names, self.descriptions):
+            column.pop()
+        return True
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __contains__(self, location_id: int) -> bool:
+        return location_id in self.row_by_id
+    
+    def __getitem__(self, row: int) -> Location:
+        """Materialize the Location stored at a row index."""
+        return Location(
+            id=self.ids[row],
+            name=self.names[row],
+            latitude=self.latitudes[row],
+            longitude=self.longitudes[row],
+            description=self.descriptions[row]
+        )
+    
+    def __iter__(self) -> Iterator[Location]:
+        """Iterate over the table, creating Location objects lazily."""
+        for row in range(len(self.ids)):
+            yield self[row]
+    
+    def get(self, location_id: int) -> Optional[Location]:
+        """Get a location by its ID, or None if it is not in the table."""
+        row = self.row_by_id.get(location_id)
+        return None if row is None else self[row]
+    
+    def points(self) -> Iterator[Tuple[int, float, float]]:
+        """Iterate over (id, latitude, longitude) tuples without creating Locations."""
+        return zip(self.ids, self.latitudes, self.longitudes)
+    
+    def rows(self) -> Iterator[Tuple[int, str, float, float, str]]:
+        """Iterate over (id, name, latitude, longitude, description) tuples."""
+        return zip(self.ids, self.names, self.latitudes, self.longitudes, self.descriptions)
+    
+    def coordinate_arrays(self):
+        """
+        Get the ID, latitude and longitude columns as NumPy arrays.
+        
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("NumPy is required for coordinate_arrays()")
+        return (np.array(self.ids, dtype=np.int64),
+                np.array(self.latitudes, dtype=np.float64),
+                np.array(self.longitudes, dtype=np.float64))
+
+
+def coordinate_columns(locations: Union[List[Location], LocationTable]):
+    """Get the (ids, latitudes, longitudes) columns of a location list or table."""
+    if isinstance(locations, LocationTable):
+        return locations.ids, locations.latitudes, locations.longitudes
+    return ([loc.id for loc in locations],
+            [loc.latitude for loc in locations],
+            [loc.longitude for loc in locations])
+
+
+def location_distance_matrix(locations: Union[List[Location], LocationTable],
+                             metric: Optional[DistanceMetric] = None):
+    """
+    Calculate the distance between every pair of locations with one
+    vectorized call. matrix[i][j] is the distance from the i-th to the
+    j-th location.
+    """
+    _, latitudes, longitudes = coordinate_columns(locations)
+    return distance_matrix(latitudes, longitudes, metric=metric)
+
+
+def location_points(locations: Union[List[Location], LocationTable]) -> List[Tuple[int, float, float]]:
+    """Get (id, latitude, longitude) tuples from a location list or table."""
+    if isinstance(locations, LocationTable):
+        return list(locations.points())
+    return [(loc.id, loc.latitude, loc.longitude) for loc in locations]
 
 
 @dataclass(order=True)
@@ -44,28 +225,218 @@ class PathFinder:
     """
     Implements the A* pathfinding algorithm to find optimal routes between locations.
     Uses a priority queue for efficient node exploration.
+    
+    By default every location is connected to every other location. Passing
+    `neighbors` switches to a spatial index mode where each location is only
+    connected to its nearest neighbours, which are looked up lazily from a
+    uniform grid during the search instead of being stored as edges.
+    
+    Locations can be added, removed or moved incrementally without
+    rebuilding the graph: O(n) per change for the complete graph and
+    O(1) for the spatial index.
     """
     
-    def __init__(self, locations: List[Location]):
-        """Initialize with a list of available locations."""
-        self.locations = locations
-        self._build_graph()
+    def __init__(self, locations: Union[List[Location], LocationTable],
+                 neighbors: Optional[int] = None,
+                 metric: Optional[DistanceMetric] = None):
+        """
+        Initialize with a list of available locations.
+        
+        Args:
+            locations: Locations that can appear on a path, either as a list
+                or as a LocationTable
+            neighbors: Optional number of nearest neighbours each location is
+                connected to. None builds the complete graph.
+            metric: Distance metric for edges and the heuristic (Euclidean by
+                default, HAVERSINE for great-circle distances)
+        """
+        if neighbors is not None and neighbors <= 0:
+            raise ValueError("Neighbor count must be positive")
+        
+        # Keep a private copy of lists since incremental updates modify them.
+        # A LocationTable is updated in place.
+        self.locations = locations if isinstance(locations, LocationTable) else list(locations)
+        self.neighbors = neighbors
+        self.metric = metric or EUCLIDEAN
+        # Index locations by ID so lookups during the search are O(1).
+        # A LocationTable already has its own index and materializes rows on demand.
+        self.locations_by_id: Union[Dict[int, Location], LocationTable] = (
+            self.locations if isinstance(self.locations, LocationTable)
+            else {loc.id: loc for loc in self.locations}
+        )
+        self.graph: Dict[int, Dict[int, float]] = {}
+        self.spatial_index: Optional[SpatialGrid] = None
+        # Incoming edges in spatial index mode, built lazily for backward searches
+        self._incoming: Optional[Dict[int, List[Tuple[int, float]]]] = None
+        # Per-location values prepared by the metric (e.g. radians and
+        # cosines for haversine) keep the heuristic cheap in the search loop
+        self.prepared: Dict[int, Tuple[float, ...]] = {
+            loc_id: self.metric.prepare(lat, lon)
+            for loc_id, lat, lon in location_points(self.locations)
+        }
+        
+        if neighbors is None:
+            self._build_graph()
+        else:
+            self._build_spatial_index()
     
     def _build_graph(self):
         """
-        Build an adjacency list representation of the location graph.
+        Build an adjacency map representation of the location graph.
         Each location is connected to all other locations.
         """
-        self.graph: Dict[int, List[Tuple[int, float]]] = {}
+        self.graph = {}
+        ids = list(coordinate_columns(self.locations)[0])
         
-        # Create a graph where each location is connected to all others
-        for loc in self.locations:
-            self.graph[loc.id] = []
-            
-            for other in self.locations:
-                if loc.id != other.id:
-                    distance = loc.distance_to(other)
-                    self.graph[loc.id].append((other.id, distance))
+        # Compute every edge weight in one batched call, then
+        # connect each location to all others
+        rows = matrix_rows(location_distance_matrix(self.locations, self.metric))
+        for loc_id, row in zip(ids, rows):
+            edges = dict(zip(ids, row))
+            del edges[loc_id]
+            self.graph[loc_id] = edges
+    
+    def _build_spatial_index(self):
+        """Index all locations in a uniform grid for nearest-neighbour lookups."""
+        self.spatial_index = SpatialGrid.for_points(location_points(self.locations),
+                                                    metric=self.metric)
+    
+    def _neighbors(self, location: Location) -> Iterable[Tuple[int, float]]:
+        """Get the (neighbor_id, distance) edges leaving a location."""
+        if self.spatial_index is None:
+            return self.graph[location.id].items()
+        
+        return self.spatial_index.nearest(
+            location.latitude, location.longitude, self.neighbors, exclude=location.id
+        )
+    
+    def add_location(self, location: Location) -> None:
+        """
+        Add a location without rebuilding the graph.
+        
+        Raises:
+            ValueError: If a location with the same ID already exists
+        """
+        if self._get_location_by_id(location.id) is not None:
+            raise ValueError(f"Duplicate location id: {location.id}")
+        self._incoming = None
+        
+        if self.spatial_index is None:
+            # Connect the new location to every existing one in a single batch
+            ids, latitudes, longitudes = coordinate_columns(self.locations)
+            distances = self.metric.distances_from(location.latitude, location.longitude,
+                                                   latitudes, longitudes)
+            edges: Dict[int, float] = {}
+            for other_id, distance in zip(ids, distances):
+                distance = float(distance)
+                edges[other_id] = distance
+                self.graph[other_id][location.id] = distance
+            self.graph[location.id] = edges
+        else:
+            self.spatial_index.insert(location.id, location.latitude, location.longitude)
+        
+        self.prepared[location.id] = self.metric.prepare(location.latitude, location.longitude)
+        if isinstance(self.locations, LocationTable):
+            self.locations.append(location.id, location.name, location.latitude,
+                                  location.longitude, location.description)
+        else:
+            self.locations.append(location)
+            self.locations_by_id[location.id] = location
+    
+    def add_locations(self, locations: Iterable[Location]) -> None:
+        """
+        Add several locations without rebuilding the graph.
+
+        For the complete graph, the edges of all new locations are computed
+        with one batched distance matrix call rather than one call each.
+
+        Raises:
+            ValueError: If a location ID already exists or appears twice;
+                no location is added in that case
+        """
+        new_locations = list(locations)
+        new_ids: Set[int] = set()
+        for location in new_locations:
+            if location.id in new_ids or self._get_location_by_id(location.id) is not None:
+                raise ValueError(f"Duplicate location id: {location.id}")
+            new_ids.add(location.id)
+        if not new_locations:
+            return
+        self._incoming = None
+
+        for location in new_locations:
+            if self.spatial_index is not None:
+                self.spatial_index.insert(location.id, location.latitude, location.longitude)
+            self.prepared[location.id] = self.metric.prepare(location.latitude, location.longitude)
+            if isinstance(self.locations, LocationTable):
+                self.locations.append(location.id, location.name, location.latitude,
+                                      location.longitude, location.description)
+            else:
+                self.locations.append(location)
+                self.locations_by_id[location.id] = location
+
+        if self.spatial_index is None:
+            # Rows are the new locations, columns every location including them
+            ids, latitudes, longitudes = coordinate_columns(self.locations)
+            rows = matrix_rows(distance_matrix(
+                [loc.latitude for loc in new_locations], [loc.longitude for loc in new_locations],
+                latitudes, longitudes, metric=self.metric
+            ))
+            for location in new_locations:
+                self.graph[location.id] = {}
+            for location, row in zip(new_locations, rows):
+                edges = self.graph[location.id]
+                for other_id, distance in zip(ids, row):
+                    if other_id != location.id:
+                        edges[other_id] = distance
+                        self.graph[other_id][location.id] = distance
+
+    def remove_location(self, location_id: int) -> bool:
+        """
+        Remove a location without rebuilding the graph.
+        
+        Returns:
+            True if the location was known and removed, False otherwise
+        """
+        if self._get_location_by_id(location_id) is None:
+            return False
+        self._incoming = None
+        
+        if self.spatial_index is None:
+            del self.graph[location_id]
+            for edges in self.graph.values():
+                del edges[location_id]
+        else:
+            self.spatial_index.remove(location_id)
+        
+        del self.prepared[location_id]
+        if isinstance(self.locations, LocationTable):
+            self.locations.remove(location_id)
+        else:
+            del self.locations_by_id[location_id]
+            self.locations = [loc for loc in self.locations if loc.id != location_id]
+        return True
+    
+    def move_location(self, location_id: int, latitude: float, longitude: float) -> bool:
+        """
+        Change the coordinates of a location and update its edges.
+        
+        Returns:
+            True if the location was known and moved, False otherwise
+        """
+        location = self._get_location_by_id(location_id)
+        if location is None:
+            return False
+        
+        self.remove_location(location_id)
+        self.add_location(Location(
+            id=location.id,
+            name=location.name,
+            latitude=latitude,
+            longitude=longitude,
+            description=location.description
+        ))
+        return True
     
     def find_path(self, start_id: int, goal_id: int) -> List[Location]:
         """
@@ -78,83 +449,287 @@ class PathFinder:
         Returns:
             A list of Location objects representing the path from start to goal
         """
-        if start_id == goal_id:
-            return [self._get_location_by_id(start_id)]
-        
         start_location = self._get_location_by_id(start_id)
         goal_location = self._get_location_by_id(goal_id)
         
         if not start_location or not goal_location:
             return []
         
+        if start_id == goal_id:
+            return [start_location]
+        
+        goal_prepared = self.prepared[goal_id]
+        
         # Create start node
-        start_node = PathNode(location=start_location)
-        start_node.g_score = 0
-        start_node.h_score = start_location.distance_to(goal_location)
+        start_node = PathNode(
+            location=start_location,
+            g_score=0,
+            h_score=self._heuristic(start_id, goal_prepared)
+        )
         
-        # Use a priority queue for open set
+        # Use a priority queue for open set. Improved paths are pushed as new
+        # nodes and the superseded entries are skipped when popped (lazy
+        # deletion), which keeps every queue operation O(log n).
         open_set = [start_node]
         # Track visited location IDs
         closed_set: Set[int] = set()
         # Map location IDs to their best known path node
         node_map: Dict[int, PathNode] = {start_id: start_node}
         
-        while open_set:
+        def potential(location_id: int) -> float:
+            return self._heuristic(location_id, goal_prepared)
+        
+        while True:
             # Get node with lowest f_score (g_score + h_score)
-            current = heapq.heappop(open_set)
-            current_id = current.location.id
+            current = self._peek(open_set, node_map, closed_set)
+            if current is None:
+                # No path found
+                return []
+            heapq.heappop(open_set)
             
             # Check if we reached the goal
-            if current_id == goal_id:
+            if current.location.id == goal_id:
                 return self._reconstruct_path(current)
             
-            # Mark as visited
+            # Mark as visited and relax the edges to its neighbours
+            closed_set.add(current.location.id)
+            self._expand(current, open_set, node_map, closed_set, potential)
+    
+    def find_path_bidirectional(self, start_id: int, goal_id: int) -> List[Location]:
+        """
+        Find the shortest path with bidirectional A*.
+        
+        Searches forward from the start and backward from the goal at the
+        same time, which expands fewer nodes on long queries. Both searches
+        use the average potential p(v) = (h_goal(v) - h_start(v)) / 2, so the
+        search can stop as soon as the two queue minimums add up to the best
+        path found so far.
+        
+        In spatial index mode the backward search needs the incoming edges
+        of each location; these are computed on first use and kept until
+        the next incremental update.
+        
+        Returns:
+            A list of Location objects representing the path from start to goal
+        """
+        start_location = self._get_location_by_id(start_id)
+        goal_location = self._get_location_by_id(goal_id)
+        
+        if not start_location or not goal_location:
+            return []
+        
+        if start_id == goal_id:
+            return [start_location]
+        
+        start_prepared = self.prepared[start_id]
+        goal_prepared = self.prepared[goal_id]
+        
+        def forward_potential(location_id: int) -> float:
+            return (self._heuristic(location_id, goal_prepared) -
+                    self._heuristic(location_id, start_prepared)) / 2
+        
+        def backward_potential(location_id: int) -> float:
+            return -forward_potential(location_id)
+        
+        forward_start = PathNode(location=start_location, g_score=0,
+                                 h_score=forward_potential(start_id))
+        backward_start = PathNode(location=goal_location, g_score=0,
+                                  h_score=backward_potential(goal_id))
+        
+        # (open set, node map, closed set, potential, edges) for each direction
+        forward = ([forward_start], {start_id: forward_start}, set(),
+                   forward_potential, self._neighbors)
+        backward = ([backward_start], {goal_id: backward_start}, set(),
+                    backward_potential, self._incoming_neighbors)
+        
+        best_cost = float('inf')
+        meeting_id: Optional[int] = None
+        
+        while True:
+            forward_top = self._peek(forward[0], forward[1], forward[2])
+            backward_top = self._peek(backward[0], backward[1], backward[2])
+            if forward_top is None or backward_top is None:
+                break
+            
+            # No unexplored path can beat the best meeting point found so far
+            if forward_top.sort_index + backward_top.sort_index >= best_cost:
+                break
+            
+            # Expand the direction with the smaller frontier
+            this, other = (forward, backward) if len(forward[0]) <= len(backward[0]) else (backward, forward)
+            current = heapq.heappop(this[0])
+            this[2].add(current.location.id)
+            
+            for node in self._expand(current, this[0], this[1], this[2], this[3], this[4]):
+                other_node = other[1].get(node.location.id)
+                if other_node is not None and node.g_score + other_node.g_score < best_cost:
+                    best_cost = node.g_score + other_node.g_score
+                    meeting_id = node.location.id
+            
+            # The expanded node itself may already be labelled by the other side
+            other_node = other[1].get(current.location.id)
+            if other_node is not None and current.g_score + other_node.g_score < best_cost:
+                best_cost = current.g_score + other_node.g_score
+                meeting_id = current.location.id
+        
+        if meeting_id is None:
+            return []
+        
+        # Join start -> meeting point with meeting point -> goal
+        forward_half = self._reconstruct_path(forward[1][meeting_id])
+        backward_half = self._reconstruct_path(backward[1][meeting_id])
+        return forward_half + backward_half[::-1][1:]
+    
+    def find_paths_to_many(self, start_id: int, goal_ids: Iterable[int]) -> Dict[int, List[Location]]:
+        """
+        Find the shortest paths from one location to many locations in a
+        single Dijkstra pass.
+        
+        Returns:
+            Dictionary mapping each reachable goal ID to its path
+        """
+        settled = self._search_many(start_id, goal_ids)
+        return {goal_id: self._reconstruct_path(node) for goal_id, node in settled.items()}
+    
+    def costs_to_many(self, start_id: int, goal_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Get the shortest path costs from one location to many locations in a
+        single Dijkstra pass.
+        
+        Returns:
+            Dictionary mapping each reachable goal ID to its path cost
+        """
+        settled = self._search_many(start_id, goal_ids)
+        return {goal_id: node.g_score for goal_id, node in settled.items()}
+    
+    def cost_matrix(self, locations: List[Location]):
+        """
+        Get the shortest path cost between every pair of the given locations.
+        
+        On the complete graph the direct distance is always the shortest
+        path, so the matrix is computed in one vectorized call. In spatial
+        index mode each row comes from one one-to-many search, and
+        unreachable pairs are infinite.
+        
+        Returns:
+            matrix[i][j] with the cost from locations[i] to locations[j]
+        """
+        if self.spatial_index is None:
+            return matrix_rows(location_distance_matrix(locations, self.metric))
+        
+        ids = [loc.id for loc in locations]
+        matrix = []
+        for start_id in ids:
+            costs = self.costs_to_many(start_id, ids)
+            matrix.append([costs.get(goal_id, float('inf')) for goal_id in ids])
+        return matrix
+    
+    def _search_many(self, start_id: int, goal_ids: Iterable[int]) -> Dict[int, PathNode]:
+        """Run Dijkstra from a start location until every goal is settled."""
+        start_location = self._get_location_by_id(start_id)
+        if not start_location:
+            return {}
+        
+        remaining = {goal_id for goal_id in goal_ids if self._get_location_by_id(goal_id) is not None}
+        start_node = PathNode(location=start_location, g_score=0, h_score=0)
+        open_set = [start_node]
+        closed_set: Set[int] = set()
+        node_map: Dict[int, PathNode] = {start_id: start_node}
+        settled: Dict[int, PathNode] = {}
+        
+        while remaining:
+            current = self._peek(open_set, node_map, closed_set)
+            if current is None:
+                break
+            heapq.heappop(open_set)
+            
+            current_id = current.location.id
             closed_set.add(current_id)
+            if current_id in remaining:
+                remaining.remove(current_id)
+                settled[current_id] = current
+            
+            self._expand(current, open_set, node_map, closed_set, lambda location_id: 0)
+        
+        return settled
+    
+    def _peek(self, open_set: List[PathNode], node_map: Dict[int, PathNode],
+              closed_set: Set[int]) -> Optional[PathNode]:
+        """Drop stale entries from the top of an open set and return the best live node."""
+        while open_set:
+            top = open_set[0]
+            location_id = top.location.id
+            if location_id not in closed_set and node_map[location_id] is top:
+                return top
+            heapq.heappop(open_set)
+        return None
+    
+    def _incoming_neighbors(self, location: Location) -> Iterable[Tuple[int, float]]:
+        """Get the (neighbor_id, distance) edges arriving at a location."""
+        # The complete graph is symmetric, so incoming edges are the outgoing ones
+        if self.spatial_index is None:
+            return self.graph[location.id].items()
+        
+        if self._incoming is None:
+            self._incoming = {loc_id: [] for loc_id in self.prepared}
+            for loc_id in self.prepared:
+                for neighbor_id, distance in self._neighbors(self._get_location_by_id(loc_id)):
+                    self._incoming[neighbor_id].append((loc_id, distance))
+        return self._incoming[location.id]
+    
+    def _expand(self, current: PathNode, open_set: List[PathNode], node_map: Dict[int, PathNode],
+                closed_set: Set[int], potential: Callable[[int], float],
+                neighbors: Optional[Callable[[Location], Iterable[Tuple[int, float]]]] = None) -> List[PathNode]:
+        """
+        Relax the edges leaving a node, pushing improved neighbours with
+        lazy deletion.
+        
+        Args:
+            neighbors: Optional edge function; defaults to outgoing edges
+        
+        Returns:
+            The neighbour nodes whose best path improved
+        """
+        improved = []
+        for neighbor_id, distance in (neighbors or self._neighbors)(current.location):
+            if neighbor_id in closed_set:
+                continue
+            
+            tentative_g_score = current.g_score + distance
+            known_node = node_map.get(neighbor_id)
+            if known_node is not None and tentative_g_score >= known_node.g_score:
+                continue
             
-            # Process neighbors
-            for neighbor_id, distance in self.graph[current_id]:
-                # Skip already evaluated nodes
-                if neighbor_id in closed_set:
-                    continue
-                
+            if known_node is not None:
+                neighbor_location = known_node.location
+                h_score = known_node.h_score
+            else:
                 neighbor_location = self._get_location_by_id(neighbor_id)
-                
-                # Calculate g_score for this path
-                tentative_g_score = current.g_score + distance
-                
-                # If we already know a better path to this neighbor, skip
-                if neighbor_id in node_map and tentative_g_score >= node_map[neighbor_id].g_score:
-                    continue
-                
-                # This is the best path so far, record it
-                if neighbor_id in node_map:
-                    neighbor_node = node_map[neighbor_id]
-                    # Update existing node
-                    neighbor_node.parent = current
-                    neighbor_node.g_score = tentative_g_score
-                    
-                    # Re-heapify since the score changed
-                    heapq.heapify(open_set)
-                else:
-                    # Create new node
-                    neighbor_node = PathNode(
-                        location=neighbor_location,
-                        parent=current,
-                        g_score=tentative_g_score,
-                        h_score=neighbor_location.distance_to(goal_location)
-                    )
-                    node_map[neighbor_id] = neighbor_node
-                    heapq.heappush(open_set, neighbor_node)
-        
-        # No path found
-        return []
+                h_score = potential(neighbor_id)
+            
+            neighbor_node = PathNode(
+                location=neighbor_location,
+                parent=current,
+                g_score=tentative_g_score,
+                h_score=h_score
+            )
+            node_map[neighbor_id] = neighbor_node
+            heapq.heappush(open_set, neighbor_node)
+            improved.append(neighbor_node)
+        
+        return improved
+    
+    def _heuristic(self, location_id: int, goal_prepared: Tuple[float, ...]) -> float:
+        """
+        Estimate the remaining cost from a location to the goal.
+        The straight-line metric distance never overestimates a path made of
+        edges weighted by the same metric, so the heuristic is admissible.
+        """
+        return self.metric.between(self.prepared[location_id], goal_prepared)
     
     def _get_location_by_id(self, location_id: int) -> Optional[Location]:
         """Helper method to get a location by its ID."""
-        for location in self.locations:
-            if location.id == location_id:
-                return location
-        return None
+        return self.locations_by_id.get(location_id)
     
     def _reconstruct_path(self, end_node: PathNode) -> List[Location]:
         """Reconstruct the path from end node to start by following parent links."""
@@ -0,0 +1,214 @@
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+# Improvements smaller than this are treated as floating point noise
+EPSILON = 1e-9
+
+
+@dataclass
+class RouteResult:
+    """
+    Result of a route optimization.
+    `order` holds indices into the stop list the distance matrix was built from.
+    """
+    order: List[int]
+    initial_length: float
+    final_length: float
+    elapsed: float = 0.0
+    passes: int = 0
+
+    @property
+    def improvement(self) -> float:
+        """Fraction of the initial route length removed by the improvement passes."""
+        if self.initial_length <= 0:
+            return 0.0
+        return 1 - self.final_length / self.initial_length
+
+
+class RouteOptimizer:
+    """
+    Orders the stops of a route to minimize total travel distance.
+
+    Builds a nearest-neighbour route and then improves it with 2-opt
+    (segment reversal) and Or-opt (moving runs of up to three stops)
+    until no move helps or the time budget runs out. Routes are open
+    paths that start at a fixed stop and may end anywhere, and the
+    distance matrix is assumed to be symmetric.
+    """
+
+    def __init__(self, time_budget: float = 1.0, max_segment: int = 3):
+        """
+        Initialize the optimizer.
+
+        Args:
+            time_budget: Maximum seconds to spend on improvement passes
+            max_segment: Longest run of stops Or-opt will try to move
+        """
+        if time_budget < 0:
+            raise ValueError("Time budget cannot be negative")
+        if max_segment <= 0:
+            raise ValueError("Segment length must be positive")
+
+        self.time_budget = time_budget
+        self.max_segment = max_segment
+
+    def optimize(self, matrix: Sequence[Sequence[float]], start: int = 0,
+                 time_budget: Optional[float] = None) -> RouteResult:
+        """
+        Optimize the visiting order of the stops in a distance matrix.
+
+        Args:
+            matrix: Pairwise distances, matrix[i][j] from stop i to stop j
+            start: Index of the stop the route must start from
+            time_budget: Optional override of the optimizer's time budget
+
+        Returns:
+            RouteResult with the stop order and the length before and after improvement
+        """
+        started = time.perf_counter()
+        budget = self.time_budget if time_budget is None else time_budget
+        deadline = started + budget
+
+        order = nearest_neighbour_route(matrix, start)
+        initial_length = route_length(order, matrix)
+
+        passes = 0
+        while time.perf_counter() < deadline:
+            passes += 1
+            improved = self._two_opt(order, matrix, deadline)
+            improved = self._or_opt(order, matrix, deadline) or improved
+            if not improved:
+                break
+
+        return RouteResult(
+            order=order,
+            initial_length=initial_length,
+            final_length=route_length(order, matrix),
+            elapsed=time.perf_counter() - started,
+            passes=passes
+        )
+
+    def _two_opt(self, order: List[int], matrix: Sequence[Sequence[float]], deadline: float) -> bool:
+        """
+        Apply improving segment reversals in place.
+
+        Returns:
+            True if the route was shortened
+        """
+        n = len(order)
+        improved = False
+
+        for i in range(1, n - 1):
+            before = order[i - 1]
+            first = order[i]
+            for j in range(i + 1, n):
+                last = order[j]
+                # Reversing order[i..j] replaces edges (before, first) and
+                # (last, after) with (before, last) and (first, after)
+                delta = matrix[before][last] - matrix[before][first]
+                if j + 1 < n:
+                    after = order[j + 1]
+                    delta += matrix[first][after] - matrix[last][after]
+
+                if delta < -EPSILON:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    first = order[i]
+                    improved = True
+
+            if time.perf_counter() > deadline:
+                break
+
+        return improved
+
+    def _or_opt(self, order: List[int], matrix: Sequence[Sequence[float]], deadline: float) -> bool:
+        """
+        Move short runs of stops to a cheaper position in place,
+        optionally reversing them.
+
+        Returns:
+            True if the route was shortened
+        """
+        improved = False
+
+        for length in range(1, self.max_segment + 1):
+            i = 1
+            while i + length <= len(order):
+                segment = order[i:i + length]
+                head, tail = segment[0], segment[-1]
+                prev = order[i - 1]
+                after = order[i + length] if i + length < len(order) else None
+
+                # Distance saved by taking the segment out of the route
+                removal_gain = matrix[prev][head]
+                if after is not None:
+                    removal_gain += matrix[tail][after] - matrix[prev][after]
+
+                rest = order[:i] + order[i + length:]
+                best_delta = -EPSILON
+                best_move = None
+
+                for k in range(1, len(rest) + 1):
+                    if k == i:
+                        continue  # Original position
+                    p = rest[k - 1]
+                    q = rest[k] if k < len(rest) else None
+
+                    forward = matrix[p][head] - removal_gain
+                    backward = matrix[p][tail] - removal_gain
+                    if q is not None:
+                        forward += matrix[tail][q] - matrix[p][q]
+                        backward += matrix[head][q] - matrix[p][q]
+
+                    if forward < best_delta:
+                        best_delta, best_move = forward, (k, False)
+                    if length > 1 and backward < best_delta:
+                        best_delta, best_move = backward, (k, True)
+
+                if best_move is not None:
+                    k, reverse = best_move
+                    moved = segment[::-1] if reverse else segment
+                    order[:] = rest[:k] + moved + rest[k:]
+                    improved = True
+                else:
+                    i += 1
+
+                if time.perf_counter() > deadline:
+                    return improved
+
+        return improved
+
+
+def route_length(order: Sequence[int], matrix: Sequence[Sequence[float]]) -> float:
+    """Calculate the total length of an open route through the given stop order."""
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def nearest_neighbour_route(matrix: Sequence[Sequence[float]], start: int = 0) -> List[int]:
+    """
+    Build a route by always travelling to the nearest unvisited stop.
+
+    Args:
+        matrix: Pairwise distances, matrix[i][j] from stop i to stop j
+        start: Index of the first stop
+
+    Returns:
+        List of stop indices starting at `start`
+    """
+    n = len(matrix)
+    if n == 0:
+        return []
+
+    order = [start]
+    remaining = set(range(n))
+    remaining.discard(start)
+
+    current = start
+    while remaining:
+        row = matrix[current]
+        # Break ties by index so the result is deterministic
+        current = min(remaining, key=lambda index: (row[index], index))
+        order.append(current)
+        remaining.remove(current)
+
+    return order
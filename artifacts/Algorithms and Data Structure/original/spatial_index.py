@@ -0,0 +1,174 @@
+import heapq
+from math import floor, sqrt
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from distance import EUCLIDEAN, DistanceMetric
+
+
+class SpatialGrid:
+    """
+    Uniform grid spatial index over latitude/longitude coordinates.
+    Points are bucketed into square cells so nearest-neighbour queries only
+    inspect the cells around the query point instead of every point.
+    
+    Cells store points prepared by the distance metric, so per-point values
+    such as radians are computed once on insert. The grid does not wrap
+    around the antimeridian.
+    """
+
+    def __init__(self, cell_size: float = 0.1, metric: Optional[DistanceMetric] = None):
+        """
+        Initialize an empty grid.
+
+        Args:
+            cell_size: Width and height of a grid cell in degrees
+            metric: Distance metric used for queries (Euclidean by default)
+        """
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+
+        self.cell_size = cell_size
+        self.metric = metric or EUCLIDEAN
+        self.cells: Dict[Tuple[int, int], Dict[int, Tuple[float, ...]]] = {}
+        self.points: Dict[int, Tuple[float, float]] = {}
+
+    @classmethod
+    def for_points(cls, points: Iterable[Tuple[int, float, float]],
+                   points_per_cell: int = 4,
+                   metric: Optional[DistanceMetric] = None) -> 'SpatialGrid':
+        """
+        Build a grid sized so that each cell holds a handful of points.
+
+        Args:
+            points: Iterable of (id, latitude, longitude) tuples
+            points_per_cell: Average number of points a cell should hold
+            metric: Distance metric used for queries (Euclidean by default)
+
+        Returns:
+            A populated SpatialGrid
+        """
+        points = list(points)
+        cell_size = 0.1
+
+        if len(points) > 1:
+            latitudes = [lat for _, lat, _ in points]
+            longitudes = [lon for _, _, lon in points]
+            area = (max(latitudes) - min(latitudes)) * (max(longitudes) - min(longitudes))
+            if area > 0:
+                cell_size = sqrt(area * points_per_cell / len(points))
+
+        grid = cls(cell_size, metric)
+        for point_id, latitude, longitude in points:
+            grid.insert(point_id, latitude, longitude)
+        return grid
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Get the grid cell containing a coordinate."""
+        return (floor(latitude / self.cell_size), floor(longitude / self.cell_size))
+
+    def insert(self, point_id: int, latitude: float, longitude: float) -> None:
+        """Add a point to the grid, replacing any point with the same ID."""
+        if point_id in self.points:
+            self.remove(point_id)
+
+        self.points[point_id] = (latitude, longitude)
+        self.cells.setdefault(self._cell_of(latitude, longitude), {})[point_id] = \
+            self.metric.prepare(latitude, longitude)
+
+    def remove(self, point_id: int) -> bool:
+        """
+        Remove a point from the grid.
+
+        Returns:
+            True if the point was in the grid and removed, False otherwise
+        """
+        if point_id not in self.points:
+            return False
+
+        latitude, longitude = self.points.pop(point_id)
+        cell = self._cell_of(latitude, longitude)
+        bucket = self.cells[cell]
+        del bucket[point_id]
+        if not bucket:
+            del self.cells[cell]
+        return True
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __contains__(self, point_id: int) -> bool:
+        return point_id in self.points
+
+    def nearest(self, latitude: float, longitude: float, k: int,
+                exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Find the k points closest to a coordinate.
+
+        Searches rings of cells outward from the query cell and stops once
+        the k-th best distance is inside the radius already covered.
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Number of neighbours to return
+            exclude: Optional point ID to leave out (usually the query point)
+
+        Returns:
+            List of (point_id, distance) tuples sorted by distance
+        """
+        if k <= 0 or not self.points:
+            return []
+
+        row, col = self._cell_of(latitude, longitude)
+        query = self.metric.prepare(latitude, longitude)
+        between = self.metric.between
+        # Max-heap of the best k candidates as (-distance, point_id)
+        best: List[Tuple[float, int]] = []
+
+        def consider(bucket: Dict[int, Tuple[float, ...]]) -> None:
+            for point_id, prepared in bucket.items():
+                if point_id == exclude:
+                    continue
+                distance = between(query, prepared)
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, point_id))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, point_id))
+
+        ring = 0
+        while True:
+            # A ring with more cells than the grid has occupied cells is
+            # cheaper to finish with a scan of the remaining cells
+            if ring > 0 and 8 * ring >= len(self.cells):
+                for (cell_row, cell_col), bucket in self.cells.items():
+                    if max(abs(cell_row - row), abs(cell_col - col)) >= ring:
+                        consider(bucket)
+                break
+
+            for cell in self._ring_cells(row, col, ring):
+                bucket = self.cells.get(cell)
+                if bucket:
+                    consider(bucket)
+
+            # Every point closer than the bound for ring * cell_size has been seen
+            if len(best) == k and -best[0][0] <= self.metric.lower_bound(latitude, ring * self.cell_size):
+                break
+            ring += 1
+
+        return sorted(((point_id, -neg_distance) for neg_distance, point_id in best),
+                      key=lambda item: item[1])
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int) -> List[Tuple[int, int]]:
+        """Get the cells at Chebyshev distance `ring` from (row, col)."""
+        if ring == 0:
+            return [(row, col)]
+
+        cells = []
+        for offset in range(-ring, ring + 1):
+            cells.append((row - ring, col + offset))
+            cells.append((row + ring, col + offset))
+        for offset in range(-ring + 1, ring):
+            cells.append((row + offset, col - ring))
+            cells.append((row + offset, col + ring))
+        return cells
@@ -0,0 +1,904 @@
+import atexit
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+from collections import OrderedDict
+
+from cache import (JournaledCache, LRUCache, PersistentCache, SQLiteCache, WTinyLFUPolicy,
+                   deep_sizeof, lru_cache_decorator)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache[str](2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_concurrent_access(self):
+        cache = LRUCache[int](32)
+        errors = []
+        # Switch threads as often as possible to provoke interleavings
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(3000):
+                    key = str(rng.randint(0, 63))
+                    action = rng.random()
+                    if action < 0.5:
+                        value = cache.get(key)
+                        if value is not None:
+                            self.assertEqual(str(value % 64), key)
+                    elif action < 0.85:
+                        cache.put(key, int(key) + 64 * rng.randint(0, 100))
+                    elif action < 0.95:
+                        cache.remove(key)
+                    else:
+                        cache.get_all_items()
+                        cache.get_stats()
+            except Exception as e:  # Reported from the main thread
+                errors.append(e)
+
+        try:
+            threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(cache.size(), 32)
+        self.assertEqual(len(cache.get_all_items()), cache.size())
+
+    def _load_concurrently(self, cache, loader, threads=8):
+        """Call get_or_load("a") from several threads; return their results or errors."""
+        results = []
+
+        def worker():
+            try:
+                results.append(cache.get_or_load("a", loader))
+            except Exception as e:
+                results.append(e)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def test_get_or_load_coalesces_concurrent_misses(self):
+        cache = LRUCache[str](10)
+        calls = []
+        release = threading.Event()
+
+        def loader(key):
+            calls.append(key)
+            release.wait(5)
+            return key.upper()
+
+        # Let the waiters pile up on the first load before it finishes
+        threading.Timer(0.1, release.set).start()
+        self.assertEqual(self._load_concurrently(cache, loader), ["A"] * 8)
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.get_or_load("a", loader), "A")
+        self.assertEqual(calls, ["a"])
+
+    def test_get_or_load_errors_reach_every_waiter(self):
+        cache = LRUCache[str](10)
+        release = threading.Event()
+
+        def loader(key):
+            release.wait(5)
+            raise KeyError(key)
+
+        threading.Timer(0.1, release.set).start()
+        results = self._load_concurrently(cache, loader)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(isinstance(result, KeyError) for result in results))
+        self.assertIsNone(cache.get("a"))
+        # A failed load is not remembered
+        self.assertEqual(cache.get_or_load("a", str.upper), "A")
+
+    def test_get_or_load_does_not_cache_none(self):
+        cache = LRUCache[str](10)
+        self.assertIsNone(cache.get_or_load("a", lambda key: None))
+        self.assertEqual(cache.size(), 0)
+
+    def test_get_or_load_rechecks_cache_after_miss(self):
+        cache = LRUCache[str](10)
+        cache.put("a", "A")
+        real_get = cache.get
+        misses = [True]
+
+        def get(key, default=None):
+            # Miss once, as if another load stored the value just after the lookup
+            if misses:
+                misses.pop()
+                return default
+            return real_get(key, default)
+
+        cache.get = get
+        self.assertEqual(cache.get_or_load("a", self.fail), "A")
+
+    def test_remove_invalidates_running_load(self):
+        cache = LRUCache[str](10)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def stale_loader(key):
+            calls.append(key)
+            started.set()
+            release.wait(5)
+            return "old"
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(cache.get_or_load("a", stale_loader)))
+        thread.start()
+        started.wait(5)
+
+        # An update removes the key while the old value is being loaded
+        cache.remove("a")
+        self.assertEqual(cache.get_or_load("a", lambda key: "new"), "new")
+        release.set()
+        thread.join()
+
+        self.assertEqual(results, ["old"])
+        self.assertEqual(cache.get("a"), "new")
+        self.assertEqual(calls, ["a"])
+
+        # Clearing the cache drops running loads as well
+        started.clear()
+        release.clear()
+        cache.clear()
+        thread = threading.Thread(target=lambda: cache.get_or_load("b", stale_loader))
+        thread.start()
+        started.wait(5)
+        cache.clear()
+        release.set()
+        thread.join()
+        self.assertIsNone(cache.get("b"))
+
+
+class TestPersistentCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_file(self):
+        with open(self.filename) as f:
+            return json.load(f)
+
+    def test_writes_through_by_default(self):
+        cache = PersistentCache[int](10, self.filename)
+        cache.put("a", 1)
+        self.assertEqual(self.read_file()["a"][0], 1)
+        cache.remove("a")
+        self.assertEqual(self.read_file(), {})
+
+    def test_write_behind_flushes_on_threshold(self):
+        cache = PersistentCache[int](100, self.filename, write_behind=True,
+                                     flush_interval=60, flush_threshold=5)
+        for i in range(4):
+            cache.put(str(i), i)
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertEqual(cache.pending_writes(), 4)
+
+        cache.put("4", 4)
+        self.assertEqual(cache.pending_writes(), 0)
+        self.assertEqual(len(self.read_file()), 5)
+
+    def test_write_behind_flushes_on_interval(self):
+        cache = PersistentCache[int](10, self.filename, write_behind=True,
+                                     flush_interval=0.05, flush_threshold=100)
+        cache.put("a", 1)
+        deadline = time.time() + 5
+        while not os.path.exists(self.filename) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.read_file()["a"][0], 1)
+
+    def test_concurrent_writes_with_background_flushes(self):
+        cache = PersistentCache[int](50, self.filename, write_behind=True,
+                                     flush_interval=0.001, flush_threshold=20)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(300):
+                    cache.put(str((offset + i) % 80), i)
+                    cache.get(str(i % 80))
+                    if i % 7 == 0:
+                        cache.remove(str((offset * i) % 80))
+            except Exception as e:  # Reported from the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cache.flush()
+
+        self.assertEqual(errors, [])
+        # Reads after the last write reorder items without dirtying the cache
+        reloaded = PersistentCache[int](50, self.filename)
+        self.assertEqual(sorted(reloaded.get_all_items()), sorted(cache.get_all_items()))
+
+    def test_exit_hook_does_not_keep_cache_alive(self):
+        hooks = []
+        real_register = atexit.register
+        atexit.register = lambda func, *args: hooks.append((func, args))
+        try:
+            cache = PersistentCache[int](10, self.filename, write_behind=True,
+                                         flush_interval=60, sweep_interval=0.01)
+        finally:
+            atexit.register = real_register
+        cache.put("a", 1)
+
+        # What the interpreter runs at exit saves pending writes
+        [(hook, args)] = hooks
+        hook(*args)
+        self.assertEqual(self.read_file()["a"][0], 1)
+
+        # Dropping the cache lets it be collected and its sweeper stop
+        sweeper = cache._sweeper
+        cache_ref = weakref.ref(cache)
+        del cache
+        deadline = time.time() + 5
+        while cache_ref() is not None and time.time() < deadline:
+            gc.collect()
+            time.sleep(0.01)
+        self.assertIsNone(cache_ref())
+        sweeper.join(5)
+        self.assertFalse(sweeper.is_alive())
+        hook(*args)
+
+    def test_put_many_saves_once(self):
+        cache = PersistentCache[int](100, self.filename, write_behind=True,
+                                     flush_interval=60, flush_threshold=100)
+        cache.put_many((str(i), i) for i in range(10))
+        self.assertEqual(cache.pending_writes(), 10)
+        cache.flush()
+        self.assertEqual(len(self.read_file()), 10)
+
+        # A write-through cache writes the whole batch with one save
+        saves = []
+        cache = PersistentCache[int](100, self.filename)
+        cache._write_snapshot = saves.append
+        cache.put_many([("a", 1), ("b", 2)])
+        self.assertEqual(len(saves), 1)
+        self.assertEqual(sorted(saves[0]), sorted(str(i) for i in range(10)) + ["a", "b"])
+
+    def test_explicit_flush_and_reload(self):
+        cache = PersistentCache[int](10, self.filename, write_behind=True, flush_interval=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.remove("a")
+        cache.flush()
+
+        reloaded = PersistentCache[int](10, self.filename)
+        self.assertEqual(reloaded.get_all_items(), [("b", 2)])
+        # No temporary files are left behind
+        self.assertEqual(os.listdir(self.directory), ["cache.json"])
+
+
+class TestJournaledCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def log_lines(self):
+        with open(self.filename + ".log") as f:
+            return f.read().splitlines()
+
+    def test_mutations_append_to_log(self):
+        cache = JournaledCache[int](10, self.filename)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.remove("a")
+        self.assertEqual(len(self.log_lines()), 3)
+        self.assertFalse(os.path.exists(self.filename))
+
+        reloaded = JournaledCache[int](10, self.filename)
+        self.assertEqual(reloaded.get_all_items(), [("b", 2)])
+
+    def test_put_many_is_logged(self):
+        cache = JournaledCache[int](2, self.filename)
+        cache.put_many([("a", 1), ("b", 2), ("c", 3)])  # Evicts a
+        self.assertEqual(len(self.log_lines()), 4)
+
+        reloaded = JournaledCache[int](2, self.filename)
+        self.assertEqual(reloaded.get_all_items(), [("b", 2), ("c", 3)])
+
+    def test_evictions_are_logged(self):
+        cache = JournaledCache[int](2, self.filename)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)  # Evicts b
+        cache.remove("b")  # Not cached, so nothing to log
+
+        reloaded = JournaledCache[int](2, self.filename)
+        self.assertEqual(sorted(reloaded.get_all_items()), [("a", 1), ("c", 3)])
+
+    def test_compaction_rewrites_snapshot(self):
+        cache = JournaledCache[int](5, self.filename, compaction_threshold=1000)
+        for i in range(30):
+            cache.put(str(i % 7), i)
+        cache.clear()
+        cache.put("x", 99)
+        cache.compact()
+        self.assertEqual(cache.log_size(), 0)
+        self.assertEqual(self.log_lines(), [])
+
+        cache.put("y", 100)
+        reloaded = JournaledCache[int](5, self.filename)
+        self.assertEqual(reloaded.get_all_items(), [("x", 99), ("y", 100)])
+
+    def test_background_compaction(self):
+        cache = JournaledCache[int](5, self.filename, compaction_threshold=10)
+        for i in range(30):
+            cache.put(str(i % 7), i)
+        cache._compaction_thread.join()
+
+        self.assertLess(cache.log_size(), 30)
+        reloaded = JournaledCache[int](5, self.filename)
+        self.assertEqual(reloaded.get_all_items(), cache.get_all_items())
+
+    def test_torn_final_record_is_ignored(self):
+        cache = JournaledCache[int](10, self.filename)
+        cache.put("a", 1)
+        with open(self.filename + ".log", "a") as f:
+            f.write('["put", "b"')
+
+        reloaded = JournaledCache[int](10, self.filename)
+        self.assertEqual(reloaded.get_all_items(), [("a", 1)])
+        reloaded.put("c", 3)
+        self.assertEqual(JournaledCache[int](10, self.filename).get_all_items(), [("a", 1), ("c", 3)])
+
+    def test_write_behind_batches_appends(self):
+        cache = JournaledCache[int](10, self.filename, write_behind=True, flush_interval=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertFalse(os.path.exists(self.filename + ".log"))
+        cache.flush()
+        self.assertEqual(len(self.log_lines()), 2)
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "cache.db")
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.directory)
+
+    def open_cache(self, capacity=10, **kwargs):
+        cache = SQLiteCache[dict](capacity, self.filename, **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def test_values_load_lazily(self):
+        cache = self.open_cache()
+        for i in range(5):
+            cache.put(str(i), {"n": i})
+
+        loads = []
+        reloaded = self.open_cache(deserialize_fn=lambda data: loads.append(data) or data)
+        self.assertEqual(reloaded.size(), 5)
+        self.assertEqual(loads, [])
+
+        self.assertEqual(reloaded.get("3"), {"n": 3})
+        self.assertEqual(reloaded.get("3"), {"n": 3})
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(reloaded.loaded_count(), 1)
+        self.assertEqual([key for key, _ in reloaded.get_all_items()], ["0", "1", "2", "4", "3"])
+
+    def test_evictions_and_removals_persist(self):
+        cache = self.open_cache(capacity=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")
+        cache.put("c", {"v": 3})  # Evicts b
+        cache.remove("a")
+
+        reloaded = self.open_cache(capacity=2)
+        self.assertEqual(reloaded.get_all_items(), [("c", {"v": 3})])
+
+        reloaded.clear()
+        self.assertEqual(self.open_cache().size(), 0)
+
+    def test_reload_trims_to_capacity(self):
+        cache = self.open_cache(capacity=5)
+        for i in range(5):
+            cache.put(str(i), {"n": i})
+
+        smaller = self.open_cache(capacity=3)
+        self.assertEqual([key for key, _ in smaller.get_all_items()], ["2", "3", "4"])
+        self.assertEqual(self.open_cache().size(), 3)
+
+    def test_write_behind_commits_in_batches(self):
+        cache = self.open_cache(write_behind=True, flush_interval=60)
+        cache.put("a", {"v": 1})
+        self.assertEqual(self.open_cache().size(), 0)
+        cache.flush()
+        self.assertEqual(self.open_cache().get("a"), {"v": 1})
+
+    def test_concurrent_gets_of_expiring_items(self):
+        # Removing an expired item saves the cache while other threads put
+        cache = self.open_cache(capacity=20, ttl=0.001)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(200):
+                    cache.put(str((offset + i) % 30), {"n": i})
+                    cache.get(str(i % 30))
+            except Exception as e:  # Reported from the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(offset,), daemon=True) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(errors, [])
+
+
+class TestExpiry(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.real_time = time.time
+        time.time = lambda: self.now
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        time.time = self.real_time
+        shutil.rmtree(self.directory)
+
+    def test_cache_and_entry_ttl(self):
+        cache = LRUCache[str](10, ttl=60)
+        cache.put("default", "a")
+        cache.put("short", "b", ttl=5)
+        cache.put("long", "c", ttl=600)
+
+        self.now += 10
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("default"), "a")
+        self.assertEqual(cache.size(), 2)
+
+        self.now += 60
+        self.assertIsNone(cache.get("default"))
+        self.assertEqual(cache.get("long"), "c")
+
+    def test_put_refreshes_expiry(self):
+        cache = LRUCache[str](10)
+        cache.put("a", "1", ttl=5)
+        self.now += 4
+        cache.put("a", "2")
+        self.now += 100
+        self.assertEqual(cache.get("a"), "2")
+
+    def test_purge_expired(self):
+        cache = LRUCache[int](10, ttl=30)
+        for i in range(5):
+            cache.put(str(i), i)
+            self.now += 10
+        self.assertEqual(cache.purge_expired(), 3)
+        self.assertEqual([key for key, _ in cache.get_all_items()], ["3", "4"])
+
+    def test_concurrent_expirations_are_all_counted(self):
+        cache = LRUCache[int](4000, ttl=30)
+        for i in range(4000):
+            cache.put(str(i), i)
+        self.now += 60
+
+        def worker(offset):
+            for i in range(offset, 4000, 8):
+                cache.get(str(i))
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.assertEqual(cache.size(), 0)
+        self.assertEqual(cache.expirations, 4000)
+
+    def test_expiry_is_persisted(self):
+        filename = os.path.join(self.directory, "cache.json")
+        cache = JournaledCache[int](10, filename, ttl=30)
+        cache.put("old", 1)
+        self.now += 20
+        cache.put("new", 2)
+        self.now += 15
+        self.assertEqual(cache.purge_expired(), 1)
+
+        # Reloaded items expire relative to their stored timestamp
+        reloaded = JournaledCache[int](10, filename, ttl=30)
+        self.assertEqual(reloaded.get_all_items(), [("new", 2)])
+        self.now += 20
+        self.assertIsNone(reloaded.get("new"))
+
+    def test_reads_do_not_extend_persisted_expiry(self):
+        for cache_class, basename in [(PersistentCache, "cache.json"),
+                                      (JournaledCache, "journal.json"),
+                                      (SQLiteCache, "cache.db")]:
+            with self.subTest(cache_class=cache_class.__name__):
+                filename = os.path.join(self.directory, basename)
+                cache = cache_class(10, filename, ttl=30)
+                cache.put("a", 1)
+                self.now += 20
+                self.assertEqual(cache.get("a"), 1)
+                cache.put("b", 2)  # Saves the cache after the read
+                if isinstance(cache, JournaledCache):
+                    cache.compact()
+                if isinstance(cache, SQLiteCache):
+                    cache.close()
+
+                # Still 30 seconds from the put, not from the read
+                self.now += 15
+                reloaded = cache_class(10, filename, ttl=30)
+                self.assertIsNone(reloaded.get("a"))
+                self.assertEqual(reloaded.get("b"), 2)
+                if isinstance(reloaded, SQLiteCache):
+                    reloaded.close()
+
+
+class TestSweeper(unittest.TestCase):
+    def test_sweeper_purges_in_background(self):
+        cache = LRUCache[int](10, ttl=0.01, sweep_interval=0.01)
+        try:
+            cache.put("a", 1)
+            deadline = time.time() + 5
+            while cache.size() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(cache.size(), 0)
+        finally:
+            cache.stop_sweeper()
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            LRUCache(10, ttl=0)
+        with self.assertRaises(ValueError):
+            LRUCache(10).start_sweeper(0)
+
+
+class TestEvictionPolicies(unittest.TestCase):
+    def scan_survivors(self, policy):
+        cache = LRUCache[int](50, policy=policy)
+        hot = [f"hot{i}" for i in range(20)]
+        for _ in range(5):
+            for key in hot:
+                if cache.get(key) is None:
+                    cache.put(key, 1)
+
+        # A listing touches many keys exactly once
+        for i in range(500):
+            cache.put(f"scan{i}", 1)
+
+        self.assertEqual(cache.size(), 50)
+        return sum(1 for key in hot if cache.get(key) is not None)
+
+    def test_w_tinylfu_resists_scans(self):
+        self.assertEqual(self.scan_survivors(None), 0)
+        # Only a hot key still sitting in the admission window can be lost
+        self.assertGreaterEqual(self.scan_survivors(WTinyLFUPolicy(50)), 19)
+
+    def test_policy_stays_in_sync_with_cache(self):
+        policy = WTinyLFUPolicy(10)
+        cache = LRUCache[int](10, policy=policy)
+        rng = random.Random(5)
+        for _ in range(2000):
+            key = str(rng.randrange(40))
+            action = rng.random()
+            if action < 0.6:
+                if cache.get(key) is None:
+                    cache.put(key, 1)
+            elif action < 0.9:
+                cache.put(key, 2)
+            else:
+                cache.remove(key)
+            tracked = set(policy.window) | set(policy.probation) | set(policy.protected)
+            self.assertEqual(tracked, set(cache.cache))
+        cache.clear()
+        self.assertEqual(len(policy.window) + len(policy.probation) + len(policy.protected), 0)
+
+    def test_persistent_cache_with_policy(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "cache.json")
+            cache = JournaledCache[int](5, filename, policy=WTinyLFUPolicy(5))
+            for i in range(20):
+                cache.put(str(i % 8), i)
+                cache.get("0")
+
+            reloaded = JournaledCache[int](5, filename, policy=WTinyLFUPolicy(5))
+            self.assertEqual(sorted(reloaded.get_all_items()), sorted(cache.get_all_items()))
+            self.assertIn("0", dict(reloaded.get_all_items()))
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestStats(unittest.TestCase):
+    def test_counters(self):
+        cache = LRUCache[int](2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("a", 3)  # Update, not an insert
+        cache.get("a")
+        cache.get("missing")
+        cache.put("c", 4)  # Evicts b
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual((stats["inserts"], stats["evictions"]), (3, 1))
+        self.assertAlmostEqual(stats["hit_ratio"], 0.5)
+        self.assertNotIn("get_latency", stats)
+
+        cache.reset_stats()
+        self.assertEqual(cache.get_stats()["hits"], 0)
+        self.assertEqual(cache.get_stats()["hit_ratio"], 0.0)
+
+    def test_expirations_and_oldest_age(self):
+        real_time = time.time
+        now = [1000.0]
+        time.time = lambda: now[0]
+        try:
+            cache = LRUCache[int](10, ttl=10)
+            cache.put("a", 1)
+            now[0] += 5
+            cache.put("b", 2)
+            self.assertEqual(cache.get_stats()["oldest_item_age"], 5)
+            # Reads do not make an item younger
+            cache.get("a")
+            self.assertEqual(cache.get_stats()["oldest_item_age"], 5)
+
+            now[0] += 20
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.purge_expired(), 1)
+            stats = cache.get_stats()
+            self.assertEqual((stats["expirations"], stats["misses"], stats["size"]), (2, 1, 0))
+        finally:
+            time.time = real_time
+
+    def test_stats_do_not_scan_entries(self):
+        class Unscannable(OrderedDict):
+            def values(self):
+                raise AssertionError("get_stats iterated the cache entries")
+            items = __iter__ = values
+
+        cache = LRUCache[int](10)
+        for key in "abc":
+            cache.put(key, 1)
+        cache.put("a", 2)  # Rewriting an item makes it the youngest
+        oldest_time = cache.cache["b"][1]
+        cache.cache = Unscannable(cache.cache)
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["size"], 3)
+        self.assertAlmostEqual(stats["oldest_item_age"], time.time() - oldest_time, delta=1)
+
+    def test_latency_histograms(self):
+        cache = LRUCache[int](10, track_latency=True)
+        for i in range(20):
+            cache.put(str(i), i)
+            cache.get(str(i))
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["get_latency"]["count"], 20)
+        self.assertEqual(stats["put_latency"]["count"], 20)
+        self.assertLessEqual(stats["put_latency"]["p50_us"], stats["put_latency"]["max_us"])
+        self.assertEqual(stats["hits"], 20)
+
+
+class TestWeightedCapacity(unittest.TestCase):
+    def test_evicts_until_weight_fits(self):
+        cache = LRUCache[str](100, weigher=len, max_weight=10)
+        cache.put("a", "xxx")
+        cache.put("b", "xxx")
+        cache.put("c", "xxx")
+        self.assertEqual(cache.total_weight, 9)
+
+        cache.put("d", "xxxxxxx")  # Needs a and b evicted
+        self.assertEqual([key for key, _ in cache.get_all_items()], ["c", "d"])
+        self.assertEqual(cache.get_stats()["weight"], 10)
+        self.assertEqual(cache.evictions, 2)
+
+    def test_updates_and_removals_adjust_weight(self):
+        cache = LRUCache[str](100, weigher=len, max_weight=10, policy=WTinyLFUPolicy(100))
+        cache.put("a", "xx")
+        cache.put("b", "xx")
+        cache.put("a", "xxxxxxxxx")  # Grows past the budget, evicting b only
+        self.assertEqual([key for key, _ in cache.get_all_items()], ["a"])
+        self.assertEqual(cache.total_weight, 9)
+
+        cache.remove("a")
+        self.assertEqual(cache.total_weight, 0)
+        cache.put("a", "xx")
+        cache.clear()
+        self.assertEqual((cache.total_weight, cache.weights), (0, {}))
+
+    def test_weight_limit_with_partly_filled_window(self):
+        # The weight budget runs out while every key is still in the window
+        cache = LRUCache[int](1000, weigher=lambda value: value, max_weight=10,
+                              policy=WTinyLFUPolicy(1000))
+        cache.put("a", 4)
+        cache.put("b", 4)
+        cache.put("c", 4)
+        self.assertEqual([key for key, _ in cache.get_all_items()], ["b", "c"])
+        self.assertEqual(cache.total_weight, 8)
+
+    def test_oversized_value_is_not_cached(self):
+        cache = LRUCache[str](10, weigher=len, max_weight=5)
+        cache.put("a", "xx")
+        cache.put("a", "xxxxxxxxxx")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.total_weight, 0)
+
+    def test_requires_weigher(self):
+        with self.assertRaises(ValueError):
+            LRUCache(10, max_weight=100)
+
+    def test_deep_sizeof(self):
+        small = deep_sizeof({"locations": [1.0]})
+        large = deep_sizeof({"locations": [float(i) for i in range(300)]})
+        self.assertGreater(large, small + 300 * 8)
+        shared = [1.5] * 100
+        self.assertLess(deep_sizeof([shared, shared]), 2 * deep_sizeof(shared))
+
+    def test_persistent_weights_survive_reload(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for cache_class, basename in ((JournaledCache, "cache.json"), (SQLiteCache, "cache.db")):
+                filename = os.path.join(directory, basename)
+                cache = cache_class(100, filename, weigher=len, max_weight=10)
+                cache.put("a", "xxxx")
+                cache.put("b", "xxxx")
+                cache.put("c", "xxxx")  # Evicts a
+                cache.put("d", "x" * 20)  # Never cached
+                if isinstance(cache, SQLiteCache):
+                    cache.close()
+
+                reloaded = cache_class(100, filename, weigher=len, max_weight=10)
+                self.assertEqual(reloaded.total_weight, 8)
+                self.assertEqual(sorted(key for key, _ in reloaded.get_all_items()), ["b", "c"])
+
+                # A smaller budget trims the oldest items on load
+                smaller = cache_class(100, filename, weigher=len, max_weight=5)
+                self.assertEqual([key for key, _ in smaller.get_all_items()], ["c"])
+                for opened in (reloaded, smaller):
+                    if isinstance(opened, SQLiteCache):
+                        opened.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestCacheDecorator(unittest.TestCase):
+    def test_caches_none_results(self):
+        calls = []
+
+        @lru_cache_decorator(maxsize=10)
+        def lookup(key):
+            calls.append(key)
+            return None
+
+        self.assertIsNone(lookup(1))
+        self.assertIsNone(lookup(1))
+        self.assertEqual(calls, [1])
+
+    def test_one_decorator_object_keeps_functions_apart(self):
+        cached = lru_cache_decorator(maxsize=10)
+
+        @cached
+        def double(n):
+            return 2 * n
+
+        @cached
+        def square(n):
+            return n * n
+
+        self.assertEqual(double(3), 6)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(double.cache_info()["size"], 1)
+        square.cache_clear()
+        self.assertEqual(double(3), 6)
+        self.assertEqual(double.cache_info()["hits"], 1)
+
+    def test_arguments_with_equal_reprs_do_not_collide(self):
+        class Opaque:
+            def __repr__(self):
+                return "Opaque"
+
+        @lru_cache_decorator(maxsize=10)
+        def identity(value):
+            return value
+
+        first, second = Opaque(), Opaque()
+        self.assertIs(identity(first), first)
+        self.assertIs(identity(second), second)
+        # Positional and keyword arguments are keyed apart
+        self.assertEqual(identity("a"), "a")
+        self.assertEqual(identity(value="b"), "b")
+
+    def test_unhashable_arguments_bypass_the_cache(self):
+        calls = []
+
+        @lru_cache_decorator(maxsize=10)
+        def total(values):
+            calls.append(values)
+            return sum(values)
+
+        self.assertEqual(total([1, 2]), 3)
+        self.assertEqual(total([1, 2]), 3)
+        self.assertEqual(len(calls), 2)
+
+    def test_per_instance_caches(self):
+        class Model:
+            def __init__(self, offset):
+                self.offset = offset
+                self.calls = 0
+
+            @lru_cache_decorator(maxsize=10, per_instance=True)
+            def shifted(self, value):
+                self.calls += 1
+                return value + self.offset
+
+        first, second = Model(1), Model(100)
+        self.assertEqual(first.shifted(1), 2)
+        self.assertEqual(first.shifted(1), 2)
+        self.assertEqual(second.shifted(1), 101)
+        self.assertEqual((first.calls, second.calls), (1, 1))
+        self.assertEqual(Model.shifted.cache_info(first)["size"], 1)
+
+        Model.shifted.cache_clear(first)
+        first.shifted(1)
+        self.assertEqual(first.calls, 2)
+
+    def test_skip_if_bypasses_the_cache(self):
+        calls = []
+
+        @lru_cache_decorator(maxsize=10, skip_if=lambda key, write=False: write)
+        def access(key, write=False):
+            calls.append((key, write))
+            return key
+
+        access("a")
+        access("a")
+        access("a", write=True)
+        access("a", write=True)
+        self.assertEqual(calls, [("a", False), ("a", True), ("a", True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+import unittest
+import random
+from pathfinding import Location, LocationTable, PathFinder, location_distance_matrix
+import distance
+from distance import HAVERSINE, distance_matrix, matrix_rows
+from spatial_index import SpatialGrid
+
+
+def make_locations(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        Location(id=i, name=f"Location {i}",
+                 latitude=rng.uniform(40.0, 41.0),
+                 longitude=rng.uniform(-74.5, -73.5))
+        for i in range(1, count + 1)
+    ]
+
+
+def path_length(path):
+    return sum(a.distance_to(b) for a, b in zip(path, path[1:]))
+
+
+class TestDistance(unittest.TestCase):
+    def test_batched_distances_match_scalar(self):
+        locations = make_locations(40)
+        matrix = matrix_rows(location_distance_matrix(locations))
+
+        for i, loc in enumerate(locations):
+            batch = list(loc.distances_to(locations))
+            for j, other in enumerate(locations):
+                self.assertAlmostEqual(matrix[i][j], loc.distance_to(other))
+                self.assertAlmostEqual(batch[j], loc.distance_to(other))
+
+    def test_custom_metric_returns_same_types(self):
+        class Manhattan(distance.DistanceMetric):
+            def between(self, a, b):
+                return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+        for metric in (Manhattan(), distance.EUCLIDEAN):
+            distances = metric.distances_from(0.0, 0.0, [3.0, 1.0], [4.0, 1.0])
+            matrix = metric.matrix([0.0], [0.0], [], [])
+            if distance.np is not None:
+                self.assertIsInstance(distances, distance.np.ndarray)
+                self.assertEqual(matrix.shape, (1, 0))
+            else:
+                self.assertIsInstance(distances, list)
+                self.assertEqual(matrix, [[]])
+        self.assertEqual(list(Manhattan().distances_from(0.0, 0.0, [3.0, 1.0], [4.0, 1.0])), [7.0, 2.0])
+
+    def test_rectangular_matrix(self):
+        matrix = matrix_rows(distance_matrix([0.0, 3.0], [0.0, 0.0], [0.0], [4.0]))
+        self.assertEqual(len(matrix), 2)
+        self.assertAlmostEqual(matrix[0][0], 4.0)
+        self.assertAlmostEqual(matrix[1][0], 5.0)
+
+
+class TestHaversine(unittest.TestCase):
+    def test_known_distance(self):
+        new_york = Location(1, "New York", 40.7128, -74.0060)
+        los_angeles = Location(2, "Los Angeles", 34.0522, -118.2437)
+        self.assertAlmostEqual(new_york.distance_to(los_angeles, HAVERSINE), 3936, delta=5)
+
+    def test_vectorized_matches_scalar_with_and_without_numpy(self):
+        locations = make_locations(30)
+        lats = [loc.latitude for loc in locations]
+        lons = [loc.longitude for loc in locations]
+        expected = [[a.distance_to(b, HAVERSINE) for b in locations] for a in locations]
+
+        saved = distance.np
+        try:
+            for backend in (saved, None):
+                distance.np = backend
+                matrix = matrix_rows(distance_matrix(lats, lons, metric=HAVERSINE))
+                for i, row in enumerate(expected):
+                    for j, value in enumerate(row):
+                        self.assertAlmostEqual(matrix[i][j], value, places=6)
+        finally:
+            distance.np = saved
+
+    def test_grid_nearest_at_high_latitude(self):
+        rng = random.Random(3)
+        points = [(i, rng.uniform(69.0, 71.0), rng.uniform(10.0, 30.0)) for i in range(300)]
+        grid = SpatialGrid.for_points(points, metric=HAVERSINE)
+
+        for point_id, lat, lon in points[:20]:
+            expected = sorted(
+                (HAVERSINE.distance(lat, lon, other_lat, other_lon), other_id)
+                for other_id, other_lat, other_lon in points if other_id != point_id
+            )[:5]
+            result = grid.nearest(lat, lon, 5, exclude=point_id)
+            self.assertEqual([p for p, _ in result], [p for _, p in expected])
+
+    def test_path_finder_uses_metric(self):
+        locations = make_locations(200)
+        path_finder = PathFinder(locations, neighbors=6, metric=HAVERSINE)
+        path = path_finder.find_path(1, 200)
+        self.assertEqual(path[-1].id, 200)
+        for current, following in zip(path, path[1:]):
+            edges = dict(path_finder._neighbors(current))
+            self.assertAlmostEqual(edges[following.id], current.distance_to(following, HAVERSINE))
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def test_nearest_matches_brute_force(self):
+        locations = make_locations(300)
+        grid = SpatialGrid.for_points((loc.id, loc.latitude, loc.longitude) for loc in locations)
+
+        for query in locations[:25]:
+            expected = sorted(
+                (other.distance_to(query), other.id)
+                for other in locations if other.id != query.id
+            )[:6]
+            result = grid.nearest(query.latitude, query.longitude, 6, exclude=query.id)
+            self.assertEqual([point_id for point_id, _ in result],
+                             [point_id for _, point_id in expected])
+
+    def test_remove(self):
+        grid = SpatialGrid(0.5)
+        grid.insert(1, 0.0, 0.0)
+        grid.insert(2, 0.1, 0.1)
+        self.assertTrue(grid.remove(2))
+        self.assertFalse(grid.remove(2))
+        self.assertEqual(grid.nearest(0.0, 0.0, 3), [(1, 0.0)])
+
+
+class TestLocationTable(unittest.TestCase):
+    def test_round_trip_rows(self):
+        rows = [(1, "A", 1.0, 2.0, None), (2, "B", 3.0, 4.0, "second")]
+        table = LocationTable.from_rows(rows)
+
+        self.assertEqual(len(table), 2)
+        self.assertIn(2, table)
+        self.assertEqual(table.get(2), Location(id=2, name="B", latitude=3.0,
+                                                longitude=4.0, description="second"))
+        self.assertEqual(table.get(1).description, "")
+        self.assertIsNone(table.get(3))
+        self.assertEqual(list(table.points()), [(1, 1.0, 2.0), (2, 3.0, 4.0)])
+
+    def test_duplicate_id_rejected(self):
+        table = LocationTable()
+        table.append(1, "A", 0.0, 0.0)
+        with self.assertRaises(ValueError):
+            table.append(1, "A again", 1.0, 1.0)
+
+    def test_location_is_slotted(self):
+        self.assertFalse(hasattr(Location(1, "A", 0.0, 0.0), "__dict__"))
+
+    def test_path_finder_accepts_table(self):
+        locations = make_locations(300)
+        table = LocationTable.from_locations(locations)
+
+        for neighbors in (None, 6):
+            expected = PathFinder(locations, neighbors=neighbors).find_path(1, 300)
+            result = PathFinder(table, neighbors=neighbors).find_path(1, 300)
+            self.assertEqual(result, expected)
+
+
+class TestPathFinder(unittest.TestCase):
+    def test_complete_graph_returns_direct_edge(self):
+        locations = make_locations(20)
+        path = PathFinder(locations).find_path(1, 20)
+        self.assertEqual([loc.id for loc in path], [1, 20])
+
+    def test_spatial_mode_finds_path_through_neighbors(self):
+        locations = make_locations(400)
+        path_finder = PathFinder(locations, neighbors=8)
+        self.assertEqual(path_finder.graph, {})
+
+        path = path_finder.find_path(1, 400)
+        self.assertEqual(path[0].id, 1)
+        self.assertEqual(path[-1].id, 400)
+        # Every hop must follow a nearest-neighbour edge
+        for current, following in zip(path, path[1:]):
+            neighbor_ids = [n for n, _ in path_finder._neighbors(current)]
+            self.assertIn(following.id, neighbor_ids)
+
+    def test_spatial_mode_path_is_shortest(self):
+        locations = make_locations(250, seed=7)
+        path_finder = PathFinder(locations, neighbors=5)
+
+        # Reference Dijkstra over the same neighbour graph
+        distances = {1: 0.0}
+        visited = set()
+        while True:
+            candidates = [(d, n) for n, d in distances.items() if n not in visited]
+            if not candidates:
+                break
+            current_distance, current_id = min(candidates)
+            visited.add(current_id)
+            current = path_finder._get_location_by_id(current_id)
+            for neighbor_id, distance in path_finder._neighbors(current):
+                if current_distance + distance < distances.get(neighbor_id, float('inf')):
+                    distances[neighbor_id] = current_distance + distance
+
+        for goal_id in (50, 125, 250):
+            path = path_finder.find_path(1, goal_id)
+            if goal_id in distances:
+                self.assertAlmostEqual(path_length(path), distances[goal_id])
+            else:
+                self.assertEqual(path, [])
+
+    def test_location_lookup_by_id(self):
+        locations = make_locations(50)
+        path_finder = PathFinder(locations)
+        self.assertIs(path_finder._get_location_by_id(17), locations[16])
+        self.assertIsNone(path_finder._get_location_by_id(999))
+        self.assertEqual(path_finder.find_path(999, 999), [])
+        self.assertEqual(path_finder.find_path(3, 3), [locations[2]])
+
+    def test_invalid_neighbor_count(self):
+        with self.assertRaises(ValueError):
+            PathFinder([], neighbors=0)
+
+
+class TestIncrementalUpdates(unittest.TestCase):
+    def assert_same_paths(self, incremental, rebuilt, pairs):
+        for start_id, goal_id in pairs:
+            self.assertEqual(
+                [loc.id for loc in incremental.find_path(start_id, goal_id)],
+                [loc.id for loc in rebuilt.find_path(start_id, goal_id)]
+            )
+
+    def test_updates_match_full_rebuild(self):
+        locations = make_locations(150)
+        extra = make_locations(160, seed=99)[150:]
+        pairs = [(1, 50), (2, 155), (10, 140), (155, 160)]
+
+        for neighbors in (None, 5):
+            for as_table in (False, True):
+                initial = LocationTable.from_locations(locations) if as_table else locations
+                path_finder = PathFinder(initial, neighbors=neighbors)
+
+                for location in extra:
+                    path_finder.add_location(location)
+                self.assertTrue(path_finder.remove_location(20))
+                self.assertFalse(path_finder.remove_location(20))
+                self.assertTrue(path_finder.move_location(30, 40.5, -74.0))
+
+                expected = [loc for loc in locations + extra if loc.id not in (20, 30)]
+                expected.append(Location(30, "Location 30", 40.5, -74.0))
+                rebuilt = PathFinder(expected, neighbors=neighbors)
+
+                if neighbors is None:
+                    self.assertEqual(path_finder.graph, rebuilt.graph)
+                self.assert_same_paths(path_finder, rebuilt, pairs)
+                self.assertEqual(path_finder.find_path(20, 1), [])
+
+    def test_batch_add_matches_full_rebuild(self):
+        locations = make_locations(120)
+        extra = make_locations(160, seed=7)[120:]
+        pairs = [(1, 60), (3, 130), (125, 159)]
+
+        for neighbors in (None, 5):
+            for as_table in (False, True):
+                initial = LocationTable.from_locations(locations) if as_table else locations
+                path_finder = PathFinder(initial, neighbors=neighbors)
+                path_finder.add_locations(extra)
+                rebuilt = PathFinder(locations + extra, neighbors=neighbors)
+
+                if neighbors is None:
+                    self.assertEqual(path_finder.graph.keys(), rebuilt.graph.keys())
+                    for loc_id, edges in rebuilt.graph.items():
+                        self.assertEqual(path_finder.graph[loc_id].keys(), edges.keys())
+                        for other_id, distance in edges.items():
+                            self.assertAlmostEqual(path_finder.graph[loc_id][other_id], distance)
+                self.assert_same_paths(path_finder, rebuilt, pairs)
+
+        # An empty path finder can be filled in one batch
+        path_finder = PathFinder([])
+        path_finder.add_locations(extra)
+        self.assert_same_paths(path_finder, PathFinder(extra), [(125, 159)])
+
+    def test_batch_add_rejects_duplicates(self):
+        locations = make_locations(5)
+        path_finder = PathFinder(locations[:3])
+        with self.assertRaises(ValueError):
+            path_finder.add_locations([locations[3], locations[0]])
+        with self.assertRaises(ValueError):
+            path_finder.add_locations([locations[3], locations[3]])
+        self.assertIsNone(path_finder._get_location_by_id(4))
+
+    def test_duplicate_add_rejected(self):
+        locations = make_locations(5)
+        path_finder = PathFinder(locations)
+        with self.assertRaises(ValueError):
+            path_finder.add_location(locations[0])
+        # The caller's list is not modified by updates
+        path_finder.remove_location(1)
+        self.assertEqual(len(locations), 5)
+
+
+class TestMultiDirectionalSearch(unittest.TestCase):
+    def test_bidirectional_matches_find_path(self):
+        locations = make_locations(300, seed=3)
+        rng = random.Random(3)
+        pairs = [(rng.randint(1, 300), rng.randint(1, 300)) for _ in range(25)]
+
+        for neighbors in (None, 6):
+            path_finder = PathFinder(locations, neighbors=neighbors)
+            for start_id, goal_id in pairs:
+                expected = path_finder.find_path(start_id, goal_id)
+                path = path_finder.find_path_bidirectional(start_id, goal_id)
+                if not expected:
+                    self.assertEqual(path, [])
+                    continue
+                self.assertEqual(path[0].id, start_id)
+                self.assertEqual(path[-1].id, goal_id)
+                self.assertAlmostEqual(path_length(path), path_length(expected))
+
+    def test_bidirectional_follows_directed_edges(self):
+        path_finder = PathFinder(make_locations(200), neighbors=4)
+        path = path_finder.find_path_bidirectional(1, 200)
+        for current, following in zip(path, path[1:]):
+            neighbor_ids = [n for n, _ in path_finder._neighbors(current)]
+            self.assertIn(following.id, neighbor_ids)
+
+        # Incoming edges are rebuilt after an update
+        path_finder.remove_location(path[len(path) // 2].id)
+        self.assertAlmostEqual(path_length(path_finder.find_path_bidirectional(1, 200)),
+                               path_length(path_finder.find_path(1, 200)))
+
+    def test_many_targets_match_find_path(self):
+        locations = make_locations(250, seed=11)
+        goal_ids = [5, 60, 125, 250, 999]
+
+        for neighbors in (None, 5):
+            path_finder = PathFinder(locations, neighbors=neighbors)
+            paths = path_finder.find_paths_to_many(1, goal_ids)
+            costs = path_finder.costs_to_many(1, goal_ids)
+            self.assertNotIn(999, paths)
+            self.assertEqual(set(paths), set(costs))
+
+            for goal_id in goal_ids[:-1]:
+                expected = path_finder.find_path(1, goal_id)
+                if not expected:
+                    self.assertNotIn(goal_id, paths)
+                    continue
+                self.assertEqual([loc.id for loc in paths[goal_id]][0], 1)
+                self.assertAlmostEqual(costs[goal_id], path_length(expected))
+
+    def test_cost_matrix(self):
+        locations = make_locations(30)
+        complete = PathFinder(locations).cost_matrix(locations[:10])
+        direct = matrix_rows(location_distance_matrix(locations[:10]))
+        self.assertEqual(complete, direct)
+
+        sparse_finder = PathFinder(locations, neighbors=3)
+        sparse = sparse_finder.cost_matrix(locations[:10])
+        for i, loc in enumerate(locations[:10]):
+            self.assertEqual(sparse[i][i], 0)
+            for j, other in enumerate(locations[:10]):
+                path = sparse_finder.find_path(loc.id, other.id)
+                expected = path_length(path) if path else float('inf')
+                self.assertAlmostEqual(sparse[i][j], expected)
+                self.assertGreaterEqual(sparse[i][j], direct[i][j] - 1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import itertools
+import random
+from distance import distance_matrix, matrix_rows
+from route_optimizer import RouteOptimizer, nearest_neighbour_route, route_length
+
+
+def random_matrix(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    latitudes = [rng.uniform(40.0, 41.0) for _ in range(count)]
+    longitudes = [rng.uniform(-74.5, -73.5) for _ in range(count)]
+    return matrix_rows(distance_matrix(latitudes, longitudes))
+
+
+class TestRouteOptimizer(unittest.TestCase):
+    def test_matches_brute_force_on_small_routes(self):
+        for seed in range(5):
+            matrix = random_matrix(7, seed)
+            best = min(
+                route_length([0] + list(rest), matrix)
+                for rest in itertools.permutations(range(1, 7))
+            )
+            result = RouteOptimizer(time_budget=1.0).optimize(matrix)
+            # 2-opt/Or-opt is a local search, so allow a small gap
+            self.assertLessEqual(result.final_length, best * 1.05)
+
+    def test_improves_on_nearest_neighbour(self):
+        matrix = random_matrix(200, seed=11)
+        nearest = route_length(nearest_neighbour_route(matrix), matrix)
+
+        result = RouteOptimizer(time_budget=1.0).optimize(matrix)
+
+        self.assertEqual(result.order[0], 0)
+        self.assertEqual(sorted(result.order), list(range(200)))
+        self.assertAlmostEqual(result.initial_length, nearest)
+        self.assertLess(result.final_length, result.initial_length)
+        self.assertAlmostEqual(result.final_length, route_length(result.order, matrix))
+        self.assertLess(result.elapsed, 1.5)
+
+    def test_respects_start_and_zero_budget(self):
+        matrix = random_matrix(30, seed=3)
+        result = RouteOptimizer().optimize(matrix, start=5, time_budget=0)
+        self.assertEqual(result.order[0], 5)
+        self.assertEqual(result.order, nearest_neighbour_route(matrix, 5))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            RouteOptimizer(time_budget=-1)
+        with self.assertRaises(ValueError):
+            RouteOptimizer(max_segment=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
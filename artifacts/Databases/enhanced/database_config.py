@@ -42,6 +42,9 @@ class DatabasePool:
         for _ in range(self.max_connections):
             conn = sqlite3.connect(self.db_name, check_same_thread=False)
             conn.row_factory = sqlite3.Row
+            # In WAL mode a connection streaming a long SELECT does not
+            # keep the other pooled connections from committing writes
+            conn.execute("PRAGMA journal_mode=WAL")
             self.connections.put(conn)
 
     @contextmanager
@@ -126,6 +126,17 @@ MIGRATIONS: List[Migration] = [
             
             DROP TABLE trips_temp;
         '''
+    ),
+    Migration(
+        version=3,
+        description="Add trip listing index",
+        up_sql='''
+            -- Serves keyset pagination by (created_at, id)
+            CREATE INDEX IF NOT EXISTS idx_trips_created_at_id ON trips (created_at, id);
+        ''',
+        down_sql='''
+            DROP INDEX IF EXISTS idx_trips_created_at_id;
+        '''
     )
 ]
 
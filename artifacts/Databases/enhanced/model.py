@@ -1,12 +1,32 @@
-from typing import List, Optional, Dict
+from typing import Any, Iterable, Iterator, List, Optional, Dict, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime, date
+import json
 import sqlite3
 from database_config import DatabasePool
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of trips list_trips returns by default
+TRIP_PAGE_SIZE = 50
+
+# Rows fetched per round trip by the iter_* generators
+ITER_BATCH_SIZE = 500
+
+# Trips with their categories and tags; {source} is joined as `t` and
+# callers append their conditions, GROUP BY t.id and an ORDER BY
+TRIP_SELECT = """
+    SELECT t.*,
+           GROUP_CONCAT(DISTINCT c.name) as categories,
+           GROUP_CONCAT(DISTINCT tg.name) as tags
+    FROM {source} t
+    LEFT JOIN trip_categories tc ON t.id = tc.trip_id
+    LEFT JOIN categories c ON tc.category_id = c.id
+    LEFT JOIN trip_tags tt ON t.id = tt.trip_id
+    LEFT JOIN tags tg ON tt.tag_id = tg.id
+"""
+
 @dataclass
 class Trip:
     id: Optional[int]
@@ -37,6 +57,10 @@ class TripModel:
                     deleted_at TIMESTAMP
                 )
             ''')
+            # Keyset pagination reads pages in this order straight from the index
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trips_created_at_id ON trips (created_at, id)"
+            )
             conn.commit()
 
     def add_trip(self, destination: str, start_date: date = None, end_date: date = None,
@@ -132,6 +156,159 @@ class TripModel:
             (trip_id, tag_id)
         )
 
+    def add_trips(self, trips: Iterable[Dict[str, Any]]) -> List[Trip]:
+        # Each record holds add_trip's arguments: destination and optional
+        # start_date, end_date, categories and tags. The trips are built
+        # from the records instead of being read back.
+        records = [self._check_trip_record(record) for record in trips]
+        if not records:
+            return []
+
+        with self.pool.get_connection() as conn:
+            try:
+                now = self._write_trips(conn, records, upsert=False)
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"Failed to add trips: {str(e)}")
+                raise
+            except BaseException:
+                # Malformed records can fail after BEGIN IMMEDIATE; the
+                # connection must not go back to the pool holding the write lock
+                conn.rollback()
+                raise
+
+        logger.info(f"Added {len(records)} trips")
+        created_at = datetime.fromisoformat(now)
+        return [
+            Trip(
+                id=record['id'],
+                destination=record['destination'],
+                created_at=created_at,
+                updated_at=created_at,
+                start_date=record.get('start_date'),
+                end_date=record.get('end_date'),
+                categories=record.get('categories') or [],
+                tags=record.get('tags') or []
+            )
+            for record in records
+        ]
+
+    def upsert_trips(self, trips: Iterable[Dict[str, Any]]) -> List[Trip]:
+        # Like add_trips, but records with the id of an existing trip replace
+        # its destination, and its dates, categories and tags when given;
+        # as in update_trip, omitted ones are left alone.
+        records = [self._check_trip_record(record) for record in trips]
+        if not records:
+            return []
+
+        with self.pool.get_connection() as conn:
+            try:
+                self._write_trips(conn, records, upsert=True)
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"Failed to upsert trips: {str(e)}")
+                raise
+            except BaseException:
+                # Malformed records can fail after BEGIN IMMEDIATE; the
+                # connection must not go back to the pool holding the write lock
+                conn.rollback()
+                raise
+
+        logger.info(f"Upserted {len(records)} trips")
+        # Read all of them back in one query for their stored timestamps
+        ids = [record['id'] for record in records]
+        by_id = {
+            trip.id: trip
+            for trip in self._iter_trips(
+                TRIP_SELECT.format(source="trips")
+                + " WHERE t.id IN (SELECT value FROM json_each(?)) GROUP BY t.id",
+                (json.dumps(ids),),
+                ITER_BATCH_SIZE
+            )
+        }
+        return [by_id[trip_id] for trip_id in ids]
+
+    @staticmethod
+    def _check_trip_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        if not record.get('destination'):
+            raise ValueError("Destination cannot be empty")
+
+        start_date, end_date = record.get('start_date'), record.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("Start date must be before end date")
+
+        record = dict(record)
+        for key in ('categories', 'tags'):
+            if record.get(key) is not None:
+                # Drop duplicates, keeping the first occurrence
+                record[key] = list(dict.fromkeys(record[key]))
+        return record
+
+    def _write_trips(self, conn: sqlite3.Connection, records: List[Dict[str, Any]], upsert: bool) -> str:
+        # Writes the records in one transaction with a fixed number of
+        # statements, assigning ids to records without one. Returns the
+        # CURRENT_TIMESTAMP stored as their created_at/updated_at.
+        # Take the write lock before reading MAX(id) so the ids stay ours
+        conn.execute("BEGIN IMMEDIATE")
+        now = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM trips").fetchone()[0]
+        next_id = max([next_id] + [record['id'] for record in records if record.get('id') is not None]) + 1
+        for record in records:
+            if record.get('id') is None:
+                record['id'] = next_id
+                next_id += 1
+
+        query = """
+            INSERT INTO trips (id, destination, start_date, end_date, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        if upsert:
+            query += """
+            ON CONFLICT(id) DO UPDATE SET
+                destination = excluded.destination,
+                start_date = COALESCE(excluded.start_date, trips.start_date),
+                end_date = COALESCE(excluded.end_date, trips.end_date),
+                updated_at = excluded.updated_at
+            """
+        conn.executemany(query, [
+            (record['id'], record['destination'], record.get('start_date'), record.get('end_date'), now, now)
+            for record in records
+        ])
+
+        for table, link_table, column, key in (
+            ("categories", "trip_categories", "category_id", "categories"),
+            ("tags", "trip_tags", "tag_id", "tags"),
+        ):
+            linked = [record for record in records if record.get(key) is not None]
+            if upsert:
+                # Given categories and tags replace the existing links
+                conn.executemany(
+                    f"DELETE FROM {link_table} WHERE trip_id = ?",
+                    [(record['id'],) for record in linked]
+                )
+            name_ids = self._resolve_names(conn, table, {name for record in linked for name in record[key]})
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {link_table} (trip_id, {column}) VALUES (?, ?)",
+                [(record['id'], name_ids[name]) for record in linked for name in record[key]]
+            )
+        return now
+
+    def _resolve_names(self, conn: sqlite3.Connection, table: str, names: Iterable[str]) -> Dict[str, int]:
+        # Creates missing category or tag names and looks up all their ids
+        # with two set-based statements, however many names there are
+        names = json.dumps(sorted(names))
+        conn.execute(
+            f"INSERT OR IGNORE INTO {table} (name) SELECT value FROM json_each(?)",
+            (names,)
+        )
+        cursor = conn.execute(
+            f"SELECT id, name FROM {table} WHERE name IN (SELECT value FROM json_each(?))",
+            (names,)
+        )
+        return {row['name']: row['id'] for row in cursor.fetchall()}
+
     def get_trip_by_id(self, trip_id: int) -> Optional[Trip]:
         with self.pool.get_connection() as conn:
             cursor = conn.execute(
@@ -151,87 +328,129 @@ class TripModel:
             )
             row = cursor.fetchone()
             if row:
-                categories = row['categories'].split(',') if row['categories'] else []
-                tags = row['tags'].split(',') if row['tags'] else []
-                return Trip(
-                    id=row['id'],
-                    destination=row['destination'],
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at']),
-                    start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                    end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
-                    categories=categories,
-                    tags=tags,
-                    deleted_at=datetime.fromisoformat(row['deleted_at']) if row['deleted_at'] else None
-                )
+                return self._row_to_trip(row)
             return None
 
+    @staticmethod
+    def _row_to_trip(row: sqlite3.Row) -> Trip:
+        return Trip(
+            id=row['id'],
+            destination=row['destination'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            updated_at=datetime.fromisoformat(row['updated_at']),
+            start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
+            end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
+            categories=row['categories'].split(',') if row['categories'] else [],
+            tags=row['tags'].split(',') if row['tags'] else [],
+            deleted_at=datetime.fromisoformat(row['deleted_at']) if row['deleted_at'] else None
+        )
+
     def get_all_trips(self, include_deleted: bool = False) -> List[Trip]:
+        return list(self.iter_trips(include_deleted))
+
+    def iter_trips(self, include_deleted: bool = False,
+                   batch_size: int = ITER_BATCH_SIZE) -> Iterator[Trip]:
+        query = TRIP_SELECT.format(source="trips")
+        if not include_deleted:
+            query += " WHERE t.deleted_at IS NULL"
+        query += " GROUP BY t.id ORDER BY t.created_at DESC, t.id DESC"
+        return self._iter_trips(query, (), batch_size)
+
+    def _iter_trips(self, query: str, params: tuple, batch_size: int) -> Iterator[Trip]:
+        # Checked before the generator starts, so a bad batch size fails
+        # on the call instead of on the first next()
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+        return self._fetch_trips(query, params, batch_size)
+
+    def _fetch_trips(self, query: str, params: tuple, batch_size: int) -> Iterator[Trip]:
+        # Streams rows in fetchmany batches. The pooled connection stays
+        # checked out until the generator is exhausted or closed.
         with self.pool.get_connection() as conn:
-            query = """
-                SELECT t.*, 
-                       GROUP_CONCAT(DISTINCT c.name) as categories,
-                       GROUP_CONCAT(DISTINCT tg.name) as tags
-                FROM trips t
-                LEFT JOIN trip_categories tc ON t.id = tc.trip_id
-                LEFT JOIN categories c ON tc.category_id = c.id
-                LEFT JOIN trip_tags tt ON t.id = tt.trip_id
-                LEFT JOIN tags tg ON tt.tag_id = tg.id
-            """
-            if not include_deleted:
-                query += " WHERE t.deleted_at IS NULL"
-            query += " GROUP BY t.id ORDER BY t.created_at DESC"
-            
-            cursor = conn.execute(query)
-            return [
-                Trip(
-                    id=row['id'],
-                    destination=row['destination'],
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at']),
-                    start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                    end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
-                    categories=row['categories'].split(',') if row['categories'] else [],
-                    tags=row['tags'].split(',') if row['tags'] else [],
-                    deleted_at=datetime.fromisoformat(row['deleted_at']) if row['deleted_at'] else None
-                )
-                for row in cursor.fetchall()
-            ]
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self._row_to_trip(row)
+
+    def list_trips(self, after: Optional[Tuple[Union[datetime, str], int]] = None,
+                   limit: int = TRIP_PAGE_SIZE, include_deleted: bool = False) -> List[Trip]:
+        # Keyset pagination: `after` is the (created_at, id) of the last trip
+        # on the previous page, so each page is a range scan of
+        # idx_trips_created_at_id and costs the same at any depth
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+
+        conditions = []
+        params: list = []
+        if not include_deleted:
+            conditions.append("deleted_at IS NULL")
+        if after is not None:
+            created_at, trip_id = after
+            if isinstance(created_at, datetime):
+                # Stored in the CURRENT_TIMESTAMP format
+                created_at = created_at.isoformat(sep=' ')
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend((created_at, trip_id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
 
-    def search_trips(self, query: str) -> List[Trip]:
         with self.pool.get_connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT t.id
-                FROM trips_fts fts
-                JOIN trips t ON t.id = fts.rowid
-                WHERE trips_fts MATCH ? AND t.deleted_at IS NULL
-                ORDER BY rank
+                f"""
+                WITH page AS (
+                    SELECT * FROM trips
+                    {where}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                )
+                {TRIP_SELECT.format(source="page")}
+                GROUP BY t.id
+                ORDER BY t.created_at DESC, t.id DESC
                 """,
-                (query,)
+                params
             )
-            trip_ids = [row['id'] for row in cursor.fetchall()]
-            return [self.get_trip_by_id(trip_id) for trip_id in trip_ids]
+            return [self._row_to_trip(row) for row in cursor.fetchall()]
+
+    def search_trips(self, query: str) -> List[Trip]:
+        return list(self.iter_search_trips(query))
+
+    def iter_search_trips(self, query: str, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Trip]:
+        # Best matches first
+        source = "(SELECT rowid AS id, rank FROM trips_fts WHERE trips_fts MATCH ?) m JOIN trips"
+        return self._iter_trips(
+            TRIP_SELECT.format(source=source) + """
+            WHERE t.id = m.id AND t.deleted_at IS NULL
+            GROUP BY t.id
+            ORDER BY m.rank
+            """,
+            (query,),
+            batch_size
+        )
 
     def get_trips_by_date_range(self, start: date, end: date) -> List[Trip]:
+        return list(self.iter_trips_by_date_range(start, end))
+
+    def iter_trips_by_date_range(self, start: date, end: date,
+                                 batch_size: int = ITER_BATCH_SIZE) -> Iterator[Trip]:
         if start > end:
             raise ValueError("Start date must be before end date")
 
-        with self.pool.get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT id FROM trips
-                WHERE deleted_at IS NULL
-                AND (
-                    (start_date BETWEEN ? AND ?) OR
-                    (end_date BETWEEN ? AND ?) OR
-                    (start_date <= ? AND end_date >= ?)
-                )
-                """,
-                (start, end, start, end, start, end)
+        return self._iter_trips(
+            TRIP_SELECT.format(source="trips") + """
+            WHERE t.deleted_at IS NULL
+            AND (
+                (t.start_date BETWEEN ? AND ?) OR
+                (t.end_date BETWEEN ? AND ?) OR
+                (t.start_date <= ? AND t.end_date >= ?)
             )
-            trip_ids = [row['id'] for row in cursor.fetchall()]
-            return [self.get_trip_by_id(trip_id) for trip_id in trip_ids]
+            GROUP BY t.id
+            """,
+            (start, end, start, end, start, end),
+            batch_size
+        )
 
     def update_trip(self, trip_id: int, destination: str = None, start_date: date = None,
                    end_date: date = None, categories: List[str] = None, tags: List[str] = None) -> Optional[Trip]:
@@ -0,0 +1,239 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+from database_config import DatabasePool
+from migrations import MigrationManager
+from model import TripModel
+
+
+class TripModelTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.directory, "trips.db")
+        conn = sqlite3.connect(self.db_name)
+        MigrationManager(conn).migrate()
+        conn.close()
+
+        # The pool is a singleton bound to the first database it opens;
+        # close whatever another test module left behind
+        if DatabasePool._instance is not None:
+            DatabasePool._instance.close_all()
+        DatabasePool._instance = None
+        self.model = TripModel(self.db_name)
+
+    def tearDown(self):
+        self.model.pool.close_all()
+        DatabasePool._instance = None
+        shutil.rmtree(self.directory)
+
+    def count(self, table):
+        with self.model.pool.get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestBulkWrites(TripModelTestCase):
+    def test_add_trips_assigns_ids_after_explicit_ones(self):
+        self.model.add_trip("Paris")
+        self.model.add_trip("Rome")
+
+        trips = self.model.add_trips([
+            {'destination': "Oslo"},
+            {'id': 10, 'destination': "Lima"},
+            {'destination': "Kyiv"},
+        ])
+        self.assertEqual([trip.id for trip in trips], [11, 10, 12])
+        self.assertEqual(self.model.get_trip_by_id(12).destination, "Kyiv")
+        self.assertEqual(self.count("trips"), 5)
+
+    def test_add_trips_links_duplicate_and_existing_names_once(self):
+        self.model.add_trip("Paris", categories=["city"], tags=["food"])
+
+        trips = self.model.add_trips([
+            {'destination': "Rome", 'categories': ["city", "city", "history"], 'tags': ["food"]},
+            {'destination': "Nice", 'categories': ["beach", "city"],
+             'start_date': date(2024, 6, 1), 'end_date': date(2024, 6, 8)},
+        ])
+        self.assertEqual(trips[0].categories, ["city", "history"])
+        self.assertEqual(self.count("categories"), 3)
+        self.assertEqual(self.count("tags"), 1)
+
+        rome = self.model.get_trip_by_id(trips[0].id)
+        self.assertEqual(sorted(rome.categories), ["city", "history"])
+        self.assertEqual(rome.tags, ["food"])
+        nice = self.model.get_trip_by_id(trips[1].id)
+        self.assertEqual(sorted(nice.categories), ["beach", "city"])
+        self.assertEqual((nice.start_date, nice.end_date), (date(2024, 6, 1), date(2024, 6, 8)))
+        self.assertEqual(nice.created_at, trips[1].created_at)
+
+    def test_add_trips_rolls_back_on_error(self):
+        existing = self.model.add_trip("Paris")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.model.add_trips([
+                {'destination': "Rome", 'categories': ["history"]},
+                {'id': existing.id, 'destination': "Taken"},
+            ])
+        self.assertEqual(self.count("trips"), 1)
+        self.assertEqual(self.count("categories"), 0)
+        self.assertEqual(self.model.get_trip_by_id(existing.id).destination, "Paris")
+
+        # The connection is not left inside the failed transaction
+        self.assertEqual(len(self.model.add_trips([{'destination': "Rome"}])), 1)
+
+    def test_malformed_records_release_the_write_lock(self):
+        self.model.add_trip("Paris")
+        with self.assertRaises(TypeError):
+            self.model.add_trips([{'destination': "Rome"}, {'destination': "Oslo", 'id': "abc"}])
+        with self.assertRaises(TypeError):
+            self.model.upsert_trips([{'destination': "Rome", 'tags': ["x", 1]}])
+        self.assertEqual(self.count("trips"), 1)
+
+        # Writes on this and the other pooled connections still go through
+        self.assertEqual(self.model.add_trip("Rome").destination, "Rome")
+        self.assertEqual(len(self.model.add_trips([{'destination': "Oslo"}])), 1)
+        self.assertEqual(self.count("trips"), 3)
+
+    def test_add_trips_validates_before_writing(self):
+        with self.assertRaises(ValueError):
+            self.model.add_trips([{'destination': "Rome"}, {'destination': ""}])
+        with self.assertRaises(ValueError):
+            self.model.add_trips([{'destination': "Rome", 'start_date': date(2024, 2, 1),
+                                   'end_date': date(2024, 1, 1)}])
+        self.assertEqual(self.count("trips"), 0)
+        self.assertEqual(self.model.add_trips([]), [])
+
+    def test_upsert_replaces_links_only_when_given(self):
+        paris = self.model.add_trip("Paris", date(2024, 5, 1), date(2024, 5, 5),
+                                    categories=["city"], tags=["food"])
+
+        trips = self.model.upsert_trips([
+            {'id': paris.id, 'destination': "Paris, France", 'categories': ["culture"]},
+            {'id': 7, 'destination': "Lima", 'tags': ["hiking"]},
+        ])
+        self.assertEqual([trip.id for trip in trips], [paris.id, 7])
+
+        updated = trips[0]
+        self.assertEqual(updated.destination, "Paris, France")
+        self.assertEqual(updated.categories, ["culture"])
+        self.assertEqual(updated.tags, ["food"])
+        # Omitted dates keep their stored values
+        self.assertEqual((updated.start_date, updated.end_date), (date(2024, 5, 1), date(2024, 5, 5)))
+        self.assertEqual(updated.created_at, paris.created_at)
+        self.assertEqual(trips[1].tags, ["hiking"])
+
+        # An empty list removes every link
+        self.model.upsert_trips([{'id': paris.id, 'destination': "Paris", 'tags': []}])
+        self.assertEqual(self.model.get_trip_by_id(paris.id).tags, [])
+        self.assertEqual(self.count("trips"), 2)
+
+    def test_upsert_mixes_new_and_existing_ids(self):
+        paris = self.model.add_trip("Paris")
+
+        trips = self.model.upsert_trips([
+            {'destination': "Oslo"},
+            {'id': paris.id, 'destination': "Paris", 'start_date': date(2024, 3, 1)},
+        ])
+        self.assertEqual([trip.id for trip in trips], [paris.id + 1, paris.id])
+        self.assertEqual(trips[1].start_date, date(2024, 3, 1))
+        self.assertEqual(self.model.search_trips("Oslo")[0].id, paris.id + 1)
+
+
+class TestListTrips(TripModelTestCase):
+    def test_pages_break_created_at_ties_by_id(self):
+        # Trips added together share one created_at second
+        self.model.add_trips([{'destination': f"Trip {i}"} for i in range(7)])
+        expected = [trip.id for trip in self.model.get_all_trips()]
+        self.assertEqual(expected, list(range(7, 0, -1)))
+
+        pages, after = [], None
+        while True:
+            page = self.model.list_trips(after, limit=3)
+            if not page:
+                break
+            pages.append([trip.id for trip in page])
+            after = (page[-1].created_at, page[-1].id)
+        self.assertEqual(pages, [[7, 6, 5], [4, 3, 2], [1]])
+
+    def test_after_accepts_datetime_and_stored_string(self):
+        trips = self.model.add_trips([{'destination': f"Trip {i}"} for i in range(4)])
+        with self.model.pool.get_connection() as conn:
+            stored = conn.execute("SELECT created_at FROM trips WHERE id = 3").fetchone()[0]
+
+        # datetimes are compared in the stored 'YYYY-MM-DD HH:MM:SS' format
+        by_datetime = self.model.list_trips((trips[2].created_at, 3))
+        by_string = self.model.list_trips((stored, 3))
+        self.assertEqual([trip.id for trip in by_datetime], [2, 1])
+        self.assertEqual([trip.id for trip in by_string], [2, 1])
+
+    def test_include_deleted(self):
+        self.model.add_trips([{'destination': f"Trip {i}"} for i in range(4)])
+        self.model.delete_trip(3)
+
+        self.assertEqual([trip.id for trip in self.model.list_trips()], [4, 2, 1])
+        page = self.model.list_trips(limit=2, include_deleted=True)
+        self.assertEqual([trip.id for trip in page], [4, 3])
+        self.assertIsNotNone(page[1].deleted_at)
+
+    def test_limit_must_be_positive(self):
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.model.list_trips(limit=limit)
+
+
+class TestStreaming(TripModelTestCase):
+    def setUp(self):
+        super().setUp()
+        self.model.add_trips([
+            {'destination': "Paris", 'start_date': date(2024, 5, 1), 'end_date': date(2024, 5, 5),
+             'categories': ["city"], 'tags': ["food", "art"]},
+            {'destination': "Paris Disneyland", 'start_date': date(2024, 7, 1)},
+            {'destination': "Rome", 'start_date': date(2024, 5, 3), 'end_date': date(2024, 5, 9)},
+            {'destination': "Oslo", 'end_date': date(2024, 1, 2)},
+            {'destination': "Lima", 'start_date': date(2024, 5, 2), 'end_date': date(2024, 5, 4)},
+        ])
+        self.model.delete_trip(5)
+
+    def assertSameTrips(self, streamed, listed):
+        self.assertEqual([trip.id for trip in streamed], [trip.id for trip in listed])
+        self.assertEqual(streamed, listed)
+
+    def test_iter_trips_matches_get_all_trips(self):
+        self.assertSameTrips(list(self.model.iter_trips(batch_size=2)), self.model.get_all_trips())
+        self.assertSameTrips(list(self.model.iter_trips(include_deleted=True, batch_size=2)),
+                             self.model.get_all_trips(include_deleted=True))
+        self.assertEqual(len(self.model.get_all_trips(include_deleted=True)), 5)
+
+    def test_iter_search_trips_matches_search_trips(self):
+        streamed = list(self.model.iter_search_trips("Paris", batch_size=1))
+        self.assertEqual(sorted(trip.id for trip in streamed), [1, 2])
+        self.assertSameTrips(streamed, self.model.search_trips("Paris"))
+
+    def test_iter_trips_by_date_range_matches_list(self):
+        start, end = date(2024, 5, 2), date(2024, 5, 4)
+        streamed = list(self.model.iter_trips_by_date_range(start, end, batch_size=1))
+        self.assertEqual(sorted(trip.id for trip in streamed), [1, 3])
+        self.assertSameTrips(streamed, self.model.get_trips_by_date_range(start, end))
+
+    def test_writes_while_streaming(self):
+        # A background job updating trips as it reads them
+        for trip in self.model.iter_trips(batch_size=2):
+            self.model.update_trip(trip.id, destination=trip.destination.upper())
+        self.model.add_trip("Kyiv")
+        self.assertEqual([trip.destination for trip in self.model.get_all_trips()],
+                         ["Kyiv", "OSLO", "ROME", "PARIS DISNEYLAND", "PARIS"])
+
+    def test_batch_size_is_checked_on_call(self):
+        with self.assertRaises(ValueError):
+            self.model.iter_trips(batch_size=0)
+        with self.assertRaises(ValueError):
+            self.model.iter_search_trips("Paris", batch_size=-1)
+        with self.assertRaises(ValueError):
+            self.model.iter_trips_by_date_range(date(2024, 1, 1), date(2024, 2, 1), batch_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
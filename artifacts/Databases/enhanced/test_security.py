@@ -1,18 +1,26 @@
 import unittest
 import os
 from model import TripModel
-from database_config import DatabaseManager
+from database_config import DatabaseManager, DatabasePool
 import sqlite3
 
 class TestSecurity(unittest.TestCase):
     def setUp(self):
         self.db_name = "test_security.db"
+        # Start from a fresh pool; a pool drained by an earlier test's
+        # DatabaseManager.__del__ would block every get_connection
+        if DatabasePool._instance is not None:
+            DatabasePool._instance.close_all()
+        DatabasePool._instance = None
         self.model = TripModel(self.db_name)
         self.db_manager = DatabaseManager(self.db_name)
 
     def tearDown(self):
-        if os.path.exists(self.db_name):
-            os.remove(self.db_name)
+        self.model.pool.close_all()
+        DatabasePool._instance = None
+        for path in (self.db_name, self.db_name + "-wal", self.db_name + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
         if os.path.exists("database_backups"):
             for file in os.listdir("database_backups"):
                 os.remove(os.path.join("database_backups", file))